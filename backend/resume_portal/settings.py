@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -47,6 +50,8 @@ INSTALLED_APPS = [
 INSTALLED_APPS += ['rest_framework.authtoken']
 
 MIDDLEWARE = [
+    # First, so its timings cover the rest of the stack
+    'screening.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -84,12 +89,54 @@ WSGI_APPLICATION = 'resume_portal.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# SQLite (the default) runs in WAL mode so readers never wait for the writer.
+# Set DB_ENGINE=postgres to use PostgreSQL, configured by the POSTGRES_*
+# variables. Connections are kept open for CONN_MAX_AGE seconds and checked
+# before reuse; with DB_POOL_MAX_SIZE set, PostgreSQL connections come from a
+# psycopg pool instead (persistent connections are then turned off).
+# Under ASGI (asgi.py sets DJANGO_SERVER_INTERFACE) queries run on executor
+# threads that Django does not close persistent connections for, so
+# CONN_MAX_AGE defaults to 0 there; use DB_POOL_MAX_SIZE to reuse connections.
+
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+SERVER_INTERFACE = os.environ.get('DJANGO_SERVER_INTERFACE', 'wsgi')
+CONN_MAX_AGE = int(os.environ.get('CONN_MAX_AGE', 0 if SERVER_INTERFACE == 'asgi' else 60))
+DB_POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE', 0))
+
+if DB_ENGINE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('POSTGRES_DB', 'resume_portal'),
+            'USER': os.environ.get('POSTGRES_USER', 'resume_portal'),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+            'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+            'CONN_MAX_AGE': 0 if DB_POOL_MAX_SIZE else CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'pool': {'min_size': 1, 'max_size': DB_POOL_MAX_SIZE},
+            } if DB_POOL_MAX_SIZE else {},
+        }
     }
-}
+elif DB_ENGINE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            # Transactions take the write lock up front and wait up to 20s for it, so
+            # concurrent uploads queue instead of failing with "database is locked"
+            'OPTIONS': {
+                'transaction_mode': 'IMMEDIATE',
+                'timeout': 20,
+                'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;',
+            },
+        }
+    }
+else:
+    raise ImproperlyConfigured(f"Unknown DB_ENGINE {DB_ENGINE!r} (expected 'sqlite' or 'postgres')")
 
 
 # Password validation
@@ -138,3 +185,96 @@ REST_FRAMEWORK = {
         'rest_framework.authentication.TokenAuthentication',
     ],
 }
+
+# Background resume analysis
+# Uploads are queued as AnalysisJob rows and processed by worker threads started
+# inside each web process. Set ANALYSIS_WORKERS=0 to process the queue only
+# through `python manage.py run_analysis_workers`.
+
+ANALYSIS_WORKERS = int(os.environ.get('ANALYSIS_WORKERS', 2))
+ANALYSIS_POLL_INTERVAL = float(os.environ.get('ANALYSIS_POLL_INTERVAL', 2))
+ANALYSIS_MAX_ATTEMPTS = 3
+ANALYSIS_STALE_AFTER = 600  # seconds a job may stay running before it is requeued
+# Jobs failing because the LLM provider is unavailable are retried (up to
+# ANALYSIS_MAX_ATTEMPTS) after this many seconds, doubled on every attempt
+ANALYSIS_RETRY_DELAY = float(os.environ.get('ANALYSIS_RETRY_DELAY', 30))
+# Longest ?wait= accepted by the async upload and analysis result views (long polling)
+ANALYSIS_WAIT_MAX = float(os.environ.get('ANALYSIS_WAIT_MAX', 30))
+
+# "combined" asks for every analysis field in one JSON prompt (falling back to
+# per-field prompts for anything missing); "separate" sends one prompt per field.
+ANALYSIS_PROMPT_MODE = os.environ.get('ANALYSIS_PROMPT_MODE', 'combined')
+
+# Separate-mode prompts run concurrently; each call is abandoned after the timeout.
+ANALYSIS_MAX_CONCURRENCY = int(os.environ.get('ANALYSIS_MAX_CONCURRENCY', 4))
+ANALYSIS_CALL_TIMEOUT = float(os.environ.get('ANALYSIS_CALL_TIMEOUT', 60))
+
+# Identical resume text + analysis type + job title reuses the stored analysis.
+ANALYSIS_CACHE_ENABLED = os.environ.get('ANALYSIS_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+ANALYSIS_CACHE_TTL = int(os.environ.get('ANALYSIS_CACHE_TTL', 30 * 24 * 3600))  # seconds
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.environ.get('ANALYSIS_CACHE_MAX_ENTRIES', 50000))
+
+# PDF text extraction runs in a pool of PDF_EXTRACT_WORKERS processes; a PDF
+# still being read after the timeout has its worker killed, keeping the pages
+# read until then. Reading stops after
+# PDF_MAX_PAGES pages or once PDF_MAX_TEXT_CHARS characters have been gathered;
+# files over PDF_MAX_FILE_BYTES are refused.
+PDF_EXTRACT_WORKERS = int(os.environ.get('PDF_EXTRACT_WORKERS', 2))
+PDF_MAX_PAGES = int(os.environ.get('PDF_MAX_PAGES', 25))
+PDF_MAX_TEXT_CHARS = int(os.environ.get('PDF_MAX_TEXT_CHARS', 30000))
+PDF_MAX_FILE_BYTES = int(os.environ.get('PDF_MAX_FILE_BYTES', 10 * 1024 * 1024))
+PDF_EXTRACT_TIMEOUT = float(os.environ.get('PDF_EXTRACT_TIMEOUT', 30))  # seconds
+
+# Client-side limits for LLM calls, shared by every thread of a process: token
+# buckets for requests and (estimated) prompt tokens per minute, retries with
+# exponential backoff and jitter, and a circuit breaker that fails fast for
+# LLM_BREAKER_RESET seconds after LLM_BREAKER_FAILURES consecutive failures.
+LLM_REQUESTS_PER_MINUTE = int(os.environ.get('LLM_REQUESTS_PER_MINUTE', 900))
+LLM_TOKENS_PER_MINUTE = int(os.environ.get('LLM_TOKENS_PER_MINUTE', 1000000))
+LLM_MAX_RETRIES = int(os.environ.get('LLM_MAX_RETRIES', 4))
+LLM_BACKOFF_BASE = float(os.environ.get('LLM_BACKOFF_BASE', 1))  # seconds
+LLM_BACKOFF_MAX = float(os.environ.get('LLM_BACKOFF_MAX', 30))  # seconds
+LLM_MAX_WAIT = float(os.environ.get('LLM_MAX_WAIT', 120))  # seconds a call may wait for the rate limiter
+LLM_BREAKER_FAILURES = int(os.environ.get('LLM_BREAKER_FAILURES', 5))
+LLM_BREAKER_RESET = float(os.environ.get('LLM_BREAKER_RESET', 30))  # seconds
+
+# Which LLM answers the analysis prompts: "gemini" (needs GEMINI_API_KEY),
+# "heuristic" (deterministic local scorer, no network) or "replay" (replies
+# recorded earlier to LLM_RECORD_FILE, read back from LLM_REPLAY_FILE, with
+# prompts never recorded sent to LLM_REPLAY_FALLBACK if set).
+LLM_BACKEND = os.environ.get('LLM_BACKEND', 'gemini')
+LLM_GEMINI_MODEL = os.environ.get('LLM_GEMINI_MODEL', 'gemini-2.0-flash')
+LLM_HEURISTIC_DELAY = float(os.environ.get('LLM_HEURISTIC_DELAY', 0))  # simulated seconds per call
+LLM_RECORD_FILE = os.environ.get('LLM_RECORD_FILE', '')
+LLM_REPLAY_FILE = os.environ.get('LLM_REPLAY_FILE', '')
+LLM_REPLAY_FALLBACK = os.environ.get('LLM_REPLAY_FALLBACK', '')
+
+# Resume text is cleaned (whitespace, repeated lines) and cut to a per-prompt
+# token budget before it is sent; keyword extraction only gets the skills,
+# experience and projects sections. Tokens are estimated at 4 characters each.
+PROMPT_TRIMMING = os.environ.get('PROMPT_TRIMMING', 'true').lower() in ('1', 'true', 'yes')
+PROMPT_TOKEN_BUDGETS = {
+    'keywords': 1500,
+    'score': 3000,
+    'review': 3000,
+    'relevance': 2000,
+    'combined': 3500,
+    'default': 3000,
+}
+
+# Import time a fresh worker may spend before serving its first request, as
+# measured by `manage.py check_startup` (python -X importtime).
+STARTUP_IMPORT_BUDGET_MS = float(os.environ.get('STARTUP_IMPORT_BUDGET_MS', 1500))
+
+# Candidate and recommendation responses carry ETags derived from data version
+# counters; each process keeps up to this many serialized responses, keyed by
+# URL and ETag, so unchanged data is not recomputed.
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 512))
+
+# Live candidate updates (server-sent events). Under ASGI a stream checks for
+# changed matches every CANDIDATE_STREAM_POLL_INTERVAL seconds, sends a
+# keep-alive comment after CANDIDATE_STREAM_HEARTBEAT seconds of silence and
+# closes after CANDIDATE_STREAM_MAX_SECONDS, when the browser reconnects.
+CANDIDATE_STREAM_POLL_INTERVAL = float(os.environ.get('CANDIDATE_STREAM_POLL_INTERVAL', 2))
+CANDIDATE_STREAM_HEARTBEAT = float(os.environ.get('CANDIDATE_STREAM_HEARTBEAT', 15))
+CANDIDATE_STREAM_MAX_SECONDS = float(os.environ.get('CANDIDATE_STREAM_MAX_SECONDS', 300))
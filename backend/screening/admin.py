@@ -1,15 +1,29 @@
 from django.contrib import admin
 
 # Register your models here.
-from .models import Resume, JobPost
+from .models import Resume, JobPost, AnalysisJob, AnalysisCacheEntry, ExtractedText
 
 class ResumeAdmin(admin.ModelAdmin):
     list_display = ('id','candidate_name', 'email','score')
 
 class JobPostAdmin(admin.ModelAdmin):
     list_display = ('id','title', 'employer', 'created_at')
+
+class AnalysisJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'resume', 'status', 'attempts', 'created_at', 'finished_at')
+    list_filter = ('status',)
+
+class AnalysisCacheEntryAdmin(admin.ModelAdmin):
+    list_display = ('key', 'analysis_type', 'job_title', 'hits', 'created_at', 'last_used_at')
+
+class ExtractedTextAdmin(admin.ModelAdmin):
+    list_display = ('content_hash', 'char_count', 'pages_read', 'page_count', 'stopped', 'created_at')
+    exclude = ('compressed_text',)
     
 # Register your models here.
 
 admin.site.register(Resume, ResumeAdmin)
 admin.site.register(JobPost)
+admin.site.register(AnalysisJob, AnalysisJobAdmin)
+admin.site.register(AnalysisCacheEntry, AnalysisCacheEntryAdmin)
+admin.site.register(ExtractedText, ExtractedTextAdmin)
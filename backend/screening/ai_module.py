@@ -1,152 +1,458 @@
 #ai_module.py
-import os
-from dotenv import load_dotenv
-import PyPDF2
-import google.generativeai as genai
-
-# Load environment variables
-load_dotenv()
-gemini_api_key = os.environ.get('GEMINI_API_KEY')
-if not gemini_api_key:
-    print("Gemini API key not set in environment variables (GEMINI_API_KEY).")
-else:
-    genai.configure(api_key=gemini_api_key)  # Configure Gemini API once if key is available
-    model = genai.GenerativeModel('gemini-2.0-flash')  # Define model once
-
-def analyze_resume(file_path, analysis_type="both", job_title=None, job_keywords=None):
+import json
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from django.conf import settings
+
+from .llm_backends import get_backend, prompt_kind
+from .llm_client import LLMUnavailable, get_llm_client
+from .metrics import timed
+from .pdf_extract import COMPLETE, get_extraction_pool
+from .scoring import jaccard
+from .text_prep import text_for_prompt, trimming_signature
+
+PROMPT_MODES = ("combined", "separate")
+
+# Bump whenever prompt wording or reply parsing changes so cached analyses are not reused
+PROMPT_VERSION = 2
+
+# Result keys produced by each analysis field
+FIELD_KEYS = {
+    'keywords': ('keywords',),
+    'score': ('score',),
+    'review': ('review',),
+    'relevance': ('relevance_score', 'relevance_tips'),
+}
+
+
+def get_model():
+    """The backend selected by settings.LLM_BACKEND, or None for Gemini without an API key."""
+    return get_backend()
+
+
+def model_name(model):
+    """
+    Name of the backend behind `model`, looking through wrappers such as
+    LLMClient: "gemini:<model>", "heuristic", "replay", or the class name of
+    any other model (e.g. StubModel).
     """
-    Analyzes a resume from a PDF file using the Gemini API.
+    # LLMClient -> RateLimitedModel -> backend is as deep as the wrapping goes
+    for _ in range(3):
+        if isinstance(getattr(model, 'name', None), str) or getattr(model, 'model', None) is None:
+            break
+        model = model.model
+    name = getattr(model, 'name', None)
+    return name if isinstance(name, str) else type(model).__name__
 
-    Args:
-        file_path (str): Path to the PDF resume file.
-        analysis_type (str, optional): Type of analysis to perform: "score", "review", "both", or "full".
-        job_title (str, optional): If provided, performs job title relevance analysis.
-        job_keywords (list, optional): List of keywords from job posting for matching.
 
-    Returns:
-        dict: Dictionary with available keys: score, review, relevance_score, relevance_tips, keywords, matching_score
+def analysis_cache_key(cache, text, analysis_type, job_title, model=None, prompt_mode=None):
     """
+    Cache key of an analysis. Besides the prompt inputs it covers the backend,
+    the prompt mode and the trimming settings, so that e.g. a heuristic or
+    replayed result is never served where a Gemini analysis was asked for.
+    """
+    prompt_mode = prompt_mode or getattr(settings, 'ANALYSIS_PROMPT_MODE', 'combined')
+    variant = "|".join([model_name(model or get_model()), prompt_mode, trimming_signature()])
+    return cache.key_for(text, analysis_type, job_title, PROMPT_VERSION, variant)
+
 
-    if not gemini_api_key:
+def keywords_prompt(text):
+    return (
+        "Extract a list of relevant skills, technologies, and keywords from the resume text below. "
+        "Return ONLY a comma-separated list of keywords, with no additional text or formatting. "
+        "Focus on technical skills, programming languages, tools, frameworks, and relevant experience.\n\n"
+        "Resume Text:\n"
+        f"{text}"
+    )
+
+
+def score_prompt(text):
+    return (
+        "You are an expert resume evaluator. Analyze the resume text below and respond "
+        "ONLY with a single integer between 1 and 10 (inclusive) that represents the "
+        "overall quality of the resume based solely on clarity, conciseness, ATS compatibility, "
+        "relevance, and presentation. Do not include any additional text, commentary, or formatting.\n\n"
+        "Resume Text:\n"
+        f"{text}"
+    )
+
+
+def review_prompt(text):
+    return (
+        "You are an expert resume reviewer. Evaluate the resume text below and provide a plain "
+        "text review in no more than 100 words. Do not use bullet points, lists, or any formatting; "
+        "simply provide the review as plain text. Do not include extra commentary or tags.\n\n"
+        "Resume Text:\n"
+        f"{text}"
+    )
+
+
+def relevance_prompt(text, job_title):
+    return (
+        "You are an expert job application assistant. Evaluate the resume text below for how well "
+        "it matches the job title \"" + job_title + "\". Respond EXACTLY in two lines. In the FIRST line, "
+        "output ONLY a single integer between 0 and 10 (inclusive) representing the relevance score. In the "
+        "SECOND line, provide a plain text paragraph (under 75 words) with suggestions on how the candidate can "
+        "better tailor the resume for the job. Do not include any extra text, labels, or formatting.\n\n"
+        "Resume Text:\n"
+        f"{text}"
+    )
+
+
+def combined_prompt(text, fields, job_title=None):
+    """Single prompt asking for every requested field as one JSON object."""
+    instructions = {
+        'keywords': (
+            '"keywords": an array of strings listing relevant skills, technologies, and keywords, focusing on '
+            'technical skills, programming languages, tools, frameworks, and relevant experience'
+        ),
+        'score': (
+            '"score": a single integer between 1 and 10 (inclusive) for the overall quality of the resume based '
+            'solely on clarity, conciseness, ATS compatibility, relevance, and presentation'
+        ),
+        'review': (
+            '"review": a plain text review in no more than 100 words, without bullet points, lists, or formatting'
+        ),
+        'relevance': (
+            f'"relevance_score": a single integer between 0 and 10 (inclusive) for how well the resume matches '
+            f'the job title "{job_title}", and "relevance_tips": a plain text paragraph (under 75 words) with '
+            f'suggestions on how the candidate can better tailor the resume for the job'
+        ),
+    }
+    keys = "\n".join(f"- {instructions[field]}" for field in fields)
+    return (
+        "You are an expert resume evaluator and job application assistant. Analyze the resume text below and "
+        "respond with ONLY a JSON object containing these keys:\n"
+        f"{keys}\n"
+        "Do not include any text outside the JSON object.\n\n"
+        "Resume Text:\n"
+        f"{text}"
+    )
+
+
+def parse_keywords(value):
+    if isinstance(value, list):
+        keywords = [str(k).strip() for k in value if str(k).strip()]
+        return ", ".join(keywords) if keywords else None
+    if isinstance(value, str) and value.strip():
+        return value.strip()
+    return None
+
+
+def parse_score(value, lowest=0, highest=10):
+    if isinstance(value, bool):
         return None
+    if isinstance(value, str):
+        value = value.strip()
+        value = int(value) if value.isdigit() else None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if isinstance(value, int) and lowest <= value <= highest:
+        return value
+    return None
 
-    # Step 1: Extract text from PDF
+
+def parse_text(value):
+    if isinstance(value, str) and value.strip():
+        return value.strip()
+    return None
+
+
+def parse_relevance_reply(reply):
+    """Split the two-line relevance reply into (score, tips)."""
+    lines = reply.splitlines()
+    if not lines:
+        return None, None
+    relevance_score = parse_score(lines[0])
+    suggestions = ""
+    if len(lines) > 1:
+        suggestions = " ".join(line.strip() for line in lines[1:]).strip()
+    return relevance_score, suggestions
+
+
+def parse_json_reply(reply):
+    """Load the JSON object from a model reply, tolerating markdown code fences around it."""
+    reply = reply.strip()
+    if reply.startswith("```"):
+        reply = reply.strip("`")
+        if reply.lower().startswith("json"):
+            reply = reply[4:]
     try:
-        with open(file_path, 'rb') as f:
-            pdf_reader = PyPDF2.PdfReader(f)
-            text = ""
-            for page in pdf_reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text
-    except Exception as e:
-        print(f"Error extracting text from PDF: {e}")
-        return None
+        data = json.loads(reply)
+    except ValueError:
+        start, end = reply.find("{"), reply.rfind("}")
+        if start == -1 or end <= start:
+            return None
+        try:
+            data = json.loads(reply[start:end + 1])
+        except ValueError:
+            return None
+    return data if isinstance(data, dict) else None
 
-    if not text:
-        print("No text extracted from PDF.")
-        return None
 
-    results = {}
+def extract_text(file_path):
+    """
+    Extract the text of a PDF in the extraction process pool, within the configured limits.
 
-    # Keywords Extraction
+    Returns:
+        str: The text read (possibly only the first pages), or None if nothing could be read.
+    """
+    result = get_extraction_pool().extract(file_path)
+    if result.error:
+        print(f"Error extracting text from PDF: {result.error}")
+    elif result.stopped != COMPLETE:
+        print(f"PDF extraction stopped early: {result.summary()}")
+    return result.text or None
+
+
+def requested_fields(analysis_type, job_title=None):
+    """The LLM-produced fields an analysis type asks for, in prompt order."""
+    fields = []
     if analysis_type in ("full",):
-        keywords_prompt = (
-            "Extract a list of relevant skills, technologies, and keywords from the resume text below. "
-            "Return ONLY a comma-separated list of keywords, with no additional text or formatting. "
-            "Focus on technical skills, programming languages, tools, frameworks, and relevant experience.\n\n"
-            "Resume Text:\n"
-            f"{text}"
-        )
+        fields.append('keywords')
+    if analysis_type in ("score", "both", "full"):
+        fields.append('score')
+    if analysis_type in ("review", "both", "full"):
+        fields.append('review')
+    if job_title and analysis_type in ("full",):
+        fields.append('relevance')
+    return fields
+
+
+def generate(model, prompt, timeout=None, **kwargs):
+    """Send one prompt, asking the client library to abandon the request after `timeout` seconds."""
+    if timeout:
+        kwargs['request_options'] = {'timeout': timeout}
+    with timed(f"llm.{prompt_kind(prompt)}"):
+        return model.generate_content(prompt, **kwargs)
+
+
+def run_separate_prompt(model, field, text, job_title=None, timeout=None):
+    """Run the dedicated prompt for one field and return the result keys it produces."""
+    if field == 'keywords':
         try:
-            response = model.generate_content(keywords_prompt)
-            results['keywords'] = response.text.strip()
+            response = generate(model, keywords_prompt(text_for_prompt(text, 'keywords')), timeout)
+            return {'keywords': response.text.strip()}
+        except LLMUnavailable:
+            raise
         except Exception as e:
             print(f"Gemini keywords extraction error: {e}")
-            results['keywords'] = None
+            return {'keywords': None}
 
-    # Matching Score Calculation
-    if job_keywords and results.get('keywords'):
+    if field == 'score':
+        # Score Analysis (plain integer, no extra text)
         try:
-            resume_keywords = set([k.lower().strip() for k in results['keywords'].split(',')])
-            job_keywords_set = set([k.lower().strip() for k in job_keywords])
-            
-            # Calculate Jaccard similarity
-            intersection = len(resume_keywords.intersection(job_keywords_set))
-            union = len(resume_keywords.union(job_keywords_set))
-            matching_score = intersection / union if union > 0 else 0
-            
-            results['matching_score'] = matching_score
+            response = generate(model, score_prompt(text_for_prompt(text, 'score')), timeout)
+            return {'score': parse_score(response.text)}
+        except LLMUnavailable:
+            raise
         except Exception as e:
-            print(f"Error calculating matching score: {e}")
-            results['matching_score'] = None
+            print(f"Gemini scoring error: {e}")
+            return {'score': None}
 
-    # Score Analysis (plain integer, no extra text)
-    if analysis_type in ("score", "both", "full"):
-        score_prompt = (
-            "You are an expert resume evaluator. Analyze the resume text below and respond "
-            "ONLY with a single integer between 1 and 10 (inclusive) that represents the "
-            "overall quality of the resume based solely on clarity, conciseness, ATS compatibility, "
-            "relevance, and presentation. Do not include any additional text, commentary, or formatting.\n\n"
-            "Resume Text:\n"
-            f"{text}"
-        )
+    if field == 'review':
+        # Review Analysis (plain text review, no bullet points or formatting)
         try:
-            response = model.generate_content(score_prompt)
-            score_text = response.text.strip()
-            # Ensure the response is a single integer.
-            score = int(score_text) if score_text.isdigit() else None
-            results['score'] = score if score is not None and 0 <= score <= 10 else None
+            response = generate(model, review_prompt(text_for_prompt(text, 'review')), timeout)
+            return {'review': response.text.strip()}
+        except LLMUnavailable:
+            raise
         except Exception as e:
-            print(f"Gemini scoring error: {e}")
-            results['score'] = None
+            print(f"Gemini review error: {e}")
+            return {'review': None}
 
-    # Review Analysis (plain text review, no bullet points or formatting)
-    if analysis_type in ("review", "both", "full"):
-        review_prompt = (
-            "You are an expert resume reviewer. Evaluate the resume text below and provide a plain "
-            "text review in no more than 100 words. Do not use bullet points, lists, or any formatting; "
-            "simply provide the review as plain text. Do not include extra commentary or tags.\n\n"
-            "Resume Text:\n"
-            f"{text}"
-        )
+    if field == 'relevance':
+        # Relevance Analysis (split response into two parts)
         try:
-            response = model.generate_content(review_prompt)
-            results['review'] = response.text.strip()
+            response = generate(model, relevance_prompt(text_for_prompt(text, 'relevance'), job_title), timeout)
+            relevance_score, suggestions = parse_relevance_reply(response.text.strip())
+            return {'relevance_score': relevance_score, 'relevance_tips': suggestions}
+        except LLMUnavailable:
+            raise
         except Exception as e:
-            print(f"Gemini review error: {e}")
-            results['review'] = None
+            print(f"Gemini relevance analysis error: {e}")
+            return {'relevance_score': None, 'relevance_tips': None}
 
-    # Relevance Analysis (split response into two parts)
-    if job_title and analysis_type in ("full",):
-        relevance_prompt = (
-            "You are an expert job application assistant. Evaluate the resume text below for how well "
-            "it matches the job title \"" + job_title + "\". Respond EXACTLY in two lines. In the FIRST line, "
-            "output ONLY a single integer between 0 and 10 (inclusive) representing the relevance score. In the "
-            "SECOND line, provide a plain text paragraph (under 75 words) with suggestions on how the candidate can "
-            "better tailor the resume for the job. Do not include any extra text, labels, or formatting.\n\n"
-            "Resume Text:\n"
-            f"{text}"
+    raise ValueError(f"Unknown analysis field: {field}")
+
+
+def run_prompts_concurrently(model, fields, text, job_title=None, max_concurrency=None, timeout=None):
+    """
+    Run the dedicated prompts for several fields at the same time.
+
+    At most `max_concurrency` prompts are in flight at once. The batch gets
+    `timeout` seconds per wave of prompts; prompts still unfinished then are
+    abandoned and their fields set to None. If the provider becomes
+    unavailable, the prompts not yet started are cancelled and LLMUnavailable
+    is raised straight away.
+
+    Returns:
+        dict: The merged result keys of every field, as the sequential prompts would produce.
+    """
+    max_concurrency = max_concurrency or getattr(settings, 'ANALYSIS_MAX_CONCURRENCY', 4)
+    timeout = timeout or getattr(settings, 'ANALYSIS_CALL_TIMEOUT', None)
+    if len(fields) <= 1 or max_concurrency <= 1:
+        results = {}
+        for field in fields:
+            results.update(run_separate_prompt(model, field, text, job_title, timeout))
+        return results
+
+    workers = min(max_concurrency, len(fields))
+    waves = -(-len(fields) // workers)
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analysis-prompt")
+    futures = {executor.submit(run_separate_prompt, model, field, text, job_title, timeout): field
+               for field in fields}
+    results = {}
+    try:
+        done, not_done = wait(futures, timeout=timeout * waves if timeout else None, return_when=FIRST_EXCEPTION)
+        for future in done:
+            results.update(future.result())
+        for future in not_done:
+            print(f"Gemini {futures[future]} prompt timed out after {timeout}s")
+            results.update({key: None for key in FIELD_KEYS[futures[future]]})
+    finally:
+        # Never block on abandoned calls; drop any prompt that has not started
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    # Keep the key order of the sequential implementation
+    return {key: results.get(key) for field in fields for key in FIELD_KEYS[field]}
+
+
+def run_combined_prompt(model, fields, text, job_title=None):
+    """
+    Ask for every field in one structured JSON call.
+
+    Fields missing from the reply or failing validation are re-requested with
+    their dedicated prompt, so a malformed reply costs at most the calls the
+    separate mode would have made.
+    """
+    try:
+        response = generate(
+            model,
+            combined_prompt(text_for_prompt(text, 'combined'), fields, job_title),
+            getattr(settings, 'ANALYSIS_CALL_TIMEOUT', None),
+            generation_config={'response_mime_type': 'application/json'},
         )
+        data = parse_json_reply(response.text) or {}
+    except LLMUnavailable:
+        raise
+    except Exception as e:
+        print(f"Gemini combined analysis error: {e}")
+        return {key: None for field in fields for key in FIELD_KEYS[field]}
+
+    results = {}
+    retry = []
+    for field in fields:
+        if field == 'keywords':
+            value = parse_keywords(data.get('keywords'))
+            parsed = {'keywords': value} if value else None
+        elif field == 'score':
+            value = parse_score(data.get('score'))
+            parsed = {'score': value} if value is not None else None
+        elif field == 'review':
+            value = parse_text(data.get('review'))
+            parsed = {'review': value} if value else None
+        else:
+            relevance_score = parse_score(data.get('relevance_score'))
+            tips = data.get('relevance_tips')
+            parsed = None
+            if relevance_score is not None and isinstance(tips, str):
+                parsed = {'relevance_score': relevance_score, 'relevance_tips': tips.strip()}
+        if parsed is None:
+            retry.append(field)
+        else:
+            results.update(parsed)
+
+    if retry:
+        print(f"Gemini combined reply missing or invalid for {', '.join(retry)}; falling back to separate prompts.")
+    results.update(run_prompts_concurrently(model, retry, text, job_title))
+    return results
+
+
+@timed('analyze_text')
+def analyze_text(text, analysis_type="both", job_title=None, job_keywords=None, prompt_mode=None, model=None,
+                 cache=None):
+    """
+    Runs the LLM analysis on already extracted resume text.
+
+    Args:
+        text (str): Resume text.
+        analysis_type (str, optional): Type of analysis to perform: "score", "review", "both", or "full".
+        job_title (str, optional): If provided, performs job title relevance analysis.
+        job_keywords (list, optional): List of keywords from job posting for matching.
+        prompt_mode (str, optional): "combined" sends one JSON prompt for all fields, "separate" sends one
+            prompt per field, concurrently. Defaults to settings.ANALYSIS_PROMPT_MODE.
+        model (optional): Object with a Gemini-compatible generate_content(). Defaults to the configured backend.
+        cache (optional): AnalysisCache; identical text, analysis type and job title analyzed with the same
+            backend and prompt settings skip the model entirely.
+
+    Returns:
+        dict: Dictionary with available keys: score, review, relevance_score, relevance_tips, keywords, matching_score
+
+    Raises:
+        LLMUnavailable: The provider kept failing or is rate limited, so no result should be stored.
+    """
+    # Every call goes through the shared rate limiter, retry policy and circuit breaker
+    model = get_llm_client(model or get_model())
+    prompt_mode = prompt_mode or getattr(settings, 'ANALYSIS_PROMPT_MODE', 'combined')
+    if prompt_mode not in PROMPT_MODES:
+        raise ValueError(f"Unknown prompt mode: {prompt_mode}")
+
+    fields = requested_fields(analysis_type, job_title)
+    cache_key = analysis_cache_key(cache, text, analysis_type, job_title, model, prompt_mode) if cache else None
+    results = cache.get(cache_key) if cache else None
+
+    if results is None:
+        if model is None:
+            return None
+        results = {}
+        if prompt_mode == "combined" and len(fields) > 1:
+            results.update(run_combined_prompt(model, fields, text, job_title))
+        else:
+            results.update(run_prompts_concurrently(model, fields, text, job_title))
+
+        # Only complete analyses are reused; a failed prompt should be retried next time
+        if cache and results and all(value is not None for value in results.values()):
+            cache.set(cache_key, results, analysis_type, job_title)
+
+    # Matching Score Calculation
+    if job_keywords and results.get('keywords'):
         try:
-            response = model.generate_content(relevance_prompt)
-            reply = response.text.strip()
-            # Split reply into lines; the first line should be the score.
-            lines = reply.splitlines()
-            if lines:
-                score_line = lines[0].strip()
-                relevance_score = int(score_line) if score_line.isdigit() else None
-                suggestions = ""
-                if len(lines) > 1:
-                    suggestions = " ".join(line.strip() for line in lines[1:]).strip()
-                results['relevance_score'] = relevance_score if relevance_score is not None and 0 <= relevance_score <= 10 else None
-                results['relevance_tips'] = suggestions
-            else:
-                results['relevance_score'] = None
-                results['relevance_tips'] = None
+            resume_keywords = set([k.lower().strip() for k in results['keywords'].split(',')])
+            job_keywords_set = set([k.lower().strip() for k in job_keywords])
+            results['matching_score'] = jaccard(resume_keywords, job_keywords_set)
         except Exception as e:
-            print(f"Gemini relevance analysis error: {e}")
-            results['relevance_score'] = None
-            results['relevance_tips'] = None
+            print(f"Error calculating matching score: {e}")
+            results['matching_score'] = None
 
     return results if results else None
+
+
+@timed('analyze_resume')
+def analyze_resume(file_path, analysis_type="both", job_title=None, job_keywords=None, prompt_mode=None, model=None,
+                   cache=None):
+    """
+    Analyzes a resume from a PDF file using the configured LLM backend.
+
+    Args:
+        file_path (str): Path to the PDF resume file.
+        analysis_type (str, optional): Type of analysis to perform: "score", "review", "both", or "full".
+        job_title (str, optional): If provided, performs job title relevance analysis.
+        job_keywords (list, optional): List of keywords from job posting for matching.
+        prompt_mode (str, optional): "combined" or "separate", see analyze_text.
+        model (optional): Object with a Gemini-compatible generate_content(). Defaults to the configured backend.
+        cache (optional): AnalysisCache consulted before calling the model, see analyze_text.
+
+    Returns:
+        dict: Dictionary with available keys: score, review, relevance_score, relevance_tips, keywords, matching_score
+    """
+
+    if model is None and get_model() is None and cache is None:
+        return None
+
+    # Step 1: Extract text from PDF
+    text = extract_text(file_path)
+    if not text:
+        print("No text extracted from PDF.")
+        return None
+
+    return analyze_text(text, analysis_type, job_title, job_keywords, prompt_mode=prompt_mode, model=model, cache=cache)
@@ -0,0 +1,115 @@
+#analysis_cache.py
+import hashlib
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import F
+from django.utils import timezone
+
+from .models import AnalysisCacheEntry
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+class AnalysisCache:
+    """
+    Database-backed cache of LLM analysis results, keyed on the content that produced them.
+
+    Entries older than `ttl` seconds are treated as misses and removed, and the
+    table is trimmed to `max_entries` by evicting the least recently used rows.
+    Hit and miss counts are kept per process; `AnalysisCacheEntry.hits` keeps the
+    per-entry total across processes.
+    """
+
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(text, analysis_type, job_title, prompt_version, variant=""):
+        """
+        Cache key of an analysis.
+
+        `variant` identifies how the result was produced (backend, prompt mode,
+        trimming settings), so that output of one setup is never served for another.
+        """
+        payload = "\x1f".join([str(prompt_version), variant, analysis_type or "", (job_title or "").strip(), text])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        entry = AnalysisCacheEntry.objects.filter(key=key).first()
+        if entry is not None and self.ttl and entry.created_at < timezone.now() - timedelta(seconds=self.ttl):
+            entry.delete()
+            entry = None
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if entry is None:
+            return None
+
+        AnalysisCacheEntry.objects.filter(pk=entry.pk).update(hits=F('hits') + 1, last_used_at=timezone.now())
+        return dict(entry.result)
+
+    def set(self, key, result, analysis_type, job_title=None):
+        try:
+            AnalysisCacheEntry.objects.update_or_create(
+                key=key,
+                defaults={
+                    'result': result,
+                    'analysis_type': analysis_type,
+                    'job_title': job_title,
+                    'created_at': timezone.now(),
+                    'last_used_at': timezone.now(),
+                },
+            )
+        except IntegrityError:
+            # Another worker stored the same analysis concurrently
+            pass
+        self.evict()
+
+    def evict(self):
+        """Drop expired entries, then the least recently used ones above max_entries."""
+        removed = 0
+        if self.ttl:
+            cutoff = timezone.now() - timedelta(seconds=self.ttl)
+            removed += AnalysisCacheEntry.objects.filter(created_at__lt=cutoff).delete()[0]
+        if self.max_entries:
+            overflow = AnalysisCacheEntry.objects.count() - self.max_entries
+            if overflow > 0:
+                oldest = AnalysisCacheEntry.objects.order_by('last_used_at').values_list('pk', flat=True)[:overflow]
+                removed += AnalysisCacheEntry.objects.filter(pk__in=list(oldest)).delete()[0]
+        return removed
+
+    def clear(self):
+        return AnalysisCacheEntry.objects.all().delete()[0]
+
+    def stats(self):
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / lookups if lookups else 0,
+            'entries': AnalysisCacheEntry.objects.count(),
+        }
+
+
+def get_analysis_cache():
+    """The process-wide analysis cache, or None when ANALYSIS_CACHE_ENABLED is off."""
+    global _cache
+    if not settings.ANALYSIS_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = AnalysisCache(settings.ANALYSIS_CACHE_TTL, settings.ANALYSIS_CACHE_MAX_ENTRIES)
+    return _cache
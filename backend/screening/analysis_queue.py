@@ -0,0 +1,221 @@
+#analysis_queue.py
+import asyncio
+import os
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .ai_module import analyze_text
+from .analysis_cache import get_analysis_cache
+from .llm_client import LLMUnavailable
+from .matching import find_matching_jobs
+from .models import AnalysisJob
+from .text_store import resume_text
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def enqueue_analysis(resume, job_title=None, analysis_type="full"):
+    """
+    Queues a resume for background analysis.
+
+    The job row is the queue entry: any worker (in-process threads or a
+    `manage.py run_analysis_workers` process) can claim it. In-process
+    workers are woken once the surrounding transaction commits.
+
+    Returns:
+        AnalysisJob: The queued job.
+    """
+    job = AnalysisJob.objects.create(resume=resume, job_title=job_title, analysis_type=analysis_type)
+    if settings.ANALYSIS_WORKERS > 0:
+        transaction.on_commit(lambda: get_worker_pool().wake())
+    return job
+
+
+async def wait_for_job(job_id, timeout, interval=0.25):
+    """
+    Wait without holding a thread until a job is done or failed, or `timeout` seconds pass.
+
+    The job may be run by any worker process, so its row is polled.
+
+    Returns:
+        AnalysisJob: The job as last read, or None if it does not exist.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        job = await AnalysisJob.objects.select_related('resume').filter(pk=job_id).afirst()
+        if job is None or job.is_finished or loop.time() >= deadline:
+            return job
+        await asyncio.sleep(min(interval, max(0.0, deadline - loop.time())))
+
+
+def claim_next_job():
+    """
+    Atomically move the oldest queued job to running and return it, or None if the queue is empty.
+
+    Jobs waiting to be retried are skipped until their run_after time.
+    """
+    while True:
+        due = Q(run_after__isnull=True) | Q(run_after__lte=timezone.now())
+        job = AnalysisJob.objects.filter(due, status='queued').order_by('created_at', 'id').first()
+        if job is None:
+            return None
+        claimed = AnalysisJob.objects.filter(pk=job.pk, status='queued').update(
+            status='running',
+            started_at=timezone.now(),
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+        # Another worker got there first, try the next one
+
+
+def requeue_stale_jobs():
+    """Put back jobs whose worker died mid-analysis, failing those that ran out of attempts."""
+    cutoff = timezone.now() - timedelta(seconds=settings.ANALYSIS_STALE_AFTER)
+    stale = AnalysisJob.objects.filter(status='running', started_at__lt=cutoff)
+    stale.filter(attempts__gte=settings.ANALYSIS_MAX_ATTEMPTS).update(
+        status='failed',
+        error="Worker stopped before the analysis finished",
+        finished_at=timezone.now(),
+    )
+    return stale.update(status='queued')
+
+
+def apply_analysis(resume, analysis_result):
+    """Write an analysis result dict back onto the resume row."""
+    resume.score = analysis_result.get('score')
+    resume.review = analysis_result.get('review')
+    resume.relevance_score = analysis_result.get('relevance_score')
+    resume.relevance_tips = analysis_result.get('relevance_tips')
+    resume.keywords = analysis_result.get('keywords')
+    # Saving re-indexes the resume's skills and refreshes its stored job matches
+    resume.save()
+
+    # Find matching jobs if keywords are available
+    if analysis_result.get('keywords'):
+        matching_jobs = find_matching_jobs(resume)
+        if matching_jobs:
+            resume.matching_score = matching_jobs[0]['score']
+            resume.save(update_fields=['matching_score'])
+
+
+def retry_delay(attempts):
+    """Seconds to wait before retrying a job that has run `attempts` times."""
+    return settings.ANALYSIS_RETRY_DELAY * 2 ** max(attempts - 1, 0)
+
+
+def run_job(job, model=None):
+    """
+    Run a claimed job to completion, recording the outcome on the job row. `model` overrides the configured one.
+
+    A job failing because the provider is unavailable goes back to the queue
+    with a growing delay until it has run ANALYSIS_MAX_ATTEMPTS times.
+    """
+    resume = job.resume
+    resume_file_path = resume.resume_file.path if resume.resume_file else None
+
+    try:
+        text = resume_text(resume)
+        if not text:
+            analysis_result = None
+            print("No text extracted from PDF.")
+        else:
+            analysis_result = analyze_text(text, analysis_type=job.analysis_type, job_title=job.job_title,
+                                           model=model, cache=get_analysis_cache())
+        if analysis_result:
+            apply_analysis(resume, analysis_result)
+            job.status = 'done'
+            job.error = None
+        else:
+            job.status = 'failed'
+            job.error = "Analysis produced no result"
+    except LLMUnavailable as e:
+        print(f"Resume analysis job {job.pk} failed: {e}")
+        job.error = str(e)
+        if job.attempts < settings.ANALYSIS_MAX_ATTEMPTS:
+            # The text is stored by now, so the retry does not need the file
+            job.status = 'queued'
+            job.run_after = timezone.now() + timedelta(seconds=retry_delay(job.attempts))
+        else:
+            job.status = 'failed'
+    except Exception as e:
+        print(f"Resume analysis job {job.pk} failed: {e}")
+        job.status = 'failed'
+        job.error = str(e)
+    finally:
+        # The uploaded file is only needed until its text is stored
+        if resume_file_path and os.path.exists(resume_file_path):
+            os.remove(resume_file_path)
+
+    if job.status == 'queued':
+        job.save(update_fields=['status', 'error', 'run_after'])
+        return job
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'error', 'finished_at'])
+    return job
+
+
+class AnalysisWorkerPool:
+    """A fixed set of daemon threads draining the AnalysisJob queue. `model` overrides the configured one."""
+
+    def __init__(self, size, poll_interval, model=None):
+        self.size = size
+        self.poll_interval = poll_interval
+        self.model = model
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads = []
+
+    def start(self):
+        requeue_stale_jobs()
+        for i in range(self.size):
+            thread = threading.Thread(target=self._work, name=f"analysis-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def wake(self):
+        self._wakeup.set()
+
+    def stop(self, timeout=None):
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def join(self):
+        for thread in self._threads:
+            thread.join()
+
+    def _work(self):
+        while not self._stopping.is_set():
+            close_old_connections()
+            try:
+                job = claim_next_job()
+            except Exception as e:
+                print(f"Could not claim analysis job: {e}")
+                job = None
+
+            if job is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            run_job(job, model=self.model)
+        close_old_connections()
+
+
+def get_worker_pool():
+    """Return the process-wide worker pool, starting it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = AnalysisWorkerPool(settings.ANALYSIS_WORKERS, settings.ANALYSIS_POLL_INTERVAL)
+            _pool.start()
+    return _pool
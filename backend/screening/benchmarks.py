@@ -0,0 +1,206 @@
+#benchmarks.py
+import json
+import os
+import time
+
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+
+from .ai_module import analyze_resume
+from .fake_llm import StubModel
+from .http_cache import get_response_cache
+from .llm_client import get_llm_client
+from .match_table import rebuild_matches
+from .matching import find_candidates, find_matching_jobs
+from .models import JobPost, Resume
+from .pdf_extract import get_extraction_pool
+from .skill_index import rebuild_index
+from .synthetic import BASE_SKILLS, skill_sets, skill_vocabulary, write_pdf
+
+# Measured latency percentiles, in the order they are reported
+PERCENTILES = (50, 99)
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, -(-len(sorted_values) * p // 100) - 1))
+    return sorted_values[int(index)]
+
+
+class CaseResult:
+    """Latencies of every run of one benchmark case and the wall time of the whole case."""
+
+    def __init__(self, name, latencies, elapsed):
+        self.name = name
+        self.latencies = sorted(latencies)
+        self.elapsed = elapsed
+
+    @property
+    def ops_per_sec(self):
+        return len(self.latencies) / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        data = {'runs': len(self.latencies), 'ops_per_sec': round(self.ops_per_sec, 2)}
+        for p in PERCENTILES:
+            data[f'p{p}_ms'] = round(percentile(self.latencies, p) * 1000, 3)
+        return data
+
+
+def run_case(name, operation, inputs, rounds=1, warmup=1):
+    """
+    Time `operation(value)` once per input, after `warmup` untimed calls.
+
+    The inputs are run `rounds` times and the fastest round is kept, as
+    timeit does, so that noise from other processes is not reported as a
+    regression.
+
+    Returns:
+        CaseResult
+    """
+    for value in inputs[:warmup]:
+        operation(value)
+    best = None
+    for _ in range(rounds):
+        latencies = []
+        started = time.perf_counter()
+        for value in inputs:
+            call_started = time.perf_counter()
+            operation(value)
+            latencies.append(time.perf_counter() - call_started)
+        result = CaseResult(name, latencies, time.perf_counter() - started)
+        if best is None or result.elapsed < best.elapsed:
+            best = result
+    return best
+
+
+def seed_dataset(resumes, jobs, vocabulary_size, rng):
+    """
+    Create `resumes` analyzed resumes and `jobs` job posts whose skills follow
+    the Zipf-like distribution of synthetic.skill_sets, then build the skill
+    index and match table for them in bulk.
+
+    Returns:
+        tuple: (list of resumes, list of job posts)
+    """
+    vocabulary = skill_vocabulary(vocabulary_size, rng)
+    employer, _ = User.objects.get_or_create(username="benchmark-employer")
+    Resume.objects.bulk_create([
+        Resume(candidate_name=f"Candidate {i}", email=f"benchmark{i}@example.com",
+               resume_file=f"resumes/benchmark_{i}.pdf", keywords=", ".join(sorted(skills)),
+               score=rng.randint(1, 10))
+        for i, skills in enumerate(skill_sets(resumes, vocabulary, rng))
+    ], batch_size=500)
+    JobPost.objects.bulk_create([
+        JobPost(employer=employer, title=f"Job {i}", description="Benchmark job", location="Remote",
+                skills_required=", ".join(sorted(skills)))
+        for i, skills in enumerate(skill_sets(jobs, vocabulary, rng, 2, 8))
+    ], batch_size=500)
+    rebuild_index()
+    rebuild_matches()
+    return list(Resume.objects.order_by('id')), list(JobPost.objects.select_related('employer').order_by('id'))
+
+
+def write_resume_pdfs(directory, count, rng, pages=2):
+    """`count` synthetic resume PDFs of `pages` pages each. Returns their paths."""
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"resume_{i}.pdf")
+        write_pdf(path, [
+            [f"Candidate {i}", f"candidate{i}@example.com", "Experience"] +
+            [f"Built services with {', '.join(rng.sample(BASE_SKILLS, 4))} for team {rng.randint(1, 99)}."
+             for _ in range(20)] + ["Skills", ", ".join(rng.sample(BASE_SKILLS, 8))]
+            for _ in range(pages)
+        ])
+        paths.append(path)
+    return paths
+
+
+def run_suite(options, rng, workdir, report=print):
+    """
+    Run every case whose name is in options['cases'] on a freshly seeded dataset.
+
+    Call inside a transaction that is rolled back afterwards; the seeded rows
+    are not cleaned up.
+
+    Returns:
+        list: CaseResult per case run
+    """
+    cases = options['cases']
+    queries = options['queries']
+    rounds = options.get('rounds', 1)
+    resumes, jobs = seed_dataset(options['resumes'], options['jobs'], options['vocabulary'], rng)
+    report(f"seeded {len(resumes)} resumes and {len(jobs)} job posts")
+    sampled_jobs = [rng.choice(jobs) for _ in range(queries)]
+    sampled_resumes = [rng.choice(resumes) for _ in range(queries)]
+    results = []
+
+    if 'find_candidates' in cases:
+        results.append(run_case('find_candidates', find_candidates, sampled_jobs, rounds))
+    if 'find_matching_jobs' in cases:
+        results.append(run_case('find_matching_jobs', find_matching_jobs, sampled_resumes, rounds))
+    if 'recommended_jobs' in cases:
+        client = APIClient()
+
+        def recommended_jobs(resume):
+            # Measure the uncached path: build and serialize on every request
+            get_response_cache().clear()
+            response = client.get(f'/api/resumes/{resume.pk}/recommended_jobs/')
+            if response.status_code != 200:
+                raise RuntimeError(f"recommended_jobs returned HTTP {response.status_code}")
+
+        results.append(run_case('recommended_jobs', recommended_jobs, sampled_resumes, rounds))
+
+    pdfs = write_resume_pdfs(workdir, options['pdfs'], rng) if cases & {'pdf_extract', 'analyze_resume'} else []
+    if 'pdf_extract' in cases:
+        pool = get_extraction_pool()
+        results.append(run_case('pdf_extract', pool.extract, pdfs, rounds))
+    if 'analyze_resume' in cases:
+        model = get_llm_client(StubModel(delay=options['delay']))
+
+        def analyze(path):
+            if analyze_resume(path, analysis_type="full", job_title="Backend Developer", model=model) is None:
+                raise RuntimeError(f"analyze_resume returned nothing for {path}")
+
+        results.append(run_case('analyze_resume', analyze, pdfs, rounds))
+    get_response_cache().clear()
+    return results
+
+
+def load_baseline(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baseline(path, results, config):
+    data = {'config': config, 'results': {result.name: result.summary() for result in results}}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def regressions(results, baseline, threshold):
+    """
+    Measurements more than `threshold` (a fraction, e.g. 0.25) worse than the baseline.
+
+    Latency percentiles regress when they grow and throughput when it drops;
+    cases missing from the baseline are skipped.
+
+    Returns:
+        list: (case, metric, baseline value, current value) tuples
+    """
+    found = []
+    for result in results:
+        before = baseline.get('results', {}).get(result.name)
+        if not before:
+            continue
+        now = result.summary()
+        for metric, value in now.items():
+            if metric == 'runs' or not before.get(metric):
+                continue
+            change = (value - before[metric]) / before[metric]
+            worse = change < -threshold if metric == 'ops_per_sec' else change > threshold
+            if worse:
+                found.append((result.name, metric, before[metric], value))
+    return found
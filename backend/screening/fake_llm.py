@@ -0,0 +1,95 @@
+#fake_llm.py
+import json
+import random
+import threading
+import time
+
+from .llm_backends import FakeResponse, prompt_kind
+
+
+class FakeAPIError(Exception):
+    """Stands in for a google.api_core error; `code` is the HTTP status, as there."""
+
+    def __init__(self, code, message="Injected error"):
+        super().__init__(f"{code} {message}")
+        self.code = code
+
+
+class StubModel:
+    """
+    Offline stand-in for the Gemini model used by benchmarks.
+
+    Answers each analysis prompt with a canned, well-formed reply and records
+    how many calls were made and how many prompt bytes were sent.
+
+    Args:
+        delay (float, optional): Seconds to sleep before every reply.
+        delays (dict, optional): Per prompt kind delays, overriding `delay` (e.g. {'review': 2.0}).
+        combined_reply (str, optional): Overrides the reply to the combined JSON prompt.
+        error_rate (float, optional): Fraction of calls that fail with a FakeAPIError instead of replying.
+        error_code (int, optional): HTTP status of the injected errors; 429 (quota exhausted) by default.
+        seed (int, optional): Seed for choosing which calls fail.
+    """
+
+    def __init__(self, delay=0.0, delays=None, combined_reply=None, error_rate=0.0, error_code=429, seed=None):
+        self.delay = delay
+        self.delays = delays or {}
+        self.combined_reply = combined_reply
+        self.error_rate = error_rate
+        self.error_code = error_code
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self.max_in_flight = 0
+        self.calls = 0
+        self.bytes_sent = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self.calls = 0
+            self.bytes_sent = 0
+            self.max_in_flight = 0
+            self.errors = 0
+
+    def generate_content(self, prompt, **kwargs):
+        kind = prompt_kind(prompt)
+        with self._lock:
+            self.calls += 1
+            self.bytes_sent += len(prompt.encode('utf-8'))
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+            fail = self._rng.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        try:
+            delay = self.delays.get(kind, self.delay)
+            if delay:
+                time.sleep(delay)
+            if fail:
+                raise FakeAPIError(self.error_code)
+            return FakeResponse(self.reply_for(kind))
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def reply_for(self, kind):
+        if kind == 'combined':
+            if self.combined_reply is not None:
+                return self.combined_reply
+            return json.dumps({
+                'keywords': ["Python", "Django", "SQL", "REST APIs"],
+                'score': 7,
+                'review': "Clear structure and relevant experience; quantify achievements more.",
+                'relevance_score': 8,
+                'relevance_tips': "Highlight backend projects that match the role.",
+            })
+        if kind == 'keywords':
+            return "Python, Django, SQL, REST APIs"
+        if kind == 'score':
+            return "7"
+        if kind == 'review':
+            return "Clear structure and relevant experience; quantify achievements more."
+        if kind == 'relevance':
+            return "8\nHighlight backend projects that match the role."
+        return ""
@@ -0,0 +1,98 @@
+#http_cache.py
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.http import http_date, parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from . import versions
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+class ResponseCache:
+    """
+    Per-process LRU cache of serialized response data.
+
+    Keys include the data versions the response was built from, so a change
+    made by any process makes the old entries unreachable; clear() frees them
+    early when the change happened in this process.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return data
+
+    def set(self, key, data):
+        if not self.max_entries:
+            return
+        with self._lock:
+            self._entries[key] = data
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+def get_response_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache(getattr(settings, 'RESPONSE_CACHE_MAX_ENTRIES', 512))
+        return _cache
+
+
+def conditional_response(request, scope, build, depends_on=(versions.RESUMES, versions.JOBS, versions.MATCHES)):
+    """
+    Answer a GET with an ETag and Last-Modified derived from data versions.
+
+    A request whose If-None-Match holds the current ETag gets an empty 304
+    without `build` being called; otherwise the data comes from the response
+    cache, or from `build()` on a miss.
+
+    Args:
+        request: The DRF request.
+        scope (str): Identifies the resource, e.g. "candidates:12".
+        build (callable): Returns the response data.
+        depends_on (tuple, optional): Version names the data is derived from.
+    """
+    values, last_modified = versions.current(*depends_on)
+    etag = quote_etag(f"{scope}-" + ".".join(str(value) for value in values))
+    headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+    if last_modified is not None:
+        headers['Last-Modified'] = http_date(last_modified.timestamp())
+
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    # Cached per URL: the data can hold absolute URLs and depend on ?fields=
+    key = (request.build_absolute_uri(), etag)
+    cache = get_response_cache()
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data)
+    return Response(data, headers=headers)
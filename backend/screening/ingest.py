@@ -0,0 +1,328 @@
+#ingest.py
+import csv
+import json
+import os
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import transaction
+from django.db.models import Max
+
+from . import versions
+from .ai_module import analysis_cache_key, analyze_text
+from .llm_client import TokenBucket
+from .match_table import refresh_changed_matches
+from .models import CandidateMatch, ExtractedText, JobPost, Resume
+from .pdf_extract import get_extraction_pool
+from .skill_index import chunks, index_resumes
+from .text_store import hash_file
+
+# Resume fields written from an analysis result, as apply_analysis does
+ANALYSIS_FIELDS = ['score', 'review', 'relevance_score', 'relevance_tips', 'keywords']
+
+
+class ManifestRow:
+    """One resume of a batch: who it belongs to and where its PDF is."""
+
+    def __init__(self, name, email, path, job_title=None):
+        self.name = name
+        self.email = email
+        self.path = path
+        self.job_title = job_title or None
+        self.content_hash = None
+
+
+def unpack_source(source, workdir):
+    """The directory holding a batch: `source` itself, or `workdir` after extracting a ZIP archive into it."""
+    if os.path.isfile(source) and zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            archive.extractall(workdir)
+        return workdir
+    return source
+
+
+def find_manifest(files_dir):
+    """The first CSV file found under a batch directory, or None."""
+    for root, dirs, files in sorted(os.walk(files_dir)):
+        for name in sorted(files):
+            if name.lower().endswith('.csv'):
+                return os.path.join(root, name)
+    return None
+
+
+def read_manifest(csv_path, files_dir):
+    """
+    Read the CSV describing a batch.
+
+    Columns are name, email and file (a path relative to `files_dir`), plus an
+    optional job_title. Rows without an email are ignored, and a later row for
+    the same email replaces an earlier one, as a repeated upload would.
+
+    Returns:
+        list: ManifestRow per email, in file order.
+    """
+    rows = {}
+    with open(csv_path, newline='', encoding='utf-8-sig') as f:
+        for line in csv.DictReader(f):
+            email = (line.get('email') or '').strip()
+            if not email:
+                continue
+            rows.pop(email, None)
+            rows[email] = ManifestRow(
+                name=(line.get('name') or '').strip(),
+                email=email,
+                path=os.path.join(files_dir, (line.get('file') or '').strip()),
+                job_title=(line.get('job_title') or '').strip(),
+            )
+    return list(rows.values())
+
+
+class RateLimitedModel:
+    """Wraps a Gemini-compatible model so every generate_content() call first takes a token from `bucket`."""
+
+    def __init__(self, model, bucket):
+        self.model = model
+        self.bucket = bucket
+
+    def generate_content(self, prompt, **kwargs):
+        self.bucket.acquire()
+        return self.model.generate_content(prompt, **kwargs)
+
+
+class IngestProgress:
+    """
+    Append-only record of ingested (email, file hash) pairs, so an interrupted
+    run can be restarted and skip what was already saved.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.done = set()
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # a line cut short by the interruption
+                    self.done.add((entry['email'], entry['hash']))
+
+    def is_done(self, row):
+        return (row.email, row.content_hash) in self.done
+
+    def record(self, rows):
+        if not self.path:
+            return
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for row in rows:
+                f.write(json.dumps({'email': row.email, 'hash': row.content_hash}) + "\n")
+                self.done.add((row.email, row.content_hash))
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class ResumeIngestor:
+    """
+    Ingests a batch of resumes end to end: extraction in the process pool,
+    concurrent rate-limited analysis, and bulk upserts by email.
+
+    Args:
+        model: Gemini-compatible model used for the analysis.
+        analysis_type (str, optional): Passed to analyze_text.
+        batch_size (int, optional): Resumes extracted, analyzed and saved together.
+        concurrency (int, optional): Resumes analyzed at the same time.
+        rate (float, optional): Maximum model calls per second, across all threads.
+        cache (optional): AnalysisCache, see analyze_text.
+        pool (optional): ExtractionPool; defaults to the process-wide one.
+        progress_path (str, optional): File recording finished rows, for resuming.
+        report (callable, optional): Receives one progress line per batch, and a line per row that failed.
+    """
+
+    def __init__(self, model, analysis_type="full", batch_size=100, concurrency=4, rate=None, cache=None, pool=None,
+                 progress_path=None, report=print):
+        # A bucket of one token spaces the calls 1/rate seconds apart, with no bursts
+        self.model = RateLimitedModel(model, TokenBucket(rate * 60, capacity=1)) if rate else model
+        self.analysis_type = analysis_type
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.cache = cache
+        self.pool = pool or get_extraction_pool()
+        self.progress = IngestProgress(progress_path)
+        self.report = report
+        self.stats = {'rows': 0, 'skipped': 0, 'saved': 0, 'unreadable': 0, 'unanalyzed': 0}
+
+    def run(self, rows):
+        """Ingest every row not already recorded as done. Returns the stats dict."""
+        started = time.monotonic()
+        self.stats['rows'] = len(rows)
+        pending = []
+        for row in rows:
+            try:
+                row.content_hash = hash_file(row.path)
+            except OSError as e:
+                self.report(f"Skipping {row.email}: {e}")
+                self.stats['unreadable'] += 1
+                continue
+            if self.progress.is_done(row):
+                self.stats['skipped'] += 1
+            else:
+                pending.append(row)
+
+        resume_ids = []
+        processed = 0
+        for batch in chunks(pending, self.batch_size):
+            resume_ids.extend(self._ingest_batch(batch))
+            processed += len(batch)
+            elapsed = time.monotonic() - started
+            rate = processed / elapsed if elapsed else 0
+            remaining = (len(pending) - processed) / rate if rate else 0
+            self.report(f"{processed}/{len(pending)} resumes ({self.stats['unanalyzed']} without analysis, "
+                        f"{self.stats['unreadable']} unreadable), "
+                        f"{rate:.1f}/s, about {remaining:.0f}s left")
+
+        if resume_ids:
+            update_matches(resume_ids)
+        self.stats['elapsed'] = time.monotonic() - started
+        return self.stats
+
+    def _ingest_batch(self, batch):
+        texts = self._texts(batch)
+        readable = [row for row in batch if texts.get(row.content_hash)]
+        self.stats['unreadable'] += len(batch) - len(readable)
+
+        results = self._analyze_batch(readable, texts)
+
+        saved = self._save(readable, texts, results)
+        # Rows whose analysis failed are saved with their text but retried on the next run
+        finished = [row for row, result in zip(readable, results) if result]
+        self.progress.record(finished)
+        self.stats['saved'] += len(finished)
+        self.stats['unanalyzed'] += len(readable) - len(finished)
+        return saved
+
+    def _texts(self, batch):
+        """
+        Map each row's file hash to (ExtractedText id, text), extracting only files never seen before.
+
+        Each PDF has the pool's deadline, so one that hangs is killed and its
+        row counted as unreadable instead of stalling the batch.
+        """
+        hashes = {row.content_hash for row in batch}
+        texts = {}
+        for entry in ExtractedText.objects.filter(content_hash__in=hashes):
+            texts[entry.content_hash] = (entry.pk, entry.text)
+
+        paths = {}
+        for row in batch:
+            if row.content_hash not in texts:
+                paths.setdefault(row.content_hash, row.path)
+        if not paths:
+            return texts
+
+        hash_by_path = {path: content_hash for content_hash, path in paths.items()}
+        entries = []
+        for path, result in self.pool.map(list(paths.values())):
+            if result.error:
+                self.report(f"Error extracting text from {path}: {result.error}")
+            if not result.text:
+                continue
+            entry = ExtractedText(
+                content_hash=hash_by_path[path],
+                page_count=result.page_count,
+                pages_read=len(result.page_timings),
+                stopped=result.stopped,
+                extraction_seconds=result.elapsed,
+            )
+            entry.text = result.text
+            entries.append(entry)
+        ExtractedText.objects.bulk_create(entries, batch_size=100, ignore_conflicts=True)
+        for entry in ExtractedText.objects.filter(content_hash__in=[entry.content_hash for entry in entries]):
+            texts[entry.content_hash] = (entry.pk, entry.text)
+        return texts
+
+    def _analyze_batch(self, rows, texts):
+        """
+        Analysis results in row order (None where it failed).
+
+        The cache is read and written here rather than in the analysis threads,
+        so only model calls run concurrently and the database sees one writer.
+        """
+        results = [None] * len(rows)
+        keys = {}
+        misses = []
+        for index, row in enumerate(rows):
+            if self.cache:
+                keys[index] = analysis_cache_key(self.cache, texts[row.content_hash][1], self.analysis_type,
+                                                 row.job_title, self.model)
+                results[index] = self.cache.get(keys[index])
+            if results[index] is None:
+                misses.append(index)
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            analyzed = executor.map(lambda index: self._analyze(rows[index], texts[rows[index].content_hash][1]), misses)
+            for index, result in zip(misses, analyzed):
+                results[index] = result
+                # Only complete analyses are reused, as in analyze_text
+                if self.cache and result and all(value is not None for value in result.values()):
+                    self.cache.set(keys[index], result, self.analysis_type, rows[index].job_title)
+        return results
+
+    def _analyze(self, row, text):
+        try:
+            return analyze_text(text, analysis_type=self.analysis_type, job_title=row.job_title, model=self.model)
+        except Exception as e:
+            self.report(f"Analysis of {row.email} failed: {e}")
+            return None
+
+    def _save(self, rows, texts, results):
+        """Create or update one Resume per row, keyed by email. Returns the resume ids."""
+        with transaction.atomic():
+            existing = {}
+            for batch in chunks([row.email for row in rows]):
+                existing.update((resume.email, resume) for resume in Resume.objects.filter(email__in=batch))
+
+            created, updated = [], []
+            for row, result in zip(rows, results):
+                resume = existing.get(row.email)
+                if resume is None:
+                    resume = Resume(email=row.email)
+                    created.append(resume)
+                else:
+                    updated.append(resume)
+                resume.candidate_name = row.name or resume.candidate_name
+                resume.job_title = row.job_title
+                resume.extracted_text_id = texts[row.content_hash][0]
+                if result:
+                    for field in ANALYSIS_FIELDS:
+                        setattr(resume, field, result.get(field))
+
+            Resume.objects.bulk_update(updated, ['candidate_name', 'job_title', 'extracted_text'] + ANALYSIS_FIELDS,
+                                       batch_size=500)
+            Resume.objects.bulk_create(created, batch_size=500)
+            if created and created[0].pk is None:
+                # Backends that do not return primary keys from bulk inserts
+                ids = dict(Resume.objects.filter(email__in=[resume.email for resume in created]).values_list('email', 'id'))
+                for resume in created:
+                    resume.pk = ids[resume.email]
+
+            resumes = updated + created
+            index_resumes([(resume.pk, resume.keywords) for resume in resumes])
+        return [resume.pk for resume in resumes]
+
+
+def update_matches(resume_ids):
+    """
+    Bring the match table and matching_score up to date after bulk writes,
+    which bypass the post_save handlers that normally do it.
+    """
+    for job in JobPost.objects.iterator():
+        refresh_changed_matches(job)
+
+    best = {}
+    for batch in chunks(resume_ids):
+        best.update(CandidateMatch.objects.filter(resume_id__in=batch, exact_score__gt=0.3)
+                    .values('resume_id').annotate(best=Max('exact_score')).values_list('resume_id', 'best'))
+    resumes = [Resume(id=resume_id, matching_score=score) for resume_id, score in best.items()]
+    Resume.objects.bulk_update(resumes, ['matching_score'], batch_size=500)
+    versions.bump(versions.RESUMES)
@@ -0,0 +1,255 @@
+#llm_backends.py
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+from django.conf import settings
+
+from .synthetic import BASE_SKILLS
+
+BACKENDS = ("gemini", "heuristic", "replay")
+
+_backend = None
+_backend_built = False
+_backend_lock = threading.Lock()
+
+SECTIONS = ("experience", "education", "skills", "projects", "summary")
+
+
+class FakeResponse:
+    """A reply holding just its text, shaped like a Gemini response, for backends that do not call Gemini."""
+
+    def __init__(self, text):
+        self.text = text
+
+
+class ReplayMiss(LookupError):
+    """No recorded reply for a prompt. Carries a 404 `code` so the LLM client does not retry it."""
+    code = 404
+
+
+def prompt_hash(prompt):
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+
+RESUME_MARKER = "Resume Text:\n"
+
+
+def prompt_instructions(prompt):
+    """The instructions of an analysis prompt, before the resume text (which may quote anything)."""
+    index = prompt.find(RESUME_MARKER)
+    return prompt[:index] if index != -1 else prompt
+
+
+def prompt_resume_text(prompt):
+    """The resume text embedded at the end of an analysis prompt."""
+    index = prompt.find(RESUME_MARKER)
+    return prompt[index + len(RESUME_MARKER):] if index != -1 else prompt
+
+
+def prompt_job_title(prompt):
+    match = re.search(r'job title "([^"]*)"', prompt_instructions(prompt))
+    return match.group(1) if match else None
+
+
+def prompt_kind(prompt):
+    """Which analysis prompt this is: combined, keywords, score, review or relevance."""
+    instructions = prompt_instructions(prompt)
+    if "JSON object" in instructions:
+        return 'combined'
+    if "comma-separated list of keywords" in instructions:
+        return 'keywords'
+    if "single integer between 1 and 10" in instructions:
+        return 'score'
+    if "plain text review" in instructions:
+        return 'review'
+    if "relevance score" in instructions:
+        return 'relevance'
+    return None
+
+
+class GeminiBackend:
+    """Google Gemini. The client library is imported and configured only when the backend is built."""
+
+    def __init__(self, api_key, model_name):
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self.name = f"gemini:{model_name}"
+        self.model = genai.GenerativeModel(model_name)
+
+    def generate_content(self, prompt, **kwargs):
+        return self.model.generate_content(prompt, **kwargs)
+
+
+class HeuristicBackend:
+    """
+    Deterministic local stand-in for the LLM.
+
+    Keywords are the known skills found in the resume text, and scores are
+    derived from skill count, length and section headings, so the same prompt
+    always gets the same well-formed reply. Meant for offline benchmarks,
+    CI and capacity planning, not for judging resumes.
+
+    Args:
+        vocabulary (list, optional): Skills to look for; defaults to synthetic.BASE_SKILLS.
+        delay (float, optional): Seconds to sleep per call, to simulate provider latency.
+    """
+
+    name = "heuristic"
+
+    def __init__(self, vocabulary=None, delay=0.0):
+        self.vocabulary = sorted(vocabulary or BASE_SKILLS)
+        self.delay = delay
+        self._patterns = [(skill, re.compile(r'(?<![\w+#.])' + re.escape(skill) + r'(?![\w+#])'))
+                          for skill in self.vocabulary]
+
+    def keywords(self, text):
+        lowered = text.lower()
+        return [skill for skill, pattern in self._patterns if pattern.search(lowered)]
+
+    def score(self, text):
+        lowered = text.lower()
+        words = len(text.split())
+        points = min(len(self.keywords(text)), 5)
+        points += 2 if 250 <= words <= 900 else 1 if words >= 100 else 0
+        points += min(sum(1 for section in SECTIONS if section in lowered), 3)
+        return max(1, min(10, points))
+
+    def review(self, text):
+        skills = self.keywords(text)
+        missing = [section for section in SECTIONS[:3] if section not in text.lower()]
+        parts = [f"The resume lists {len(skills)} recognised skills in about {len(text.split())} words."]
+        if missing:
+            parts.append(f"Add clear {', '.join(missing)} sections.")
+        else:
+            parts.append("Its structure is clear; quantify achievements where possible.")
+        return " ".join(parts)
+
+    def relevance(self, text, job_title):
+        title_words = [word for word in re.findall(r'\w+', (job_title or "").lower()) if len(word) > 2]
+        if not title_words:
+            return 0, "Name the target role so the resume can be compared with it."
+        lowered = text.lower()
+        found = [word for word in title_words if word in lowered]
+        missing = [word for word in title_words if word not in lowered]
+        relevance_score = round(10 * len(found) / len(title_words))
+        if missing:
+            return relevance_score, f"Mention experience related to {', '.join(missing)} to match the role."
+        return relevance_score, "Lead with the projects closest to the role."
+
+    def reply(self, prompt):
+        kind = prompt_kind(prompt)
+        text = prompt_resume_text(prompt)
+        if kind == 'keywords':
+            return ", ".join(self.keywords(text))
+        if kind == 'score':
+            return str(self.score(text))
+        if kind == 'review':
+            return self.review(text)
+        if kind == 'relevance':
+            relevance_score, tips = self.relevance(text, prompt_job_title(prompt))
+            return f"{relevance_score}\n{tips}"
+        if kind == 'combined':
+            data = {
+                'keywords': self.keywords(text),
+                'score': self.score(text),
+                'review': self.review(text),
+            }
+            if '"relevance_score"' in prompt:
+                data['relevance_score'], data['relevance_tips'] = self.relevance(text, prompt_job_title(prompt))
+            return json.dumps(data)
+        return ""
+
+    def generate_content(self, prompt, **kwargs):
+        if self.delay:
+            time.sleep(self.delay)
+        return FakeResponse(self.reply(prompt))
+
+
+class ReplayBackend:
+    """
+    Answers prompts with replies recorded earlier by RecordingBackend, keyed by the prompt's SHA-256.
+
+    Prompts that were never recorded go to `fallback` if one is given, and
+    otherwise raise ReplayMiss.
+    """
+
+    name = "replay"
+
+    def __init__(self, path, fallback=None):
+        self.path = path
+        self.fallback = fallback
+        self.replies = {}
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self.replies[entry['prompt_sha256']] = entry['reply']
+
+    def generate_content(self, prompt, **kwargs):
+        reply = self.replies.get(prompt_hash(prompt))
+        if reply is not None:
+            return FakeResponse(reply)
+        if self.fallback is not None:
+            return self.fallback.generate_content(prompt, **kwargs)
+        raise ReplayMiss(f"No recorded reply for prompt {prompt_hash(prompt)[:12]}")
+
+
+class RecordingBackend:
+    """Passes prompts to another backend and appends every reply to a JSONL file that ReplayBackend can load."""
+
+    def __init__(self, backend, path):
+        self.backend = backend
+        self.name = getattr(backend, 'name', type(backend).__name__)
+        self.path = path
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt, **kwargs):
+        response = self.backend.generate_content(prompt, **kwargs)
+        entry = {'prompt_sha256': prompt_hash(prompt), 'kind': prompt_kind(prompt), 'reply': response.text}
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + "\n")
+        return response
+
+
+def build_backend(name):
+    """
+    Create the backend called `name` from settings.
+
+    Returns:
+        The backend, or None for "gemini" when GEMINI_API_KEY is not set.
+    """
+    if name == "gemini":
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        api_key = os.environ.get('GEMINI_API_KEY')
+        if not api_key:
+            print("Gemini API key not set in environment variables (GEMINI_API_KEY).")
+            return None
+        backend = GeminiBackend(api_key, settings.LLM_GEMINI_MODEL)
+    elif name == "heuristic":
+        backend = HeuristicBackend(delay=settings.LLM_HEURISTIC_DELAY)
+    elif name == "replay":
+        fallback = build_backend(settings.LLM_REPLAY_FALLBACK) if settings.LLM_REPLAY_FALLBACK else None
+        backend = ReplayBackend(settings.LLM_REPLAY_FILE, fallback=fallback)
+    else:
+        raise ValueError(f"Unknown LLM backend: {name} (expected one of {', '.join(BACKENDS)})")
+
+    if settings.LLM_RECORD_FILE and name != "replay":
+        backend = RecordingBackend(backend, settings.LLM_RECORD_FILE)
+    return backend
+
+
+def get_backend():
+    """The process-wide backend selected by settings.LLM_BACKEND, built on first use."""
+    global _backend, _backend_built
+    with _backend_lock:
+        if not _backend_built:
+            _backend = build_backend(settings.LLM_BACKEND)
+            _backend_built = True
+        return _backend
@@ -0,0 +1,308 @@
+#llm_client.py
+import random
+import threading
+import time
+import weakref
+
+from django.conf import settings
+
+# HTTP statuses worth retrying: quota exhausted and transient provider errors
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+
+_clients = weakref.WeakKeyDictionary()
+_clients_lock = threading.Lock()
+
+
+class LLMUnavailable(Exception):
+    """The provider could not answer: retries ran out, the rate limit wait was too long, or the circuit is open."""
+
+
+class CircuitOpenError(LLMUnavailable):
+    pass
+
+
+def error_status(error):
+    """The HTTP status of a provider error (google.api_core errors carry it as `code`), or None."""
+    code = getattr(error, 'code', None)
+    try:
+        return int(code)
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error):
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    return error_status(error) in RETRYABLE_STATUSES
+
+
+def estimate_tokens(prompt):
+    """Rough token count of a prompt (about four characters per token), used for the tokens-per-minute budget."""
+    return max(1, len(prompt) // 4)
+
+
+class TokenBucket:
+    """
+    Allows `per_minute` units per minute on average, with bursts up to
+    `capacity` (one minute's worth by default). Safe to share between threads.
+    """
+
+    def __init__(self, per_minute, capacity=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.tokens = float(self.capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, amount=1, max_wait=None):
+        """
+        Take `amount` units, sleeping until they are available.
+
+        Returns:
+            float: Seconds spent waiting, or None if that would exceed `max_wait` (nothing is taken).
+        """
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                delay = (amount - self.tokens) / self.rate
+            if max_wait is not None and waited + delay > max_wait:
+                return None
+            self._sleep(delay)
+            waited += delay
+
+
+class CircuitBreaker:
+    """
+    Fails fast after `failure_threshold` consecutive provider failures.
+
+    While open, calls are rejected for `reset_timeout` seconds; then one trial
+    call is let through (half-open) and its outcome closes or reopens the circuit.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold, reset_timeout, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._clock = clock
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Raise CircuitOpenError unless a call may go out now."""
+        with self._lock:
+            if self.state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_running = False
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return
+            raise CircuitOpenError("LLM provider circuit is open after repeated failures")
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_running = False
+
+    def release(self):
+        """The call said nothing about the provider: keep the state and count, but free the half-open trial."""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = self._clock()
+            self._trial_running = False
+
+
+class LLMMetrics:
+    """Counters and latency totals for the calls made through one client."""
+
+    def __init__(self):
+        self.requests = 0
+        self.successes = 0
+        self.failures = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.circuit_rejections = 0
+        self.throttled_seconds = 0.0
+        self.latency_seconds = 0.0
+        self.max_latency = 0.0
+        self.tokens = 0
+        self._lock = threading.Lock()
+
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def observe_latency(self, seconds):
+        with self._lock:
+            self.latency_seconds += seconds
+            self.max_latency = max(self.max_latency, seconds)
+
+    def snapshot(self):
+        with self._lock:
+            attempts = self.successes + self.failures + self.retries
+            return {
+                'requests': self.requests,
+                'successes': self.successes,
+                'failures': self.failures,
+                'retries': self.retries,
+                'rate_limited': self.rate_limited,
+                'circuit_rejections': self.circuit_rejections,
+                'throttled_seconds': round(self.throttled_seconds, 3),
+                'avg_latency': round(self.latency_seconds / attempts, 4) if attempts else 0.0,
+                'max_latency': round(self.max_latency, 4),
+                'tokens': self.tokens,
+            }
+
+
+class LLMClient:
+    """
+    Wraps a Gemini-compatible model with client-side rate limiting, retries
+    with exponential backoff and jitter, a circuit breaker, and metrics.
+
+    It has the model's generate_content() interface, so it can be passed
+    wherever ai_module expects a model.
+
+    Args:
+        model: Object with a Gemini-compatible generate_content().
+        requests_per_minute (int): Request budget of the token bucket.
+        tokens_per_minute (int): Prompt token budget, estimated from prompt length.
+        max_retries (int): Retries of a retryable error before giving up.
+        backoff_base (float): Delay before the first retry, doubled for each further one.
+        backoff_max (float): Upper bound of any single retry delay.
+        max_wait (float): Longest a call may wait for the rate limiter before failing.
+        breaker (CircuitBreaker): Shared failure state.
+    """
+
+    def __init__(self, model, requests_per_minute, tokens_per_minute, max_retries, backoff_base, backoff_max,
+                 max_wait, breaker, sleep=time.sleep, rng=None):
+        self.model = model
+        self.requests = TokenBucket(requests_per_minute, sleep=sleep)
+        self.tokens = TokenBucket(tokens_per_minute, sleep=sleep)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_wait = max_wait
+        self.breaker = breaker
+        self.metrics = LLMMetrics()
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+
+    def backoff(self, attempt):
+        """Full-jitter delay before retry number `attempt` (1-based)."""
+        return self._rng.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+    def _throttle(self, prompt):
+        tokens = estimate_tokens(prompt)
+        waited = self.requests.acquire(1, self.max_wait)
+        if waited is not None:
+            token_wait = self.tokens.acquire(tokens, self.max_wait - waited)
+            waited = None if token_wait is None else waited + token_wait
+        if waited is None:
+            raise LLMUnavailable(f"Rate limit wait would exceed {self.max_wait}s")
+        self.metrics.add(throttled_seconds=waited, tokens=tokens)
+
+    def generate_content(self, prompt, **kwargs):
+        self.metrics.add(requests=1)
+        attempt = 0
+        while True:
+            try:
+                self.breaker.allow()
+            except CircuitOpenError:
+                self.metrics.add(circuit_rejections=1)
+                raise
+            self._throttle(prompt)
+
+            started = time.monotonic()
+            try:
+                response = self.model.generate_content(prompt, **kwargs)
+            except Exception as e:
+                self.metrics.observe_latency(time.monotonic() - started)
+                if error_status(e) == 429:
+                    self.metrics.add(rate_limited=1)
+                if not is_retryable(e):
+                    # The request itself is bad, which proves nothing either way about the provider
+                    self.breaker.release()
+                    self.metrics.add(failures=1)
+                    raise
+                self.breaker.record_failure()
+                attempt += 1
+                if attempt > self.max_retries:
+                    self.metrics.add(failures=1)
+                    raise LLMUnavailable(f"LLM call failed after {self.max_retries} retries: {e}") from e
+                self.metrics.add(retries=1)
+                self._sleep(self.backoff(attempt))
+                continue
+
+            self.metrics.observe_latency(time.monotonic() - started)
+            self.breaker.record_success()
+            self.metrics.add(successes=1)
+            return response
+
+
+def aggregate_metrics():
+    """The metrics of every live client summed, for the process-wide totals."""
+    with _clients_lock:
+        clients = list(_clients.values())
+    totals = {}
+    for client in clients:
+        for name, value in client.metrics.snapshot().items():
+            if name == 'max_latency':
+                totals[name] = max(totals.get(name, 0.0), value)
+            elif name != 'avg_latency':
+                totals[name] = totals.get(name, 0) + value
+    return totals
+
+
+def client_from_settings(model, sleep=time.sleep):
+    return LLMClient(
+        model,
+        requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+        tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+        max_retries=settings.LLM_MAX_RETRIES,
+        backoff_base=settings.LLM_BACKOFF_BASE,
+        backoff_max=settings.LLM_BACKOFF_MAX,
+        max_wait=settings.LLM_MAX_WAIT,
+        breaker=CircuitBreaker(settings.LLM_BREAKER_FAILURES, settings.LLM_BREAKER_RESET),
+        sleep=sleep,
+    )
+
+
+def get_llm_client(model):
+    """
+    The process-wide client wrapping `model`, so every caller of the same model
+    shares one rate limit, circuit breaker and set of metrics.
+
+    A model that is already an LLMClient is returned unchanged.
+    """
+    if model is None or isinstance(model, LLMClient):
+        return model
+    with _clients_lock:
+        client = _clients.get(model)
+        if client is None:
+            client = _clients[model] = client_from_settings(model)
+        return client
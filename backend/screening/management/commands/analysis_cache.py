@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Sum
+
+from screening.analysis_cache import AnalysisCache
+from screening.models import AnalysisCacheEntry
+
+
+class Command(BaseCommand):
+    help = "Inspect or maintain the resume analysis cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['stats', 'evict', 'clear'])
+
+    def handle(self, *args, **options):
+        cache = AnalysisCache(settings.ANALYSIS_CACHE_TTL, settings.ANALYSIS_CACHE_MAX_ENTRIES)
+
+        if options['action'] == 'evict':
+            self.stdout.write(f"Evicted {cache.evict()} entries.")
+        elif options['action'] == 'clear':
+            self.stdout.write(f"Removed {cache.clear()} entries.")
+
+        entries = AnalysisCacheEntry.objects.count()
+        hits = AnalysisCacheEntry.objects.aggregate(total=Sum('hits'))['total'] or 0
+        self.stdout.write(f"Entries: {entries} (max {settings.ANALYSIS_CACHE_MAX_ENTRIES}, "
+                          f"ttl {settings.ANALYSIS_CACHE_TTL}s), lifetime hits: {hits}")
@@ -0,0 +1,118 @@
+import csv
+import os
+import random
+import tempfile
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from screening.analysis_queue import AnalysisWorkerPool
+from screening.fake_llm import StubModel
+from screening.ingest import ResumeIngestor, read_manifest
+from screening.models import AnalysisJob, ExtractedText, Resume
+from screening.pdf_extract import ExtractionPool, get_extraction_pool
+from screening.synthetic import BASE_SKILLS, write_pdf
+from screening.text_store import hash_file
+
+
+class Rollback(Exception):
+    pass
+
+
+def write_batch(directory, count, rng, domain="example.com"):
+    """`count` synthetic resume PDFs plus the CSV manifest describing them. Returns the CSV path."""
+    csv_path = os.path.join(directory, 'resumes.csv')
+    with open(csv_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['name', 'email', 'file'])
+        for i in range(count):
+            pages = [
+                [f"Candidate {i}", f"candidate{i}@example.com", "Experience"] +
+                [f"Built services with {', '.join(rng.sample(BASE_SKILLS, 4))} for team {rng.randint(1, 99)}."
+                 for _ in range(20)]
+                for _ in range(2)
+            ]
+            write_pdf(os.path.join(directory, f"resume_{i}.pdf"), pages)
+            writer.writerow([f"Candidate {i}", f"candidate{i}@{domain}", f"resume_{i}.pdf"])
+    return csv_path
+
+
+class Command(BaseCommand):
+    help = ("Compare ingesting a batch one POST /api/resumes/ request at a time with the ingest_resumes pipeline, "
+            "using a stubbed model. Nothing is kept in the database.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--resumes', type=int, default=200)
+        parser.add_argument('--delay', type=float, default=0.05, help="Simulated seconds per model call.")
+        parser.add_argument('--concurrency', type=int, default=8,
+                            help="Resumes analyzed at once: analysis workers of the per-request path, "
+                                 "analysis threads of the bulk path.")
+        parser.add_argument('--workers', type=int, default=2, help="Extraction processes for the bulk path.")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        with tempfile.TemporaryDirectory() as batch_dir, tempfile.TemporaryDirectory() as media_root, \
+                override_settings(MEDIA_ROOT=media_root, ANALYSIS_WORKERS=0, ANALYSIS_CACHE_ENABLED=False):
+            # The per-request path commits, so its rows get addresses no real resume has
+            csv_path = write_batch(batch_dir, options['resumes'], rng, f"{uuid.uuid4().hex[:12]}.benchmark.invalid")
+            rows = read_manifest(csv_path, batch_dir)
+            pool = ExtractionPool(options['workers'], 25, 30000, 10 * 1024 * 1024, 30)
+            # Start the worker processes of both paths outside the timings
+            pool.extract(rows[0].path)
+            get_extraction_pool().extract(rows[0].path)
+
+            per_request = self.run_per_request(rows, StubModel(delay=options['delay']), options['concurrency'])
+            bulk = self.run_bulk(rows, StubModel(delay=options['delay']), options['concurrency'], pool)
+            pool.shutdown()
+
+        count = len(rows)
+        self.stdout.write(f"{'path':<14}{'seconds':>10}{'resumes/s':>12}")
+        for name, elapsed in [('per-request', per_request), ('bulk', bulk)]:
+            self.stdout.write(f"{name:<14}{elapsed:>10.2f}{count / elapsed:>12.1f}")
+        self.stdout.write(f"bulk ingestion is {per_request / bulk:.1f}x faster")
+
+    def run_per_request(self, rows, model, concurrency):
+        """
+        Upload each PDF through the API while `concurrency` analysis workers drain the queue.
+
+        The workers write from their own connections, so this path cannot run
+        inside a rolled back transaction; its rows are deleted afterwards instead.
+        """
+        client = APIClient()
+        emails = [row.email for row in rows]
+        hashes = {hash_file(row.path) for row in rows}
+        known_hashes = set(ExtractedText.objects.filter(content_hash__in=hashes).values_list('content_hash', flat=True))
+        workers = AnalysisWorkerPool(concurrency, poll_interval=0.01, model=model)
+        started = time.perf_counter()
+        workers.start()
+        try:
+            for row in rows:
+                with open(row.path, 'rb') as f:
+                    client.post('/api/resumes/', {'candidate_name': row.name, 'email': row.email, 'resume_file': f},
+                                format='multipart')
+            pending = AnalysisJob.objects.filter(resume__email__in=emails, status__in=['queued', 'running'])
+            while pending.exists():
+                time.sleep(0.01)
+            elapsed = time.perf_counter() - started
+        finally:
+            workers.stop()
+            Resume.objects.filter(email__in=emails).delete()
+            # Otherwise the bulk path would find the texts already extracted
+            ExtractedText.objects.filter(content_hash__in=hashes - known_hashes).delete()
+        return elapsed
+
+    def run_bulk(self, rows, model, concurrency, pool):
+        started = time.perf_counter()
+        try:
+            with transaction.atomic():
+                ResumeIngestor(model, concurrency=concurrency, pool=pool, report=lambda line: None).run(rows)
+                elapsed = time.perf_counter() - started
+                raise Rollback
+        except Rollback:
+            pass
+        return elapsed
@@ -0,0 +1,129 @@
+import random
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from screening.scoring import SkillMatrix, jaccard, top_k
+from screening.substring_index import SubstringIndex
+from screening.synthetic import skill_sets, skill_vocabulary
+
+
+def per_pair_candidates(job_keywords, resume_sets, limit=30):
+    """The original find_candidates loop: one resume at a time with Python sets."""
+    job_keywords_set = set(job_keywords)
+    matches = []
+    for row, resume_keywords in enumerate(resume_sets):
+        exact_score = jaccard(resume_keywords, job_keywords_set)
+        partial_matches = 0
+        for job_keyword in job_keywords:
+            for resume_keyword in resume_keywords:
+                if job_keyword in resume_keyword or resume_keyword in job_keyword:
+                    partial_matches += 1
+                    break
+        combined_score = (exact_score * 0.7) + (partial_matches / len(job_keywords) * 0.3)
+        if combined_score > 0.05:
+            matches.append((combined_score, -row))
+    matches.sort(reverse=True)
+    return [(-row, score) for score, row in matches[:limit]]
+
+
+def vectorized_candidates(job_keywords, matrix, substrings, column, limit=30):
+    """The same ranking through SkillMatrix, with related skills looked up in the substring index."""
+    job_skill_ids = [column[keyword] for keyword in set(job_keywords)]
+    exact_scores = matrix.jaccard(job_skill_ids)
+    partial_matches = np.zeros(len(matrix), dtype=np.int64)
+    for job_keyword in set(job_keywords):
+        related = substrings.related(job_keyword)
+        partial_matches += matrix.contains_any(related) * job_keywords.count(job_keyword)
+    combined_scores = (exact_scores * 0.7) + (partial_matches / len(job_keywords) * 0.3)
+    best = top_k(combined_scores, limit, 0.05, -matrix.row_ids)
+    return [(int(matrix.row_ids[i]), float(combined_scores[i])) for i in best]
+
+
+def per_pair_jobs(resume_keywords, job_sets):
+    """The original find_matching_jobs loop."""
+    matches = [(jaccard(resume_keywords, job), -row) for row, job in enumerate(job_sets)]
+    matches = sorted((m for m in matches if m[0] > 0.3), reverse=True)
+    return [(-row, score) for score, row in matches[:5]]
+
+
+def vectorized_jobs(resume_keywords, matrix, column):
+    scores = matrix.jaccard([column[k] for k in resume_keywords])
+    best = top_k(scores, 5, 0.3, -matrix.row_ids)
+    return [(int(matrix.row_ids[i]), float(scores[i])) for i in best]
+
+
+class Command(BaseCommand):
+    help = "Compare per-pair and vectorized job/resume matching on synthetic data."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000],
+                            help="Resume counts to benchmark.")
+        parser.add_argument('--jobs', type=int, default=2000, help="Number of job posts.")
+        parser.add_argument('--vocabulary', type=int, default=3000, help="Distinct skills.")
+        parser.add_argument('--queries', type=int, default=5, help="Jobs/resumes queried per size.")
+        parser.add_argument('--seed', type=int, default=7)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        vocabulary = skill_vocabulary(options['vocabulary'], rng)
+        column = {name: i for i, name in enumerate(vocabulary)}
+        job_sets = skill_sets(options['jobs'], vocabulary, rng, 2, 8)
+        job_matrix = SkillMatrix.from_sets(range(len(job_sets)), [[column[s] for s in job] for job in job_sets])
+
+        started = time.perf_counter()
+        substrings = SubstringIndex((i, name) for i, name in enumerate(vocabulary))
+        built = time.perf_counter() - started
+        self._compare_related(vocabulary, substrings, job_sets, built)
+
+        self.stdout.write(f"{'resumes':>9} {'query':<16}{'per-pair ms':>12}{'vectorized ms':>15}{'speedup':>9}")
+        for size in options['sizes']:
+            resume_sets = skill_sets(size, vocabulary, rng)
+            matrix = SkillMatrix.from_sets(range(size), [[column[s] for s in skills] for skills in resume_sets])
+            queries = rng.sample(range(len(job_sets)), options['queries'])
+
+            slow = fast = 0.0
+            for query in queries:
+                job_keywords = sorted(job_sets[query])
+                started = time.perf_counter()
+                expected = per_pair_candidates(job_keywords, resume_sets)
+                slow += time.perf_counter() - started
+                started = time.perf_counter()
+                actual = vectorized_candidates(job_keywords, matrix, substrings, column)
+                fast += time.perf_counter() - started
+                if actual != expected:
+                    raise CommandError(f"find_candidates results differ for job {query}")
+            self._report(size, "job -> resumes", slow, fast, len(queries))
+
+            slow = fast = 0.0
+            for query in rng.sample(range(size), options['queries']):
+                started = time.perf_counter()
+                expected = per_pair_jobs(resume_sets[query], job_sets)
+                slow += time.perf_counter() - started
+                started = time.perf_counter()
+                actual = vectorized_jobs(resume_sets[query], job_matrix, column)
+                fast += time.perf_counter() - started
+                if actual != expected:
+                    raise CommandError(f"find_matching_jobs results differ for resume {query}")
+            self._report(size, "resume -> jobs", slow, fast, options['queries'])
+
+    def _compare_related(self, vocabulary, substrings, job_sets, built):
+        """Time related-skill lookups: full vocabulary scan vs the substring index."""
+        keywords = sorted(set().union(*job_sets))
+        started = time.perf_counter()
+        scanned = {k: {i for i, name in enumerate(vocabulary) if k in name or name in k} for k in keywords}
+        scan = time.perf_counter() - started
+        started = time.perf_counter()
+        indexed = {k: substrings.related(k) for k in keywords}
+        lookup = time.perf_counter() - started
+        if scanned != indexed:
+            raise CommandError("Substring index disagrees with the vocabulary scan")
+        self.stdout.write(
+            f"related skills for {len(keywords)} keywords over {len(vocabulary)} skills: "
+            f"scan {scan * 1000:.1f} ms, index {lookup * 1000:.1f} ms (built in {built * 1000:.1f} ms)"
+        )
+
+    def _report(self, size, label, slow, fast, queries):
+        slow_ms, fast_ms = slow / queries * 1000, fast / queries * 1000
+        self.stdout.write(f"{size:>9} {label:<16}{slow_ms:>12.2f}{fast_ms:>15.2f}{slow_ms / fast_ms:>8.1f}x")
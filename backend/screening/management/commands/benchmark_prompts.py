@@ -0,0 +1,85 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from screening.ai_module import PROMPT_MODES, analyze_text
+from screening.fake_llm import StubModel
+from screening.llm_client import LLMUnavailable, get_llm_client
+from screening.text_prep import get_token_savings
+
+SKILLS = [
+    "Python", "Django", "Flask", "SQL", "PostgreSQL", "Docker", "Kubernetes", "AWS", "React",
+    "JavaScript", "TypeScript", "Java", "Spring", "Go", "Terraform", "Pandas", "Machine Learning",
+]
+
+
+def synthetic_resume_text(rng, paragraphs):
+    """Resume text shaped like PyPDF2 output: ragged spacing and a header and footer repeated on every page."""
+    header = ["Jane Doe  -  Software Engineer", "jane@example.com  |  +1 555 0100"]
+    lines = header + ["", "Summary", "Backend engineer who likes   well-tested services.", "", "Experience"]
+    for i in range(paragraphs):
+        skills = ", ".join(rng.sample(SKILLS, 4))
+        lines.append(f"Company {i}: built and maintained services using {skills}, "
+                     f"improving throughput by {rng.randint(5, 60)}% for {rng.randint(2, 40)} teams.  ")
+        if i % 8 == 7:
+            lines += ["", "", "Confidential - generated with ResumeBuilder", ""] + header
+    lines += ["", "Education", "BSc Computer Science, 2015", "", "Skills", ", ".join(SKILLS)]
+    return "\n".join(lines)
+
+
+class Command(BaseCommand):
+    help = "Compare LLM calls and prompt bytes per resume for each prompt mode, using a stubbed model."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--resumes', type=int, default=50, help="Number of synthetic resumes to analyze.")
+        parser.add_argument('--paragraphs', type=int, default=20, help="Experience paragraphs per resume.")
+        parser.add_argument('--delay', type=float, default=0.0, help="Simulated seconds per model call.")
+        parser.add_argument('--error-rate', type=float, default=0.0,
+                            help="Fraction of model calls failing with a 429, retried by the LLM client.")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--no-trim', action='store_true', help="Send the raw resume text, as before trimming.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        texts = [synthetic_resume_text(rng, options['paragraphs']) for _ in range(options['resumes'])]
+
+        results = {}
+        metrics = {}
+        savings = {}
+        for mode in PROMPT_MODES:
+            get_token_savings().reset()
+            model = StubModel(delay=options['delay'], error_rate=options['error_rate'], seed=options['seed'])
+            client = get_llm_client(model)
+            started = time.perf_counter()
+            for text in texts:
+                try:
+                    with override_settings(PROMPT_TRIMMING=not options['no_trim']):
+                        analyze_text(text, analysis_type="full", job_title="Backend Engineer", prompt_mode=mode,
+                                     model=client)
+                except LLMUnavailable as e:
+                    self.stdout.write(f"{mode}: {e}")
+            elapsed = time.perf_counter() - started
+            results[mode] = (model.calls, model.bytes_sent, elapsed)
+            metrics[mode] = client.metrics.snapshot()
+            savings[mode] = get_token_savings().snapshot()
+
+        count = len(texts)
+        self.stdout.write(f"{'mode':<10}{'calls/resume':>14}{'bytes/resume':>14}{'ms/resume':>12}")
+        for mode, (calls, bytes_sent, elapsed) in results.items():
+            self.stdout.write(f"{mode:<10}{calls / count:>14.2f}{bytes_sent / count:>14.0f}{elapsed / count * 1000:>12.2f}")
+
+        separate, combined = results['separate'], results['combined']
+        self.stdout.write(
+            f"combined vs separate: {separate[0] / combined[0]:.1f}x fewer calls, "
+            f"{separate[1] / combined[1]:.1f}x fewer bytes"
+        )
+        for mode, snapshot in savings.items():
+            if snapshot['prompts']:
+                self.stdout.write(
+                    f"{mode} trimming: {snapshot['tokens_saved'] / count:.0f} resume tokens saved per request "
+                    f"({snapshot['tokens_after'] / count:.0f} sent of {snapshot['tokens_before'] / count:.0f})"
+                )
+        for mode, snapshot in metrics.items():
+            self.stdout.write(f"{mode} client: " + ", ".join(f"{name}={value}" for name, value in snapshot.items()))
@@ -0,0 +1,152 @@
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from screening.management.commands.benchmark_ingestion import write_batch
+
+SERVERS = {
+    # Sync workers: each handles one request at a time
+    'wsgi': ['gunicorn', 'resume_portal.wsgi', '--workers', '{workers}', '--bind', '127.0.0.1:{port}',
+             '--timeout', '120'],
+    # Async workers: a request waiting on the analysis holds no worker
+    'asgi': ['uvicorn', 'resume_portal.asgi:application', '--workers', '{workers}', '--port', '{port}',
+             '--log-level', 'warning'],
+}
+
+
+class Command(BaseCommand):
+    help = ("Measure how many uploads a server can have waiting on the LLM at once. Starts gunicorn (WSGI) "
+            "and uvicorn (ASGI) in turn against a scratch database, with the heuristic backend slowed down "
+            "to stand in for Gemini, and sends concurrent POST /api/resumes/upload/?wait= requests.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--servers', nargs='+', choices=sorted(SERVERS), default=['wsgi', 'asgi'])
+        parser.add_argument('--requests', type=int, default=32)
+        parser.add_argument('--concurrency', type=int, default=16, help="Uploads in flight at once.")
+        parser.add_argument('--workers', type=int, default=2, help="Server worker processes.")
+        parser.add_argument('--analysis-workers', type=int, default=8, help="Analysis threads per process.")
+        parser.add_argument('--delay', type=float, default=0.5, help="Simulated seconds per LLM call.")
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        results = []
+        with tempfile.TemporaryDirectory() as workdir:
+            csv_path = write_batch(workdir, options['requests'], random.Random(options['seed']))
+            pdfs = sorted(os.path.join(workdir, name) for name in os.listdir(workdir) if name.endswith('.pdf'))
+            for name in options['servers']:
+                server_dir = os.path.join(workdir, name)
+                os.makedirs(server_dir)
+                with self.server(name, server_dir, options) as base_url:
+                    results.append((name, self.run_load(base_url, pdfs, options)))
+            os.remove(csv_path)
+
+        self.stdout.write(f"{options['requests']} uploads, {options['concurrency']} at a time, "
+                          f"{options['workers']} server processes, {options['delay']}s per LLM call")
+        self.stdout.write(f"{'server':<8}{'ok':>6}{'errors':>8}{'seconds':>10}{'uploads/s':>11}"
+                          f"{'p50 s':>8}{'p95 s':>8}{'max s':>8}")
+        for name, result in results:
+            latencies = sorted(result['latencies']) or [0.0]
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            self.stdout.write(f"{name:<8}{len(result['latencies']):>6}{sum(result['errors'].values()):>8}"
+                              f"{result['elapsed']:>10.2f}{len(result['latencies']) / result['elapsed']:>11.2f}"
+                              f"{statistics.median(latencies):>8.2f}{p95:>8.2f}{latencies[-1]:>8.2f}")
+            for error, count in result['errors'].most_common():
+                self.stdout.write(f"    {count} x {error}")
+
+    def server(self, name, server_dir, options):
+        return ServerProcess(name, server_dir, options)
+
+    def run_load(self, base_url, pdfs, options):
+        def upload(index):
+            started = time.perf_counter()
+            with open(pdfs[index], 'rb') as f:
+                response = requests.post(
+                    f"{base_url}/api/resumes/upload/?wait={settings.ANALYSIS_WAIT_MAX}",
+                    data={'candidate_name': f"Candidate {index}", 'email': f"candidate{index}@example.com",
+                          'job_title': "Backend Developer"},
+                    files={'resume_file': f},
+                    timeout=120,
+                )
+            if response.status_code not in (200, 202):
+                return f"HTTP {response.status_code}", time.perf_counter() - started
+            job = response.json()
+            # Uploads still queued after the wait are followed up by long polling
+            while job['status'] in ('queued', 'running'):
+                job = requests.get(f"{job['result_url']}?wait={settings.ANALYSIS_WAIT_MAX}", timeout=120).json()
+            return job['error'] or job['status'], time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            outcomes = list(executor.map(upload, range(len(pdfs))))
+        return {
+            'elapsed': time.perf_counter() - started,
+            'latencies': [latency for outcome, latency in outcomes if outcome == 'done'],
+            'errors': Counter(outcome for outcome, _ in outcomes if outcome != 'done'),
+        }
+
+
+class ServerProcess:
+    """A server started on a migrated scratch database, stopped on exit; entering returns its base URL."""
+
+    def __init__(self, name, server_dir, options):
+        self.name = name
+        self.options = options
+        self.base_url = f"http://127.0.0.1:{options['port']}"
+        self.log_path = os.path.join(server_dir, 'server.log')
+        self.env = dict(
+            os.environ,
+            PYTHONPATH=str(settings.BASE_DIR),
+            DJANGO_SETTINGS_MODULE='resume_portal.settings',
+            SQLITE_PATH=os.path.join(server_dir, 'db.sqlite3'),
+            LLM_BACKEND='heuristic',
+            LLM_HEURISTIC_DELAY=str(options['delay']),
+            ANALYSIS_WORKERS=str(options['analysis_workers']),
+            ANALYSIS_POLL_INTERVAL='0.5',
+            ANALYSIS_CACHE_ENABLED='false',
+        )
+        # Uploaded files land in the scratch directory
+        self.cwd = server_dir
+        self.process = None
+
+    def __enter__(self):
+        with socket.socket() as probe:
+            if probe.connect_ex(('127.0.0.1', self.options['port'])) == 0:
+                raise CommandError(f"Port {self.options['port']} is already in use")
+        subprocess.run([sys.executable, os.path.join(settings.BASE_DIR, 'manage.py'), 'migrate', '-v', '0'],
+                       env=self.env, cwd=self.cwd, check=True)
+        command = [part.format(workers=self.options['workers'], port=self.options['port'])
+                   for part in SERVERS[self.name]]
+        self.log = open(self.log_path, 'w')
+        self.process = subprocess.Popen(command, env=self.env, cwd=self.cwd, stdout=self.log,
+                                        stderr=subprocess.STDOUT)
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise CommandError(f"{self.name} server exited; see {self.log_path}")
+            try:
+                requests.get(f"{self.base_url}/api/resumes/?page_size=1", timeout=5)
+                return self.base_url
+            except requests.RequestException:
+                time.sleep(0.2)
+        self.__exit__(None, None, None)
+        raise CommandError(f"{self.name} server did not start within 30s")
+
+    def __exit__(self, *exc_info):
+        self.process.terminate()
+        try:
+            self.process.wait(10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        self.log.close()
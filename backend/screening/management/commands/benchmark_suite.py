@@ -0,0 +1,80 @@
+import os
+import random
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import override_settings
+
+from screening.benchmarks import load_baseline, regressions, run_suite, save_baseline
+
+CASES = ('find_candidates', 'find_matching_jobs', 'recommended_jobs', 'pdf_extract', 'analyze_resume')
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ("Benchmark the matching and analysis hot paths on a seeded synthetic dataset, reporting throughput "
+            "and p50/p99 latency per case. Compares against a JSON baseline and fails on regressions beyond "
+            "--threshold. Nothing is kept in the database.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cases', nargs='+', choices=CASES, default=list(CASES))
+        parser.add_argument('--resumes', type=int, default=2000)
+        parser.add_argument('--jobs', type=int, default=200)
+        parser.add_argument('--vocabulary', type=int, default=300, help="Distinct skills.")
+        parser.add_argument('--queries', type=int, default=200, help="Runs of each matching case.")
+        parser.add_argument('--pdfs', type=int, default=50, help="Generated PDFs extracted and analyzed.")
+        parser.add_argument('--rounds', type=int, default=5, help="Times each case is run; the fastest is kept.")
+        parser.add_argument('--delay', type=float, default=0.0, help="Simulated seconds per stub model call.")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--baseline', default=os.path.join(settings.BASE_DIR, 'benchmark_baseline.json'))
+        parser.add_argument('--save-baseline', action='store_true',
+                            help="Write this run's results to --baseline instead of comparing against it.")
+        parser.add_argument('--threshold', type=float, default=0.25,
+                            help="Fraction by which a latency may grow or throughput drop before it is a regression.")
+
+    def handle(self, *args, **options):
+        options['cases'] = set(options['cases'])
+        config = {name: options[name]
+                  for name in ('resumes', 'jobs', 'vocabulary', 'queries', 'pdfs', 'rounds', 'delay', 'seed')}
+        with tempfile.TemporaryDirectory() as workdir, \
+                override_settings(MEDIA_ROOT=workdir, ANALYSIS_WORKERS=0, ANALYSIS_CACHE_ENABLED=False):
+            try:
+                with transaction.atomic():
+                    results = run_suite(options, random.Random(options['seed']), workdir, report=self.stdout.write)
+                    raise Rollback
+            except Rollback:
+                pass
+
+        baseline = None
+        if not options['save_baseline'] and os.path.exists(options['baseline']):
+            baseline = load_baseline(options['baseline'])
+            if baseline.get('config') != config:
+                self.stdout.write(self.style.WARNING(
+                    f"Baseline was recorded with {baseline.get('config')}; comparisons may not be meaningful"))
+
+        self.stdout.write(f"{'case':<20}{'runs':>6}{'ops/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'baseline p50':>14}")
+        for result in results:
+            summary = result.summary()
+            before = (baseline or {}).get('results', {}).get(result.name, {}).get('p50_ms')
+            self.stdout.write(f"{result.name:<20}{summary['runs']:>6}{summary['ops_per_sec']:>10.1f}"
+                              f"{summary['p50_ms']:>10.2f}{summary['p99_ms']:>10.2f}"
+                              f"{before if before is not None else '-':>14}")
+
+        if options['save_baseline']:
+            save_baseline(options['baseline'], results, config)
+            self.stdout.write(f"Saved baseline to {options['baseline']}")
+            return
+        if baseline is None:
+            self.stdout.write(f"No baseline at {options['baseline']}; run with --save-baseline to record one.")
+            return
+        found = regressions(results, baseline, options['threshold'])
+        for case, metric, before, now in found:
+            self.stdout.write(self.style.ERROR(f"{case} {metric}: {before} -> {now}"))
+        if found:
+            raise CommandError(f"{len(found)} measurements regressed by more than {options['threshold']:.0%}")
+        self.stdout.write(self.style.SUCCESS(f"No regressions beyond {options['threshold']:.0%}"))
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from screening.startup import STARTUP_STATEMENT, measure_imports
+
+
+class Command(BaseCommand):
+    help = ("Measure what a fresh web worker imports (python -X importtime) and fail if it exceeds "
+            "STARTUP_IMPORT_BUDGET_MS or loads a library that should be imported lazily.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--statement', default=STARTUP_STATEMENT)
+        parser.add_argument('--budget-ms', type=float, default=settings.STARTUP_IMPORT_BUDGET_MS)
+        parser.add_argument('--top', type=int, default=10, help="Number of slowest imports to list.")
+
+    def handle(self, *args, **options):
+        profile = measure_imports(options['statement'])
+        for name, cumulative in profile.slowest(options['top']):
+            self.stdout.write(f"{cumulative / 1000:>9.1f} ms  {name}")
+        self.stdout.write(f"{len(profile.imports)} modules imported in {profile.total_ms:.1f} ms "
+                          f"(budget {options['budget_ms']:.0f} ms)")
+
+        problems = []
+        eager = profile.eager_lazy_modules()
+        if eager:
+            problems.append(f"imported at startup but should be lazy: {', '.join(eager)}")
+        if profile.total_ms > options['budget_ms']:
+            problems.append(f"import time {profile.total_ms:.1f} ms is over the {options['budget_ms']:.0f} ms budget")
+        if problems:
+            raise CommandError("; ".join(problems))
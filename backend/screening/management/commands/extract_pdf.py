@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from screening.pdf_extract import ExtractionPool
+
+
+class Command(BaseCommand):
+    help = "Extract text from PDFs with the configured limits and report the time spent on each page."
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+')
+        parser.add_argument('--max-pages', type=int, default=settings.PDF_MAX_PAGES)
+        parser.add_argument('--max-chars', type=int, default=settings.PDF_MAX_TEXT_CHARS)
+        parser.add_argument('--timeout', type=float, default=settings.PDF_EXTRACT_TIMEOUT)
+        parser.add_argument('--show-text', action='store_true', help="Print the extracted text as well.")
+
+    def handle(self, *args, **options):
+        pool = ExtractionPool(settings.PDF_EXTRACT_WORKERS, options['max_pages'], options['max_chars'],
+                              settings.PDF_MAX_FILE_BYTES, options['timeout'])
+        failures = 0
+        for path, result in pool.map(options['paths']):
+            self.stdout.write(f"{path}: {result.summary()}")
+            if result.error:
+                failures += 1
+                self.stdout.write(f"  error: {result.error}")
+            for number, seconds, chars in result.page_timings:
+                self.stdout.write(f"  page {number:>4}  {seconds * 1000:8.1f} ms  {chars:>7} chars")
+            if options['show_text']:
+                self.stdout.write(result.text)
+        pool.shutdown()
+        if failures == len(options['paths']):
+            raise CommandError("No PDF could be read.")
@@ -0,0 +1,56 @@
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from screening.ai_module import get_model
+from screening.analysis_cache import get_analysis_cache
+from screening.fake_llm import StubModel
+from screening.ingest import ResumeIngestor, find_manifest, read_manifest, unpack_source
+
+
+class Command(BaseCommand):
+    help = ("Ingest a batch of resumes from a directory or ZIP archive of PDFs with a CSV of name, email and file "
+            "(and optionally job_title). Safe to rerun after an interruption.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help="Directory or ZIP archive holding the PDFs and, unless --csv is given, the CSV.")
+        parser.add_argument('--csv', help="CSV manifest; file paths in it are relative to the source directory.")
+        parser.add_argument('--analysis-type', default='full', choices=['score', 'review', 'both', 'full'])
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--concurrency', type=int, default=settings.ANALYSIS_MAX_CONCURRENCY,
+                            help="Resumes analyzed at the same time.")
+        parser.add_argument('--rate', type=float, default=None, help="Maximum model calls per second.")
+        parser.add_argument('--progress-file',
+                            help="Where finished rows are recorded (default: <source>.progress.jsonl).")
+        parser.add_argument('--stub-model', type=float, metavar='DELAY', default=None,
+                            help="Answer prompts with the offline stub model, sleeping DELAY seconds per call.")
+
+    def handle(self, *args, **options):
+        model = StubModel(delay=options['stub_model']) if options['stub_model'] is not None else get_model()
+        if model is None:
+            raise CommandError("No model configured: set GEMINI_API_KEY, choose another LLM_BACKEND or pass --stub-model.")
+
+        with tempfile.TemporaryDirectory() as workdir:
+            files_dir = unpack_source(options['source'], workdir)
+            csv_path = options['csv'] or find_manifest(files_dir)
+            if not csv_path:
+                raise CommandError("No CSV manifest found; pass --csv.")
+            rows = read_manifest(csv_path, files_dir)
+
+            ingestor = ResumeIngestor(
+                model,
+                analysis_type=options['analysis_type'],
+                batch_size=options['batch_size'],
+                concurrency=options['concurrency'],
+                rate=options['rate'],
+                cache=get_analysis_cache(),
+                progress_path=options['progress_file'] or f"{options['source'].rstrip('/')}.progress.jsonl",
+                report=self.stdout.write,
+            )
+            stats = ingestor.run(rows)
+
+        self.stdout.write(
+            f"{stats['saved']} of {stats['rows']} resumes ingested in {stats['elapsed']:.1f}s "
+            f"({stats['skipped']} already done, {stats['unanalyzed']} without analysis, {stats['unreadable']} unreadable)."
+        )
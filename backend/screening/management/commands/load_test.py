@@ -0,0 +1,270 @@
+import itertools
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+from screening.benchmarks import percentile, write_resume_pdfs
+from screening.management.commands.benchmark_serving import SERVERS, ServerProcess
+from screening.synthetic import BASE_SKILLS
+
+# Relative weights of the operations each virtual user picks from
+DEFAULT_MIX = {
+    'login': 5,
+    'upload': 10,
+    'find_candidates': 35,
+    'refresh_candidates': 10,
+    'job_list': 15,
+    'job_create': 10,
+    'job_update': 10,
+    'job_delete': 5,
+}
+
+
+def parse_mix(values):
+    """`name=weight` pairs overriding DEFAULT_MIX; a weight of 0 leaves the operation out."""
+    mix = dict(DEFAULT_MIX)
+    for value in values or []:
+        name, _, weight = value.partition('=')
+        if name not in DEFAULT_MIX or not weight.isdigit():
+            raise CommandError(f"Bad --mix entry {value!r}; expected one of {', '.join(DEFAULT_MIX)} as name=weight")
+        mix[name] = int(weight)
+    mix = {name: weight for name, weight in mix.items() if weight}
+    if not mix:
+        raise CommandError("--mix leaves no operations to run")
+    return mix
+
+
+class Recorder:
+    """Latency and outcome of every request, per endpoint, shared by the virtual users."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.error_kinds = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, seconds, error=None):
+        with self._lock:
+            self.latencies[endpoint].append(seconds)
+            if error:
+                self.errors[endpoint] += 1
+                self.error_kinds[f"{endpoint}: {error}"] += 1
+
+    def summary(self, elapsed):
+        rows = {}
+        for endpoint in sorted(self.latencies):
+            latencies = sorted(self.latencies[endpoint])
+            rows[endpoint] = {
+                'requests': len(latencies),
+                'errors': self.errors[endpoint],
+                'error_rate': round(self.errors[endpoint] / len(latencies), 4),
+                'req_per_sec': round(len(latencies) / elapsed, 2),
+                'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+                'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+                'p99_ms': round(percentile(latencies, 99) * 1000, 1),
+            }
+        return rows
+
+
+class VirtualUser:
+    """
+    One simulated employer: logs in, then runs weighted operations back to back
+    on its own HTTP session until the deadline.
+    """
+
+    def __init__(self, base_url, username, password, job_ids, pdfs, mix, recorder, rng, emails):
+        self.base_url = base_url
+        self.username = username
+        self.password = password
+        self.shared_job_ids = job_ids
+        self.pdfs = pdfs
+        self.names = list(mix)
+        self.weights = list(mix.values())
+        self.recorder = recorder
+        self.rng = rng
+        self.emails = emails
+        self.own_job_ids = []
+        self.session = requests.Session()
+
+    def request(self, endpoint, method, path, expected, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, f"{self.base_url}{path}", timeout=60, **kwargs)
+        except requests.RequestException as e:
+            self.recorder.record(endpoint, time.perf_counter() - started, type(e).__name__)
+            return None
+        error = None if response.status_code in expected else f"HTTP {response.status_code}"
+        self.recorder.record(endpoint, time.perf_counter() - started, error)
+        return response if error is None else None
+
+    def run(self, deadline):
+        self.login()
+        while time.monotonic() < deadline:
+            operation = self.rng.choices(self.names, weights=self.weights)[0]
+            getattr(self, operation)()
+
+    def login(self):
+        response = self.request('login', 'POST', '/auth/login/', (200,),
+                                json={'username': self.username, 'password': self.password})
+        if response is not None:
+            self.session.headers['Authorization'] = f"Token {response.json()['token']}"
+
+    def upload(self):
+        index = next(self.emails)
+        with open(self.rng.choice(self.pdfs), 'rb') as f:
+            self.request('upload', 'POST', '/api/resumes/upload/', (200, 202),
+                         data={'candidate_name': f"Load {index}", 'email': f"{self.username}-{index}@example.com",
+                               'job_title': "Backend Developer"},
+                         files={'resume_file': f})
+
+    def find_candidates(self):
+        job_id = self.rng.choice(self.shared_job_ids)
+        self.request('find_candidates', 'GET', f'/api/resumes/find_candidates/?job_id={job_id}', (200,))
+
+    def refresh_candidates(self):
+        job_id = self.rng.choice(self.shared_job_ids)
+        self.request('refresh_candidates', 'GET', f'/api/resumes/refresh_candidates/?job_id={job_id}', (200,))
+
+    def job_list(self):
+        self.request('job_list', 'GET', '/api/jobs/', (200,))
+
+    def job_create(self):
+        response = self.request('job_create', 'POST', '/api/jobs/', (201,), json={
+            'title': f"Load test job {self.rng.randint(1, 10 ** 6)}",
+            'description': "Created by the load test",
+            'location': "Remote",
+            'skills_required': ", ".join(self.rng.sample(BASE_SKILLS, 4)),
+        })
+        if response is not None:
+            self.own_job_ids.append(response.json()['id'])
+
+    def job_update(self):
+        if not self.own_job_ids:
+            return self.job_create()
+        job_id = self.rng.choice(self.own_job_ids)
+        self.request('job_update', 'PATCH', f'/api/jobs/{job_id}/', (200,),
+                     json={'skills_required': ", ".join(self.rng.sample(BASE_SKILLS, 5))})
+
+    def job_delete(self):
+        if not self.own_job_ids:
+            return self.job_create()
+        job_id = self.own_job_ids.pop(0)
+        self.request('job_delete', 'DELETE', f'/api/jobs/{job_id}/', (204,))
+
+
+class Command(BaseCommand):
+    help = ("Drive a realistic mix of API requests (token login, resume upload, find_candidates, refresh_candidates "
+            "and job CRUD) at increasing concurrency, and report throughput, error rate and latency percentiles "
+            "per endpoint. Starts a server on a scratch database with the heuristic LLM backend, or targets "
+            "--url.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16, 32],
+                            help="Virtual users for each successive step.")
+        parser.add_argument('--duration', type=float, default=20, help="Seconds per concurrency step.")
+        parser.add_argument('--mix', nargs='+', metavar='NAME=WEIGHT',
+                            help=f"Override operation weights (defaults: "
+                                 f"{', '.join(f'{k}={v}' for k, v in DEFAULT_MIX.items())}).")
+        parser.add_argument('--url', help="Base URL of a running server to test instead of starting one. "
+                                          "It should use a fake LLM backend (LLM_BACKEND=heuristic).")
+        parser.add_argument('--server', choices=sorted(SERVERS), default='wsgi')
+        parser.add_argument('--workers', type=int, default=2, help="Server worker processes.")
+        parser.add_argument('--analysis-workers', type=int, default=2, help="Analysis threads per process.")
+        parser.add_argument('--delay', type=float, default=0.2, help="Simulated seconds per LLM call.")
+        parser.add_argument('--jobs', type=int, default=20, help="Job posts created for the candidate searches.")
+        parser.add_argument('--resumes', type=int, default=50, help="Resumes uploaded before the first step.")
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', help="Also write the per-step results to this JSON file.")
+
+    def handle(self, *args, **options):
+        mix = parse_mix(options['mix'])
+        rng = random.Random(options['seed'])
+        with tempfile.TemporaryDirectory() as workdir:
+            pdfs = write_resume_pdfs(workdir, 20, rng)
+            if options['url']:
+                steps = self.run_steps(options['url'].rstrip('/'), pdfs, mix, rng, options)
+            else:
+                server_dir = os.path.join(workdir, 'server')
+                os.makedirs(server_dir)
+                with ServerProcess(options['server'], server_dir, options) as base_url:
+                    steps = self.run_steps(base_url, pdfs, mix, rng, options)
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump({'options': {name: options[name] for name in (
+                    'server', 'workers', 'analysis_workers', 'delay', 'duration', 'url')},
+                    'mix': mix, 'steps': steps}, f, indent=2)
+                f.write("\n")
+            self.stdout.write(f"Wrote results to {options['output']}")
+
+    def run_steps(self, base_url, pdfs, mix, rng, options):
+        password = "load-test-password"
+        users = [f"load-{options['seed']}-{rng.randint(0, 10 ** 9)}-{i}" for i in range(max(options['concurrency']))]
+        job_ids = self.seed(base_url, users, password, pdfs, rng, options)
+        emails = itertools.count()
+        steps = []
+        for concurrency in options['concurrency']:
+            recorder = Recorder()
+            virtual_users = [
+                VirtualUser(base_url, users[i], password, job_ids, pdfs, mix, recorder,
+                            random.Random(rng.random()), emails)
+                for i in range(concurrency)
+            ]
+            started = time.monotonic()
+            deadline = started + options['duration']
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                for future in [executor.submit(user.run, deadline) for user in virtual_users]:
+                    future.result()
+            elapsed = time.monotonic() - started
+            summary = recorder.summary(elapsed)
+            self.report(concurrency, elapsed, summary, recorder.error_kinds)
+            steps.append({'concurrency': concurrency, 'seconds': round(elapsed, 2), 'endpoints': summary})
+        return steps
+
+    def seed(self, base_url, users, password, pdfs, rng, options):
+        """Register the virtual users, create the job posts searched for candidates and upload some resumes."""
+        session = requests.Session()
+        for username in users:
+            response = session.post(f"{base_url}/auth/register/", timeout=60, json={
+                'username': username, 'email': f"{username}@example.com", 'password': password})
+            if response.status_code != 200:
+                raise CommandError(f"Registering {username} failed: HTTP {response.status_code} {response.text[:200]}")
+            token = response.json()['token']
+        job_ids = []
+        for i in range(options['jobs']):
+            response = session.post(f"{base_url}/api/jobs/", timeout=60, headers={'Authorization': f"Token {token}"},
+                                    json={'title': f"Seeded job {i}", 'description': "Seeded by the load test",
+                                          'location': "Remote",
+                                          'skills_required': ", ".join(rng.sample(BASE_SKILLS, 5))})
+            if response.status_code != 201:
+                raise CommandError(f"Creating a job post failed: HTTP {response.status_code} {response.text[:200]}")
+            job_ids.append(response.json()['id'])
+        for i in range(options['resumes']):
+            with open(pdfs[i % len(pdfs)], 'rb') as f:
+                session.post(f"{base_url}/api/resumes/upload/", timeout=60, files={'resume_file': f},
+                             data={'candidate_name': f"Seeded {i}", 'email': f"seeded-{users[0]}-{i}@example.com"})
+        self.stdout.write(f"Seeded {len(users)} users, {len(job_ids)} job posts and {options['resumes']} uploads "
+                          f"at {base_url}")
+        return job_ids
+
+    def report(self, concurrency, elapsed, summary, error_kinds):
+        total = sum(row['requests'] for row in summary.values())
+        errors = sum(row['errors'] for row in summary.values())
+        self.stdout.write(f"\n{concurrency} concurrent users, {elapsed:.1f}s: {total / elapsed:.1f} req/s, "
+                          f"{errors / total if total else 0:.1%} errors")
+        self.stdout.write(f"{'endpoint':<20}{'requests':>9}{'errors':>8}{'req/s':>9}"
+                          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+        for endpoint, row in summary.items():
+            self.stdout.write(f"{endpoint:<20}{row['requests']:>9}{row['errors']:>8}{row['req_per_sec']:>9.1f}"
+                              f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}")
+        for kind, count in sorted(error_kinds.items(), key=lambda item: -item[1])[:5]:
+            self.stdout.write(f"    {count} x {kind}")
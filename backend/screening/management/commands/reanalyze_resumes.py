@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from screening.analysis_queue import enqueue_analysis
+from screening.models import Resume
+
+
+class Command(BaseCommand):
+    help = "Queue stored resume text for analysis again, e.g. after the prompts changed. No PDF is re-parsed."
+
+    def add_arguments(self, parser):
+        parser.add_argument('ids', nargs='*', type=int, help="Resume ids; all resumes with stored text if omitted.")
+        parser.add_argument('--analysis-type', default='full', choices=['score', 'review', 'both', 'full'])
+
+    def handle(self, *args, **options):
+        resumes = Resume.objects.filter(extracted_text__isnull=False)
+        if options['ids']:
+            resumes = resumes.filter(id__in=options['ids'])
+
+        queued = 0
+        with transaction.atomic():
+            for resume in resumes.iterator():
+                enqueue_analysis(resume, job_title=resume.job_title, analysis_type=options['analysis_type'])
+                queued += 1
+        self.stdout.write(f"Queued {queued} resume(s) for analysis.")
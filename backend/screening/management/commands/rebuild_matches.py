@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from screening.match_table import rebuild_matches
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored job/candidate match table from the normalized skill tables."
+
+    def handle(self, *args, **options):
+        jobs, matches = rebuild_matches()
+        self.stdout.write(f"Stored {matches} matches for {jobs} job posts.")
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from screening.skill_index import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the normalized skill tables from Resume.keywords and JobPost.skills_required."
+
+    def handle(self, *args, **options):
+        resumes, jobs = rebuild_index()
+        self.stdout.write(f"Indexed {resumes} resumes and {jobs} job posts.")
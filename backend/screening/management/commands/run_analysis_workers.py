@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from screening.analysis_queue import AnalysisWorkerPool
+
+
+class Command(BaseCommand):
+    help = "Process queued resume analysis jobs until interrupted."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=max(settings.ANALYSIS_WORKERS, 1),
+                            help="Number of worker threads to run.")
+        parser.add_argument('--poll-interval', type=float, default=settings.ANALYSIS_POLL_INTERVAL,
+                            help="Seconds to wait between queue checks when idle.")
+
+    def handle(self, *args, **options):
+        pool = AnalysisWorkerPool(options['workers'], options['poll_interval'])
+        pool.start()
+        self.stdout.write(f"Started {options['workers']} analysis worker(s). Press Ctrl+C to stop.")
+        try:
+            pool.join()
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping analysis workers...")
+            pool.stop()
@@ -0,0 +1,180 @@
+#match_table.py
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from . import versions
+from .metrics import timed
+from .models import CandidateMatch, JobPost, JobPostSkill, Resume, ResumeSkill
+from .scoring import SkillMatrix
+from .skill_index import chunks, related_skill_ids
+from .substring_index import get_substring_index
+
+# Pairs at or below this combined score are not stored (find_candidates never returned them)
+MIN_COMBINED_SCORE = 0.05
+
+
+def _combine(exact_score, partial_matches, listed_keywords):
+    partial_score = partial_matches / listed_keywords if listed_keywords else 0
+    # Combine scores with more weight on exact matches
+    return partial_score, (exact_score * 0.7) + (partial_score * 0.3)
+
+
+def _score_resumes_for_job(job, resume_ids):
+    """
+    Score some resumes against one job in a single vectorized pass.
+
+    Returns:
+        list: Unsaved CandidateMatch rows for the resumes above MIN_COMBINED_SCORE.
+    """
+    job_skills = list(JobPostSkill.objects.filter(job=job).values_list('skill_id', 'skill__name', 'occurrences'))
+    job_skill_names = {skill_id: name for skill_id, name, _ in job_skills}
+    occurrences = {name: count for _, name, count in job_skills}
+    listed_keywords = sum(occurrences.values())  # every listed keyword, duplicates included
+    related = related_skill_ids(occurrences)
+
+    pairs, uploaded = [], {}
+    for batch in chunks(sorted(resume_ids)):
+        pairs.extend(ResumeSkill.objects.filter(resume_id__in=batch).order_by('resume_id')
+                     .values_list('resume_id', 'skill_id'))
+        uploaded.update(Resume.objects.filter(id__in=batch).values_list('id', 'upload_date'))
+    if not pairs:
+        return []
+    resumes = SkillMatrix.from_pairs(pairs)
+
+    # Exact match score using Jaccard similarity
+    exact_scores = resumes.jaccard(job_skill_names)
+
+    # Partial match score: listed job keywords with a related resume skill
+    partial_matches = np.zeros(len(resumes), dtype=np.int64)
+    for job_keyword, count in occurrences.items():
+        partial_matches += resumes.contains_any(related[job_keyword]) * count
+
+    rows = []
+    for index, resume_id in enumerate(resumes.row_ids.tolist()):
+        exact_score = float(exact_scores[index])
+        partial_score, combined_score = _combine(exact_score, int(partial_matches[index]), listed_keywords)
+        if combined_score > MIN_COMBINED_SCORE:
+            skills = resumes.indices[resumes.indptr[index]:resumes.indptr[index + 1]].tolist()
+            rows.append(CandidateMatch(
+                job_id=job.pk,
+                resume_id=resume_id,
+                exact_score=exact_score,
+                partial_matches=int(partial_matches[index]),
+                partial_score=partial_score,
+                combined_score=combined_score,
+                matched_skills=[job_skill_names[skill] for skill in skills if skill in job_skill_names],
+                resume_uploaded_at=uploaded[resume_id],
+                job_created_at=job.created_at,
+            ))
+    return rows
+
+
+def _candidate_resume_ids(job):
+    """Resumes holding a skill related to one of the job's keywords; every other resume scores zero."""
+    names = JobPostSkill.objects.filter(job=job).values_list('skill__name', flat=True)
+    candidate_ids = set()
+    for batch in chunks(set().union(*related_skill_ids(names).values())):
+        candidate_ids.update(ResumeSkill.objects.filter(skill_id__in=batch).values_list('resume_id', flat=True))
+    return candidate_ids
+
+
+def refresh_job_matches(job):
+    """Recompute every match of one job, e.g. after its skills_required changed."""
+    refreshed_at = timezone.now()
+    rows = _score_resumes_for_job(job, _candidate_resume_ids(job))
+    with transaction.atomic():
+        CandidateMatch.objects.filter(job=job).delete()
+        CandidateMatch.objects.bulk_create(rows, batch_size=500)
+        JobPost.objects.filter(pk=job.pk).update(matches_refreshed_at=refreshed_at)
+        versions.bump(versions.MATCHES)
+    job.matches_refreshed_at = refreshed_at
+    return len(rows)
+
+
+@timed('refresh_changed_matches')
+def refresh_changed_matches(job):
+    """
+    Re-score only the resumes whose skills changed since the job's matches were last refreshed.
+
+    Incremental updates on save keep the table current; this catches writes
+    that bypassed them (bulk updates, queryset.update()).
+    """
+    if job.matches_refreshed_at is None:
+        return refresh_job_matches(job)
+
+    refreshed_at = timezone.now()
+    changed_ids = set(Resume.objects.filter(skills_updated_at__gte=job.matches_refreshed_at)
+                      .values_list('id', flat=True))
+    rows = _score_resumes_for_job(job, changed_ids) if changed_ids else []
+    with transaction.atomic():
+        for batch in chunks(sorted(changed_ids)):
+            CandidateMatch.objects.filter(job=job, resume_id__in=batch).delete()
+        CandidateMatch.objects.bulk_create(rows, batch_size=500)
+        JobPost.objects.filter(pk=job.pk).update(matches_refreshed_at=refreshed_at)
+        if changed_ids:
+            versions.bump(versions.MATCHES)
+    job.matches_refreshed_at = refreshed_at
+    return len(changed_ids)
+
+
+def _candidate_job_ids(related):
+    """Jobs listing one of a resume's related skills; the resume scores zero against every other job."""
+    job_ids = set()
+    for batch in chunks(related):
+        job_ids.update(JobPostSkill.objects.filter(skill_id__in=batch).values_list('job_id', flat=True))
+    return job_ids
+
+
+def refresh_resume_matches(resume):
+    """Recompute the matches of one resume, e.g. after it was analyzed. Only jobs with a related skill can match."""
+    resume_skills = dict(ResumeSkill.objects.filter(resume_id=resume.pk).values_list('skill_id', 'skill__name'))
+
+    rows, pairs, created = [], [], {}
+    if resume_skills:
+        # Job skills that contain or are contained in one of the resume's skills, its own included
+        substrings = get_substring_index()
+        related = set().union(*(substrings.related(name) for name in resume_skills.values()))
+        for batch in chunks(sorted(_candidate_job_ids(related))):
+            pairs.extend(JobPostSkill.objects.filter(job_id__in=batch).order_by('job_id')
+                         .values_list('job_id', 'skill_id', 'occurrences'))
+            created.update(JobPost.objects.filter(id__in=batch).values_list('id', 'created_at'))
+
+    if pairs:
+        jobs = SkillMatrix.from_pairs(pairs, weighted=True)
+        exact_scores = jobs.jaccard(resume_skills)
+        partial_matches = jobs.weighted_counts(related)
+        listed_keywords = jobs.weight_totals()
+
+        for index, job_id in enumerate(jobs.row_ids.tolist()):
+            exact_score = float(exact_scores[index])
+            partial_score, combined_score = _combine(exact_score, int(partial_matches[index]),
+                                                     int(listed_keywords[index]))
+            if combined_score > MIN_COMBINED_SCORE:
+                skills = jobs.indices[jobs.indptr[index]:jobs.indptr[index + 1]].tolist()
+                rows.append(CandidateMatch(
+                    job_id=job_id,
+                    resume_id=resume.pk,
+                    exact_score=exact_score,
+                    partial_matches=int(partial_matches[index]),
+                    partial_score=partial_score,
+                    combined_score=combined_score,
+                    matched_skills=[resume_skills[skill] for skill in skills if skill in resume_skills],
+                    resume_uploaded_at=resume.upload_date,
+                    job_created_at=created[job_id],
+                ))
+
+    with transaction.atomic():
+        CandidateMatch.objects.filter(resume_id=resume.pk).delete()
+        CandidateMatch.objects.bulk_create(rows, batch_size=500)
+        versions.bump(versions.MATCHES)
+    return len(rows)
+
+
+def rebuild_matches():
+    """Recompute the whole table, one job at a time. Returns (jobs, matches)."""
+    jobs = matches = 0
+    for job in JobPost.objects.all().iterator():
+        matches += refresh_job_matches(job)
+        jobs += 1
+    return jobs, matches
@@ -0,0 +1,55 @@
+#matching.py
+from .match_table import refresh_job_matches
+from .metrics import timed
+from .models import CandidateMatch, JobPost
+
+
+@timed('find_matching_jobs')
+def find_matching_jobs(resume):
+    """Find jobs that match the resume's keywords"""
+    if not resume.keywords:
+        return []
+
+    # Jobs created before the match table existed are scored on first use, as in find_candidates
+    for job in JobPost.objects.filter(matches_refreshed_at__isnull=True):
+        refresh_job_matches(job)
+
+    # Only jobs with significant match (Jaccard above 0.3), best first, newest job on ties
+    matches = CandidateMatch.objects.filter(resume_id=resume.pk, exact_score__gt=0.3) \
+        .select_related('job', 'job__employer') \
+        .order_by('-exact_score', '-job_created_at', 'job_id')[:5]  # Return top 5 matches
+    return [
+        {'job': match.job, 'score': match.exact_score, 'matching_keywords': match.matched_skills}
+        for match in matches
+    ]
+
+
+@timed('find_candidates')
+def find_candidates(job, limit=30):
+    """
+    Rank resumes against a job's required skills.
+
+    Reads the precomputed CandidateMatch rows, which are kept current as
+    resumes are analyzed and job skills change (see match_table).
+
+    Returns:
+        list: Up to `limit` dicts with resume, score, exact_matches, partial_matches and last_updated.
+    """
+    if job.matches_refreshed_at is None:
+        # Jobs created before the match table existed are scored on first use
+        refresh_job_matches(job)
+
+    # Sort by combined score and then by upload date (newest first)
+    matches = CandidateMatch.objects.filter(job=job).select_related('resume') \
+        .order_by('-combined_score', '-resume_uploaded_at', 'resume_id')[:limit]
+    return [_candidate(match) for match in matches]
+
+
+def _candidate(match):
+    return {
+        'resume': match.resume,
+        'score': match.combined_score,
+        'exact_matches': match.matched_skills,
+        'partial_matches': match.partial_matches,
+        'last_updated': match.resume_uploaded_at,
+    }
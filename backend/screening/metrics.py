@@ -0,0 +1,187 @@
+#metrics.py
+import functools
+import threading
+import time
+from contextvars import ContextVar
+
+# Upper bounds (seconds) of the stage latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+# Upper bounds of the per-request database query count histogram buckets
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+_histograms = {}
+_histograms_lock = threading.Lock()
+
+# Timings of the request being handled; contextvars follow the request into
+# sync_to_async threads, so ASGI and WSGI requests are both covered
+_current_request = ContextVar('request_timings', default=None)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style. Safe to share between threads."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self.count += 1
+            self.sum += value
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[index] += 1
+
+    def snapshot(self):
+        """(buckets as (upper bound, cumulative count) pairs, count, sum)."""
+        with self._lock:
+            return list(zip(self.buckets, self.counts)), self.count, self.sum
+
+
+def histogram(name, label, buckets=LATENCY_BUCKETS):
+    """The process-wide histogram for one metric `name` and label value, created on first use."""
+    key = (name, label)
+    with _histograms_lock:
+        if key not in _histograms:
+            _histograms[key] = Histogram(buckets)
+        return _histograms[key]
+
+
+def histograms():
+    with _histograms_lock:
+        return dict(_histograms)
+
+
+class RequestTimings:
+    """Stage durations and database queries of one request, for its Server-Timing header."""
+
+    def __init__(self):
+        self.stages = []
+        self.queries = 0
+        self.query_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add_stage(self, stage, seconds):
+        with self._lock:
+            self.stages.append((stage, seconds))
+
+    def add_query(self, seconds):
+        with self._lock:
+            self.queries += 1
+            self.query_seconds += seconds
+
+
+def start_request():
+    """Begin collecting timings for the current request. Returns (timings, token for end_request)."""
+    timings = RequestTimings()
+    return timings, _current_request.set(timings)
+
+
+def end_request(token):
+    _current_request.reset(token)
+
+
+def observe_stage(stage, seconds):
+    """Record the duration of one stage run, in the stage histogram and the current request's timings."""
+    histogram('stage_seconds', stage).observe(seconds)
+    timings = _current_request.get()
+    if timings is not None:
+        timings.add_stage(stage, seconds)
+
+
+class timed:
+    """
+    Time a stage, as a context manager or a decorator.
+
+        with timed('pdf_extract'):
+            ...
+
+        @timed('find_candidates')
+        def find_candidates(job):
+            ...
+    """
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        observe_stage(self.stage, time.perf_counter() - self._started)
+
+    def __call__(self, function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with timed(self.stage):
+                return function(*args, **kwargs)
+        return wrapper
+
+
+def count_queries(execute, sql, params, many, context):
+    """Database execute wrapper adding each query to the current request's timings."""
+    timings = _current_request.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.add_query(time.perf_counter() - started)
+
+
+def server_timing(timings, total):
+    """
+    Server-Timing header value for a request: total time, database time and
+    query count, and each stage (repeated stages are summed).
+    """
+    entries = [f"total;dur={total * 1000:.1f}",
+               f'db;dur={timings.query_seconds * 1000:.1f};desc="{timings.queries} queries"']
+    summed = {}
+    for stage, seconds in timings.stages:
+        summed[stage] = summed.get(stage, 0.0) + seconds
+    for stage, seconds in summed.items():
+        entries.append(f"{stage.replace('.', '-')};dur={seconds * 1000:.1f}")
+    return ", ".join(entries)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus(counters, prefix='resume_portal'):
+    """
+    All histograms plus `counters` in the Prometheus text exposition format.
+
+    Args:
+        counters (list): (name, type, help, values) tuples, where values maps
+            label text (e.g. 'cache="analysis"', or None) to the sample value.
+    """
+    lines = []
+    by_name = {}
+    for (name, label), hist in sorted(histograms().items()):
+        by_name.setdefault(name, []).append((label, hist))
+    label_names = {'stage_seconds': 'stage', 'request_seconds': 'view', 'request_queries': 'view'}
+    for name, series in by_name.items():
+        metric = f"{prefix}_{name}"
+        lines.append(f"# TYPE {metric} histogram")
+        for label, hist in series:
+            label_text = f'{label_names.get(name, "name")}="{_escape(label)}"'
+            buckets, count, total = hist.snapshot()
+            for bound, cumulative in buckets:
+                lines.append(f'{metric}_bucket{{{label_text},le="{bound}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{{label_text},le="+Inf"}} {count}')
+            lines.append(f'{metric}_count{{{label_text}}} {count}')
+            lines.append(f'{metric}_sum{{{label_text}}} {total}')
+
+    for name, kind, help_text, values in counters:
+        metric = f"{prefix}_{name}"
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for label, value in values.items():
+            lines.append(f'{metric}{{{label}}} {value}' if label else f"{metric} {value}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,64 @@
+#middleware.py
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db import connections
+
+from .metrics import QUERY_BUCKETS, count_queries, end_request, histogram, server_timing, start_request
+
+
+def install_query_counter(connection):
+    if count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_queries)
+
+
+class ServerTimingMiddleware:
+    """
+    Time every request and count its database queries.
+
+    Each request's duration and query count go into histograms labelled with
+    the view name, and API responses get a Server-Timing header listing the
+    total, the database time and the stages timed while handling them, so
+    the browser's network panel shows where the time went.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        # Connections opened before the connection_created receiver was connected
+        for connection in connections.all(initialized_only=True):
+            install_query_counter(connection)
+        timings, token = start_request()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            end_request(token)
+        return self.finish(request, response, timings, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        timings, token = start_request()
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            end_request(token)
+        return self.finish(request, response, timings, time.perf_counter() - started)
+
+    def finish(self, request, response, timings, total):
+        match = request.resolver_match
+        view = match.view_name if match else 'unmatched'
+        histogram('request_seconds', view).observe(total)
+        histogram('request_queries', view, QUERY_BUCKETS).observe(timings.queries)
+        if request.path.startswith('/api/'):
+            response['Server-Timing'] = server_timing(timings, total)
+            # Lets the frontend, served from another origin, read the timings
+            response['Timing-Allow-Origin'] = '*'
+        return response
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.6 on 2026-10-18 17:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('screening', '0008_analysisjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalysisCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(help_text='SHA-256 of resume text, analysis type, job title and prompt version', max_length=64, unique=True)),
+                ('analysis_type', models.CharField(max_length=10)),
+                ('job_title', models.CharField(blank=True, max_length=100, null=True)),
+                ('result', models.JSONField()),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('last_used_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Analysis Cache Entry',
+                'verbose_name_plural': 'Analysis Cache Entries',
+            },
+        ),
+    ]
@@ -0,0 +1,90 @@
+# Generated by Django 5.1.6 on 2026-10-18 17:21
+
+from collections import Counter
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def normalize_existing_skills(apps, schema_editor):
+    Resume = apps.get_model('screening', 'Resume')
+    JobPost = apps.get_model('screening', 'JobPost')
+    Skill = apps.get_model('screening', 'Skill')
+    ResumeSkill = apps.get_model('screening', 'ResumeSkill')
+    JobPostSkill = apps.get_model('screening', 'JobPostSkill')
+
+    resume_skills = [
+        (resume_id, set(k.lower().strip() for k in keywords.split(',')))
+        for resume_id, keywords in Resume.objects.exclude(keywords__isnull=True).exclude(keywords='').values_list('id', 'keywords')
+    ]
+    job_skills = [
+        (job_id, Counter(k.lower().strip() for k in (skills_required or '').split(',')))
+        for job_id, skills_required in JobPost.objects.values_list('id', 'skills_required')
+    ]
+
+    names = set()
+    for _, skills in resume_skills + job_skills:
+        names.update(skills)
+    Skill.objects.bulk_create([Skill(name=name) for name in names], batch_size=500)
+    ids = dict(Skill.objects.values_list('name', 'id'))
+
+    ResumeSkill.objects.bulk_create(
+        [ResumeSkill(resume_id=resume_id, skill_id=ids[name]) for resume_id, skills in resume_skills for name in skills],
+        batch_size=1000,
+    )
+    JobPostSkill.objects.bulk_create(
+        [JobPostSkill(job_id=job_id, skill_id=ids[name], occurrences=count)
+         for job_id, skills in job_skills for name, count in skills.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('screening', '0009_analysiscacheentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ResumeSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resume', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resume_skills', to='screening.resume')),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resume_skills', to='screening.skill')),
+            ],
+            options={
+                'unique_together': {('resume', 'skill')},
+            },
+        ),
+        migrations.CreateModel(
+            name='JobPostSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('occurrences', models.PositiveIntegerField(default=1, help_text='Times the skill is listed in skills_required')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_skills', to='screening.jobpost')),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_skills', to='screening.skill')),
+            ],
+            options={
+                'unique_together': {('job', 'skill')},
+            },
+        ),
+        migrations.AddField(
+            model_name='jobpost',
+            name='skills',
+            field=models.ManyToManyField(blank=True, related_name='job_posts', through='screening.JobPostSkill', to='screening.skill'),
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='skills',
+            field=models.ManyToManyField(blank=True, related_name='resumes', through='screening.ResumeSkill', to='screening.skill'),
+        ),
+        migrations.RunPython(normalize_existing_skills, migrations.RunPython.noop),
+    ]
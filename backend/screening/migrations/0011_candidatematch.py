@@ -0,0 +1,44 @@
+# Generated by Django 5.1.6 on 2026-10-18 17:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('screening', '0010_normalized_skills'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobpost',
+            name='matches_refreshed_at',
+            field=models.DateTimeField(blank=True, help_text='When candidate matches were last brought up to date', null=True),
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='skills_updated_at',
+            field=models.DateTimeField(blank=True, db_index=True, help_text='When the normalized skills were last rewritten', null=True),
+        ),
+        migrations.CreateModel(
+            name='CandidateMatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('exact_score', models.FloatField(help_text='Jaccard similarity of the skill sets')),
+                ('partial_matches', models.PositiveIntegerField(help_text='Listed job skills with a containing or contained resume skill')),
+                ('partial_score', models.FloatField()),
+                ('combined_score', models.FloatField()),
+                ('matched_skills', models.JSONField(default=list, help_text='Skills the job and resume share exactly')),
+                ('resume_uploaded_at', models.DateTimeField()),
+                ('job_created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='candidate_matches', to='screening.jobpost')),
+                ('resume', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_matches', to='screening.resume')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['job', '-combined_score', '-resume_uploaded_at'], name='match_job_ranking_idx'), models.Index(fields=['resume', '-exact_score', '-job_created_at'], name='match_resume_ranking_idx')],
+                'unique_together': {('job', 'resume')},
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.6 on 2026-10-18 17:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('screening', '0011_candidatematch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExtractedText',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(help_text='SHA-256 of the PDF bytes', max_length=64, unique=True)),
+                ('compressed_text', models.BinaryField()),
+                ('char_count', models.PositiveIntegerField(default=0)),
+                ('page_count', models.PositiveIntegerField(blank=True, null=True)),
+                ('pages_read', models.PositiveIntegerField(default=0)),
+                ('stopped', models.CharField(help_text='Why extraction ended, see pdf_extract', max_length=20)),
+                ('extraction_seconds', models.FloatField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Extracted Text',
+                'verbose_name_plural': 'Extracted Texts',
+            },
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='extracted_text',
+            field=models.ForeignKey(blank=True, help_text='Text of the uploaded file, kept so the resume can be re-analyzed after the file is deleted', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='resumes', to='screening.extractedtext'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.6 on 2026-10-18 17:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('screening', '0012_extractedtext'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=30, unique=True)),
+                ('value', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='jobpost',
+            index=models.Index(fields=['employer', '-created_at'], name='jobpost_employer_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resume',
+            index=models.Index(fields=['-upload_date', '-id'], name='resume_upload_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resume',
+            index=models.Index(condition=models.Q(('keywords__isnull', False), models.Q(('keywords', ''), _negated=True)), fields=['id'], name='resume_analyzed_idx'),
+        ),
+    ]
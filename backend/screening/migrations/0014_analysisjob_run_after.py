@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-18 18:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('screening', '0013_dataversion_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analysisjob',
+            name='run_after',
+            field=models.DateTimeField(blank=True, help_text='A job retried after a provider outage is not claimed before this time', null=True),
+        ),
+    ]
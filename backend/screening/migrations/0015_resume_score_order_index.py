@@ -0,0 +1,17 @@
+# Generated by Django 5.1.6 on 2026-10-18 18:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('screening', '0014_analysisjob_run_after'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='resume',
+            index=models.Index(fields=['-score', '-id'], name='resume_score_order_idx'),
+        ),
+    ]
@@ -1,8 +1,50 @@
+import zlib
+
 from django.db import models
+from django.db.models import Q
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
+class Skill(models.Model):
+    """A normalized (lowercased, stripped) skill keyword shared by resumes and job posts."""
+    name = models.CharField(max_length=255, unique=True)
+
+    def __str__(self):
+        return self.name
+
+class ExtractedText(models.Model):
+    """Text extracted from an uploaded PDF, stored zlib-compressed and shared by every upload of the same file."""
+    content_hash = models.CharField(max_length=64, unique=True, help_text="SHA-256 of the PDF bytes")
+    compressed_text = models.BinaryField()
+    char_count = models.PositiveIntegerField(default=0)
+    page_count = models.PositiveIntegerField(null=True, blank=True)
+    pages_read = models.PositiveIntegerField(default=0)
+    stopped = models.CharField(max_length=20, help_text="Why extraction ended, see pdf_extract")
+    extraction_seconds = models.FloatField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Text {self.content_hash[:12]} ({self.char_count} chars)"
+
+    @property
+    def text(self):
+        return zlib.decompress(bytes(self.compressed_text)).decode('utf-8')
+
+    @text.setter
+    def text(self, value):
+        self.compressed_text = zlib.compress(value.encode('utf-8'))
+        self.char_count = len(value)
+
+    class Meta:
+        verbose_name = "Extracted Text"
+        verbose_name_plural = "Extracted Texts"
+
+
+# Resumes whose analysis produced keywords
+ANALYZED = Q(keywords__isnull=False) & ~Q(keywords='')
+
+
 class Resume(models.Model):
     candidate_name = models.CharField(max_length=100)
     email = models.EmailField(unique=True)
@@ -17,6 +59,10 @@ class Resume(models.Model):
     relevance_score = models.FloatField(null=True, blank=True)
     relevance_tips = models.TextField(null=True, blank=True)
     matching_score = models.FloatField(null=True, blank=True, help_text="Score indicating how well this resume matches a job")
+    skills = models.ManyToManyField(Skill, through='ResumeSkill', related_name='resumes', blank=True)
+    skills_updated_at = models.DateTimeField(null=True, blank=True, db_index=True, help_text="When the normalized skills were last rewritten")
+    extracted_text = models.ForeignKey(ExtractedText, on_delete=models.SET_NULL, null=True, blank=True, related_name='resumes',
+                                       help_text="Text of the uploaded file, kept so the resume can be re-analyzed after the file is deleted")
 
     def __str__(self):
         return self.candidate_name
@@ -27,6 +73,14 @@ class Resume(models.Model):
     class Meta:
         ordering = ['-upload_date']
         verbose_name = "Resume"
+        indexes = [
+            # The resume list, newest first (ResumeCursorPagination)
+            models.Index(fields=['-upload_date', '-id'], name='resume_upload_order_idx'),
+            # The leaderboard, best score first (ResumeCursorPagination with ?ordering=-score)
+            models.Index(fields=['-score', '-id'], name='resume_score_order_idx'),
+            # Only analyzed resumes, for skill index rebuilds
+            models.Index(fields=['id'], condition=ANALYZED, name='resume_analyzed_idx'),
+        ]
         verbose_name_plural = "Resumes"
 
 class JobPost(models.Model):
@@ -47,6 +101,8 @@ class JobPost(models.Model):
     salary_range = models.CharField(max_length=100, null=True, blank=True, help_text="e.g., 50,000 - 70,000 USD")
     skills_required = models.TextField(help_text="Comma-separated list of skills like Python, SQL, Excel")
     created_at = models.DateTimeField(auto_now_add=True)
+    skills = models.ManyToManyField(Skill, through='JobPostSkill', related_name='job_posts', blank=True)
+    matches_refreshed_at = models.DateTimeField(null=True, blank=True, help_text="When candidate matches were last brought up to date")
 
     def __str__(self):
         return f"{self.title} by {self.employer.username}"
@@ -58,3 +114,119 @@ class JobPost(models.Model):
         ordering = ['-created_at']
         verbose_name = "Job Post"
         verbose_name_plural = "Job Posts"
+        indexes = [
+            # An employer's postings, newest first (JobPostViewSet)
+            models.Index(fields=['employer', '-created_at'], name='jobpost_employer_recent_idx'),
+        ]
+
+class ResumeSkill(models.Model):
+    """One normalized keyword of an analyzed resume; also serves as the skill -> resume index."""
+    resume = models.ForeignKey(Resume, on_delete=models.CASCADE, related_name='resume_skills')
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='resume_skills')
+
+    def __str__(self):
+        return f"{self.skill} ({self.resume_id})"
+
+    class Meta:
+        unique_together = [('resume', 'skill')]
+
+
+class JobPostSkill(models.Model):
+    """One normalized required skill of a job post."""
+    job = models.ForeignKey(JobPost, on_delete=models.CASCADE, related_name='job_skills')
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='job_skills')
+    occurrences = models.PositiveIntegerField(default=1, help_text="Times the skill is listed in skills_required")
+
+    def __str__(self):
+        return f"{self.skill} ({self.job_id})"
+
+    class Meta:
+        unique_together = [('job', 'skill')]
+
+
+class CandidateMatch(models.Model):
+    """Precomputed match between a job post and a resume; only pairs scoring above 5% are stored."""
+    job = models.ForeignKey(JobPost, on_delete=models.CASCADE, related_name='candidate_matches')
+    resume = models.ForeignKey(Resume, on_delete=models.CASCADE, related_name='job_matches')
+    exact_score = models.FloatField(help_text="Jaccard similarity of the skill sets")
+    partial_matches = models.PositiveIntegerField(help_text="Listed job skills with a containing or contained resume skill")
+    partial_score = models.FloatField()
+    combined_score = models.FloatField()
+    matched_skills = models.JSONField(default=list, help_text="Skills the job and resume share exactly")
+    resume_uploaded_at = models.DateTimeField()
+    job_created_at = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.resume} for {self.job} ({self.combined_score:.2f})"
+
+    class Meta:
+        unique_together = [('job', 'resume')]
+        indexes = [
+            models.Index(fields=['job', '-combined_score', '-resume_uploaded_at'], name='match_job_ranking_idx'),
+            models.Index(fields=['resume', '-exact_score', '-job_created_at'], name='match_resume_ranking_idx'),
+        ]
+
+
+class AnalysisJob(models.Model):
+    STATUSES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    resume = models.ForeignKey(Resume, on_delete=models.CASCADE, related_name='analysis_jobs')
+    job_title = models.CharField(max_length=100, null=True, blank=True)
+    analysis_type = models.CharField(max_length=10, default='full')
+    status = models.CharField(max_length=10, choices=STATUSES, default='queued', db_index=True)
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    run_after = models.DateTimeField(null=True, blank=True, help_text="A job retried after a provider outage is not claimed before this time")
+
+    def __str__(self):
+        return f"Analysis #{self.pk} for {self.resume} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in ('done', 'failed')
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Analysis Job"
+        verbose_name_plural = "Analysis Jobs"
+
+
+class AnalysisCacheEntry(models.Model):
+    key = models.CharField(max_length=64, unique=True, help_text="SHA-256 of resume text, analysis type, job title and prompt version")
+    analysis_type = models.CharField(max_length=10)
+    job_title = models.CharField(max_length=100, null=True, blank=True)
+    result = models.JSONField()
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    last_used_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.analysis_type} analysis {self.key[:12]}"
+
+    class Meta:
+        verbose_name = "Analysis Cache Entry"
+        verbose_name_plural = "Analysis Cache Entries"
+
+
+class DataVersion(models.Model):
+    """
+    Counter bumped whenever a kind of data changes (see screening.versions).
+
+    Shared by every process through the database, so HTTP validators and
+    cached responses built from it go stale everywhere at once.
+    """
+    name = models.CharField(max_length=30, unique=True)
+    value = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} v{self.value}"
@@ -0,0 +1,125 @@
+#pagination.py
+import json
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+
+
+class ResumeCursorPagination(CursorPagination):
+    """
+    Newest resumes first, a page at a time.
+
+    The cursor holds every ordering column of the last row seen (a keyset),
+    not just the first one, so no page needs an OFFSET to step over rows that
+    share a value, and rows added while a client pages through are neither
+    skipped nor repeated. Each page is at most one index seek per ordering
+    column, however deep into the table or into a run of equal values it is.
+
+    `?ordering=-score` pages through the best scored resumes first instead
+    (the leaderboard). Unscored resumes are left out of that ranking, as a
+    cursor cannot page past NULL scores.
+    """
+    ordering = ('-upload_date', '-id')
+    orderings = {
+        '-upload_date': ('-upload_date', '-id'),
+        '-score': ('-score', '-id'),
+    }
+    ordering_query_param = 'ordering'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+    def get_ordering(self, request, queryset, view):
+        return self.orderings.get(request.query_params.get(self.ordering_query_param), self.ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # CursorPagination.paginate_queryset, with the keyset seek in place of its position filter and offset
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        if self.ordering[0] == '-score':
+            queryset = queryset.filter(score__isnull=False)
+
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        current_position = self.cursor.position if self.cursor is not None else None
+
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(name[1:] if name.startswith('-') else f'-{name}' for name in ordering)
+        results = self._seek(queryset.order_by(*ordering), ordering, current_position)
+        self.page = results[:self.page_size]
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            # Fetched backwards from the cursor; shown in the usual order
+            self.page = list(reversed(self.page))
+            self.has_next = current_position is not None
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = current_position is not None
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def _seek(self, queryset, ordering, position):
+        """
+        Up to page_size + 1 rows following `position` in `ordering`.
+
+        A row-value comparison such as (score, id) < (7, 123) is only used by
+        SQLite to seek on its first column, so it would still scan the run of
+        equal scores. The keyset is walked instead as separate seeks: the rest
+        of the current run (score = 7 AND id < 123), then the rows after it
+        (score < 7), stopping once the page is full.
+        """
+        if position is None:
+            return list(queryset[:self.page_size + 1])
+        fields = [name.lstrip('-') for name in ordering]
+        values = json.loads(position)
+        results = []
+        for depth in range(len(fields) - 1, -1, -1):
+            lookup = 'lt' if ordering[depth].startswith('-') else 'gt'
+            filters = dict(zip(fields[:depth], values[:depth]))
+            filters[f'{fields[depth]}__{lookup}'] = values[depth]
+            results.extend(queryset.filter(**filters)[:self.page_size + 1 - len(results)])
+            if len(results) > self.page_size:
+                break
+        return results
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        if cursor is None or cursor.position is None:
+            return cursor
+        try:
+            values = json.loads(cursor.position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering) or None in values:
+            raise NotFound(self.invalid_cursor_message)
+        # Keyset positions are unique, so an offset is never needed
+        return Cursor(offset=0, reverse=cursor.reverse, position=cursor.position)
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = [instance[name.lstrip('-')] if isinstance(instance, dict) else getattr(instance, name.lstrip('-'))
+                  for name in ordering]
+        return json.dumps([str(value) for value in values])
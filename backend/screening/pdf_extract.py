@@ -0,0 +1,320 @@
+#pdf_extract.py
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+
+from .metrics import observe_stage
+
+# Why extraction stopped before reading the whole document
+COMPLETE = 'complete'
+PAGE_LIMIT = 'page_limit'
+TEXT_LIMIT = 'text_limit'
+TIME_BUDGET = 'time_budget'
+FILE_TOO_LARGE = 'file_too_large'
+FAILED = 'failed'
+
+# Separates the text of consecutive pages, as pdftotext does, so page headers and footers can be told apart
+PAGE_BREAK = "\f"
+
+# Workers are replaced after this many PDFs so memory leaked by odd documents is returned
+MAX_TASKS_PER_CHILD = 200
+# Seconds a new worker process may take to start; spawned workers import the PDF library afresh
+WORKER_START_TIMEOUT = 60
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class ExtractionResult:
+    """
+    Text gathered from a PDF together with how it was gathered.
+
+    `page_timings` holds one (page number, seconds, characters) tuple per page
+    read, in page order; `stopped` says why reading ended (COMPLETE if every
+    page was read).
+    """
+
+    def __init__(self):
+        self.parts = []
+        self.chars = 0
+        self.page_count = None
+        self.page_timings = []
+        self.stopped = COMPLETE
+        self.error = None
+        self.elapsed = 0.0
+
+    @property
+    def text(self):
+        return PAGE_BREAK.join(self.parts)
+
+    def add_page(self, number, page_text, seconds, max_chars):
+        """Append one page's text, keeping at most `max_chars` characters overall."""
+        self.page_timings.append((number, seconds, len(page_text)))
+        page_text = page_text[:max_chars - self.chars]
+        self.parts.append(page_text)
+        self.chars += len(page_text)
+
+    def summary(self):
+        pages = f"{len(self.page_timings)}/{self.page_count if self.page_count is not None else '?'}"
+        return f"{pages} pages, {self.chars} chars in {self.elapsed:.2f}s ({self.stopped})"
+
+
+def read_pdf(file_path, max_pages, max_chars, max_file_bytes, timeout, on_page=None):
+    """
+    Extract text from a PDF page by page in the current process.
+
+    Reading stops after `max_pages` pages, once `max_chars` characters have
+    been gathered (enough for the prompts), or when `timeout` seconds have
+    passed, keeping the pages read so far. A single page that never finishes
+    is not interrupted here; ExtractionPool kills the worker for that.
+
+    Args:
+        file_path (str): Path to the PDF.
+        max_pages (int): Pages to read at most.
+        max_chars (int): Characters of text to keep at most.
+        max_file_bytes (int): Larger files are refused without being opened.
+        timeout (float): Wall-clock budget for the whole document, in seconds.
+        on_page (callable, optional): Called with the result after each page is added.
+
+    Returns:
+        ExtractionResult: The text and per-page timings; `error` is set if the PDF could not be read.
+    """
+    import PyPDF2  # only extraction workers pay for importing the PDF library
+
+    result = ExtractionResult()
+    started = time.monotonic()
+    try:
+        if os.path.getsize(file_path) > max_file_bytes:
+            result.stopped, result.error = FILE_TOO_LARGE, f"file is larger than {max_file_bytes} bytes"
+            return result
+
+        reader = PyPDF2.PdfReader(file_path)
+        result.page_count = len(reader.pages)
+        for index in range(result.page_count):
+            if index >= max_pages:
+                result.stopped = PAGE_LIMIT
+                break
+            if time.monotonic() - started > timeout:
+                result.stopped = TIME_BUDGET
+                break
+            page_started = time.perf_counter()
+            page_text = reader.pages[index].extract_text() or ""
+            result.add_page(index + 1, page_text, time.perf_counter() - page_started, max_chars)
+            if on_page is not None:
+                on_page(result)
+            if result.chars >= max_chars:
+                if index + 1 < result.page_count:
+                    result.stopped = TEXT_LIMIT
+                break
+    except Exception as e:
+        result.stopped, result.error = FAILED, str(e)
+    result.elapsed = time.monotonic() - started
+    return result
+
+
+def _serve(conn, limits):
+    """
+    Body of an extraction worker process: read_pdf every path received on
+    `conn`, sending each page back as soon as it is read and then the outcome.
+    """
+    import PyPDF2  # noqa: F401 loaded before reporting ready, so start-up is not charged to the first PDF
+
+    def send_page(result):
+        conn.send(('page', result.page_count, result.page_timings[-1], result.parts[-1]))
+
+    try:
+        conn.send(('ready',))
+        while True:
+            file_path = conn.recv()
+            if file_path is None:
+                return
+            result = read_pdf(file_path, *limits, on_page=send_page)
+            conn.send(('done', result.page_count, result.stopped, result.error, result.elapsed))
+    except (EOFError, OSError, KeyboardInterrupt):
+        return
+
+
+class _Worker:
+    """One extraction process and the pipe it receives paths and sends pages on."""
+
+    def __init__(self, context, limits):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_serve, args=(child_conn, limits), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+        try:
+            ready = self.conn.poll(WORKER_START_TIMEOUT) and self.conn.recv() == ('ready',)
+        except (EOFError, OSError):
+            ready = False
+        if not ready:
+            self.kill()
+            raise RuntimeError("extraction process did not start")
+
+    def run(self, file_path, deadline):
+        """
+        Extract one PDF, killing the process if it has not finished by `deadline` (a time.monotonic() value).
+
+        Returns:
+            tuple: (ExtractionResult holding every page received, whether the worker can be reused)
+        """
+        self.tasks += 1
+        started = time.monotonic()
+        result = ExtractionResult()
+        try:
+            self.conn.send(file_path)
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self.conn.poll(remaining):
+                    self.kill()
+                    result.stopped, result.error = TIME_BUDGET, "extraction did not finish in time and was killed"
+                    break
+                message = self.conn.recv()
+                if message[0] == 'page':
+                    _, result.page_count, timing, page_text = message
+                    result.page_timings.append(timing)
+                    result.parts.append(page_text)
+                    result.chars += len(page_text)
+                else:
+                    _, result.page_count, result.stopped, result.error, result.elapsed = message
+                    return result, True
+        except (EOFError, OSError):
+            self.kill()
+            result.stopped, result.error = FAILED, "extraction process exited unexpectedly"
+        result.elapsed = time.monotonic() - started
+        return result, False
+
+    def kill(self):
+        self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+    def stop(self):
+        """Ask the process to exit once it is idle, killing it if it does not."""
+        if self.conn.closed:
+            return
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(timeout=5)
+        self.conn.close()
+
+
+class ExtractionPool:
+    """
+    A pool of worker processes that run read_pdf, keeping PDF parsing off the
+    web and analysis threads (and their GIL).
+
+    Workers send every page back as soon as it is read, and the parent holds
+    each PDF to `timeout` plus a grace period from when a worker takes it.
+    Workers stop themselves at the time budget between pages; a worker stuck
+    inside one page past the deadline is killed and replaced on its own,
+    and the pages it had already sent are kept.
+    """
+
+    def __init__(self, workers, max_pages, max_chars, max_file_bytes, timeout, grace=5):
+        self.workers = workers
+        self.limits = (max_pages, max_chars, max_file_bytes, timeout)
+        self.grace = grace
+        # spawn rather than fork: the parent runs worker threads and holds database connections
+        self._context = multiprocessing.get_context('spawn')
+        self._idle = []
+        self._started = 0
+        self._generation = 0
+        self._cond = threading.Condition()
+
+    def _acquire(self):
+        """An idle worker, starting one if fewer than `workers` are running. Returns (worker, generation)."""
+        with self._cond:
+            while not self._idle and self._started >= self.workers:
+                self._cond.wait()
+            if self._idle:
+                return self._idle.pop(), self._generation
+            self._started += 1
+            generation = self._generation
+        try:
+            return _Worker(self._context, self.limits), generation
+        except Exception:
+            self._forget(generation)
+            raise
+
+    def _forget(self, generation):
+        with self._cond:
+            if generation == self._generation:
+                self._started -= 1
+            self._cond.notify()
+
+    def _release(self, worker, generation, reusable):
+        with self._cond:
+            if reusable and generation == self._generation and worker.tasks < MAX_TASKS_PER_CHILD:
+                self._idle.append(worker)
+                self._cond.notify()
+                return
+        self._forget(generation)
+        worker.stop()
+
+    def extract(self, file_path):
+        """Extract one PDF in a worker process, see read_pdf."""
+        started = time.monotonic()
+        try:
+            worker, generation = self._acquire()
+        except Exception as e:
+            result = ExtractionResult()
+            result.stopped, result.error = FAILED, str(e)
+            result.elapsed = time.monotonic() - started
+            return result
+        reusable = False
+        try:
+            result, reusable = worker.run(file_path, time.monotonic() + self.limits[3] + self.grace)
+        finally:
+            self._release(worker, generation, reusable)
+        observe_stage('pdf_extract', result.elapsed)
+        return result
+
+    def map(self, file_paths):
+        """
+        Extract many PDFs across the pool, yielding (path, ExtractionResult) as each one finishes.
+
+        Every PDF gets its own deadline (see extract), so a stuck document
+        costs one worker and its own result, never the rest of the batch.
+        """
+        file_paths = list(file_paths)
+        if not file_paths:
+            return
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(file_paths))) as executor:
+            futures = {executor.submit(self.extract, path): path for path in file_paths}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+    def shutdown(self):
+        """Stop the idle workers; busy ones exit when their PDF is done. The next call starts fresh workers."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._started = 0
+            self._generation += 1
+            self._cond.notify_all()
+        for worker in idle:
+            worker.stop()
+
+
+def get_extraction_pool():
+    """The process-wide extraction pool, configured from settings and started on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ExtractionPool(
+                workers=settings.PDF_EXTRACT_WORKERS,
+                max_pages=settings.PDF_MAX_PAGES,
+                max_chars=settings.PDF_MAX_TEXT_CHARS,
+                max_file_bytes=settings.PDF_MAX_FILE_BYTES,
+                timeout=settings.PDF_EXTRACT_TIMEOUT,
+            )
+        return _pool
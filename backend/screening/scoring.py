@@ -0,0 +1,119 @@
+#scoring.py
+import numpy as np
+
+
+def jaccard(a, b):
+    """Jaccard similarity of two keyword sets."""
+    union = len(a | b)
+    return len(a & b) / union if union > 0 else 0
+
+
+class SkillMatrix:
+    """
+    A batch of skill sets in compressed sparse row form.
+
+    Row `i` is the set of skill ids `indices[indptr[i]:indptr[i + 1]]` belonging
+    to `row_ids[i]` (a resume or job id). Every query below scores all rows
+    against one skill set in a single vectorized pass, with results equal to
+    computing each pair with Python sets.
+    """
+
+    def __init__(self, row_ids, indptr, indices, weights=None):
+        self.row_ids = np.asarray(row_ids, dtype=np.int64)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.weights = None if weights is None else np.asarray(weights, dtype=np.int64)
+        self.sizes = np.diff(self.indptr)
+
+    @classmethod
+    def from_pairs(cls, pairs, weighted=False):
+        """
+        Build from (row id, skill id) pairs grouped by row id; each pair must be unique.
+
+        With `weighted`, pairs are (row id, skill id, weight) triples.
+        """
+        row_ids, indptr, indices, weights = [], [0], [], []
+        for pair in pairs:
+            row_id, skill_id = pair[0], pair[1]
+            if not row_ids or row_ids[-1] != row_id:
+                if row_ids:
+                    indptr.append(len(indices))
+                row_ids.append(row_id)
+            indices.append(skill_id)
+            if weighted:
+                weights.append(pair[2])
+        if row_ids:
+            indptr.append(len(indices))
+        return cls(row_ids, indptr, indices, weights if weighted else None)
+
+    @classmethod
+    def from_sets(cls, row_ids, skill_sets):
+        """Build from parallel sequences of row ids and sets of skill ids."""
+        indptr = np.zeros(len(skill_sets) + 1, dtype=np.int64)
+        np.cumsum([len(skills) for skills in skill_sets], out=indptr[1:])
+        indices = np.fromiter((skill for skills in skill_sets for skill in skills), dtype=np.int64, count=indptr[-1])
+        return cls(row_ids, indptr, indices)
+
+    def __len__(self):
+        return len(self.row_ids)
+
+    def _membership(self, skill_ids):
+        """Boolean per stored entry: is its skill one of `skill_ids`?"""
+        skill_ids = np.asarray(list(skill_ids), dtype=np.int64)
+        if not len(self.indices) or not len(skill_ids):
+            return np.zeros(len(self.indices), dtype=bool)
+        size = int(max(self.indices.max(), skill_ids.max())) + 1
+        lookup = np.zeros(size, dtype=bool)
+        lookup[skill_ids] = True
+        return lookup[self.indices]
+
+    def _row_sums(self, values):
+        totals = np.concatenate(([0], np.cumsum(values, dtype=np.int64)))
+        return totals[self.indptr[1:]] - totals[self.indptr[:-1]]
+
+    def intersection_counts(self, skill_ids):
+        """Number of `skill_ids` each row contains."""
+        return self._row_sums(self._membership(skill_ids))
+
+    def weighted_counts(self, skill_ids):
+        """Sum of the weights of the `skill_ids` each row contains."""
+        return self._row_sums(self._membership(skill_ids) * self.weights)
+
+    def weight_totals(self):
+        """Sum of all weights in each row."""
+        return self._row_sums(self.weights)
+
+    def contains_any(self, skill_ids):
+        """Whether each row contains at least one of `skill_ids`."""
+        return self.intersection_counts(skill_ids) > 0
+
+    def jaccard(self, skill_ids, query_size=None):
+        """
+        Jaccard similarity of every row with a skill set.
+
+        `query_size` is the size of the full query set when it holds members
+        that no row can contain (e.g. keywords without a Skill id).
+        """
+        skill_ids = set(skill_ids)
+        query_size = len(skill_ids) if query_size is None else query_size
+        intersection = self.intersection_counts(skill_ids)
+        union = self.sizes + query_size - intersection
+        scores = np.zeros(len(self), dtype=np.float64)
+        np.divide(intersection, union, out=scores, where=union > 0)
+        return scores
+
+
+def top_k(scores, k, threshold, *tiebreakers):
+    """
+    Indices of the `k` best rows with a score above `threshold`, best first.
+
+    Ties on score are broken by each array in `tiebreakers` in turn, larger
+    first. Only rows that can make the cut are fully sorted.
+    """
+    candidates = np.flatnonzero(scores > threshold)
+    if len(candidates) > k:
+        cutoff = np.partition(scores[candidates], len(candidates) - k)[len(candidates) - k]
+        candidates = candidates[scores[candidates] >= cutoff]
+    keys = [-np.asarray(key)[candidates] for key in reversed(tiebreakers)] + [-scores[candidates]]
+    order = np.lexsort(keys)
+    return candidates[order][:k]
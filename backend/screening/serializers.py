@@ -1,21 +1,78 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 
-from .models import Resume, JobPost
+from .models import Resume, JobPost, AnalysisJob
 
-class ResumeSerializer(serializers.ModelSerializer):
+class FieldSelectionMixin:
+    """
+    Lets GET requests pick the fields they need with `?fields=id,email,score`.
+
+    Without the parameter, `default_fields` is used when the serializer sets
+    it, and otherwise every field.
+    """
+    default_fields = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        wanted = self.default_fields
+        if request is not None and request.method == 'GET' and request.query_params.get('fields'):
+            wanted = [name.strip() for name in request.query_params['fields'].split(',') if name.strip()]
+        if wanted:
+            for name in set(self.fields) - set(wanted):
+                self.fields.pop(name)
+
+
+class ResumeSerializer(FieldSelectionMixin, serializers.ModelSerializer):
     keywords_list = serializers.SerializerMethodField()
     matching_score = serializers.FloatField(read_only=True)
 
+    # Model columns behind computed fields, so list queries can load only what is shown
+    field_columns = {'keywords_list': 'keywords'}
+
     class Meta:
         model = Resume
-        fields = '__all__'
+        # Listed explicitly so internal bookkeeping (skill index, stored text) stays out of the API
+        fields = ['id', 'candidate_name', 'email', 'resume_file', 'upload_date', 'score', 'review', 'keywords',
+                  'keywords_list', 'job_title', 'relevance_score', 'relevance_tips', 'matching_score']
         read_only_fields = ['upload_date', 'score', 'review', 'keywords', 'matching_score']
 
     def get_keywords_list(self, obj):
         return obj.get_keywords_list()
 
 
+class ResumeListSerializer(ResumeSerializer):
+    """Slim rows for the resume list; the long review texts are left to the detail view."""
+    default_fields = ['id', 'candidate_name', 'email', 'job_title', 'score', 'relevance_score', 'matching_score',
+                      'upload_date']
+
+
+def serialize_candidates(matches, context=None):
+    """
+    find_candidates entries as the API returns them: each resume's fields plus how it matched.
+
+    The resumes are serialized as one list, so the serializer is built once
+    rather than per row.
+    """
+    resumes = ResumeSerializer([match['resume'] for match in matches], many=True, context=context or {}).data
+    for data, match in zip(resumes, matches):
+        data['matching_score'] = match['score']
+        data['exact_matches'] = match['exact_matches']
+        data['partial_matches'] = match['partial_matches']
+        data['last_updated'] = match['last_updated']
+    return resumes
+
+
+class AnalysisJobSerializer(serializers.ModelSerializer):
+    resume = ResumeSerializer(read_only=True)
+
+    class Meta:
+        model = AnalysisJob
+        fields = ['id', 'status', 'analysis_type', 'job_title', 'attempts', 'error',
+                  'created_at', 'started_at', 'finished_at', 'resume']
+        read_only_fields = fields
+
+
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
 
@@ -38,7 +95,8 @@ class JobPostSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = JobPost
-        fields = '__all__'
+        fields = ['id', 'employer', 'employer_username', 'company_name', 'title', 'description', 'location',
+                  'job_type', 'salary_range', 'skills_required', 'skills_list', 'created_at']
         read_only_fields = ['employer', 'created_at', 'employer_username', 'skills_list']
 
     def get_skills_list(self, obj):
@@ -0,0 +1,82 @@
+#signals.py
+from django.db.backends.signals import connection_created
+from django.db.models import DEFERRED
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from . import versions
+from .http_cache import get_response_cache
+from .match_table import refresh_job_matches, refresh_resume_matches
+from .middleware import install_query_counter
+from .models import JobPost, Resume, Skill
+from .skill_index import index_job, index_resume
+
+
+@receiver(connection_created)
+def count_request_queries(sender, connection, **kwargs):
+    install_query_counter(connection)
+
+
+@receiver(post_init, sender=Resume)
+def remember_keywords(sender, instance, **kwargs):
+    # Read without loading the column, which .only() querysets leave deferred
+    instance._saved_keywords = instance.__dict__.get('keywords', DEFERRED)
+
+
+@receiver(post_init, sender=JobPost)
+def remember_skills_required(sender, instance, **kwargs):
+    instance._saved_skills_required = instance.__dict__.get('skills_required', DEFERRED)
+
+
+@receiver(post_save, sender=Resume)
+def update_skill_index(sender, instance, created=False, update_fields=None, **kwargs):
+    """Keep the resume's normalized skills and job matches in step with Resume.keywords."""
+    if update_fields is not None and 'keywords' not in update_fields:
+        return
+    if not created and instance.keywords == instance._saved_keywords:
+        return
+    index_resume(instance)
+    refresh_resume_matches(instance)
+    instance._saved_keywords = instance.keywords
+
+
+@receiver(post_save, sender=JobPost)
+def update_job_skills(sender, instance, created=False, update_fields=None, **kwargs):
+    """Keep the job's normalized skills and candidate matches in step with JobPost.skills_required."""
+    if update_fields is not None and 'skills_required' not in update_fields:
+        return
+    if not created and instance.skills_required == instance._saved_skills_required:
+        return
+    index_job(instance)
+    refresh_job_matches(instance)
+    instance._saved_skills_required = instance.skills_required
+
+
+@receiver(post_delete, sender=Resume)
+def bump_match_version(sender, **kwargs):
+    """The resume's matches were deleted with it, so open candidate streams must drop it."""
+    versions.bump(versions.MATCHES)
+
+
+@receiver(post_save, sender=Resume)
+@receiver(post_delete, sender=Resume)
+def bump_resume_version(sender, **kwargs):
+    """Invalidate ETags and cached responses built from resume data."""
+    versions.bump(versions.RESUMES)
+    get_response_cache().clear()
+
+
+@receiver(post_save, sender=JobPost)
+@receiver(post_delete, sender=JobPost)
+def bump_job_version(sender, **kwargs):
+    """Invalidate ETags and cached responses built from job data."""
+    versions.bump(versions.JOBS)
+    get_response_cache().clear()
+
+
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+def bump_skill_version(sender, created=False, **kwargs):
+    """Let the substring index see skills changed outside skill_ids (the admin, a shell)."""
+    # Only additions can be appended to the index; anything else rebuilds it
+    versions.bump(versions.SKILLS if created else versions.SKILL_EDITS)
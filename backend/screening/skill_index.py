@@ -0,0 +1,123 @@
+#skill_index.py
+from collections import Counter
+
+from django.utils import timezone
+
+from . import versions
+from .models import ANALYZED, JobPost, JobPostSkill, Resume, ResumeSkill, Skill
+from .substring_index import get_substring_index
+
+
+def normalize_keywords(keywords):
+    """
+    Split a comma-separated keyword string into the set the matchers compare.
+
+    Tokens are only lowercased and stripped, exactly as the scoring code always
+    did, so empty tokens from stray commas are kept; they take part in partial
+    matching and in the Jaccard union.
+    """
+    return set(normalize_keyword_list(keywords))
+
+
+def normalize_keyword_list(keywords):
+    """Like normalize_keywords, but keeps order and duplicates (partial scoring counts every listed skill)."""
+    return [k.lower().strip() for k in keywords.split(',')]
+
+
+def skill_ids(names):
+    """Map each normalized skill name to its Skill id, creating missing skills."""
+    names = set(names)
+    existing = {}
+    for batch in chunks(names):
+        existing.update(Skill.objects.filter(name__in=batch).values_list('name', 'id'))
+    missing = names.difference(existing)
+    if missing:
+        Skill.objects.bulk_create([Skill(name=name) for name in missing], batch_size=500, ignore_conflicts=True)
+        # bulk_create sends no post_save, so the substring index is told here
+        versions.bump(versions.SKILLS)
+        for batch in chunks(missing):
+            existing.update(Skill.objects.filter(name__in=batch).values_list('name', 'id'))
+    return existing
+
+
+def index_resume(resume):
+    """Replace the stored skills of one resume with its current keywords."""
+    ResumeSkill.objects.filter(resume_id=resume.pk).delete()
+    if resume.keywords:
+        ids = skill_ids(normalize_keywords(resume.keywords))
+        ResumeSkill.objects.bulk_create([ResumeSkill(resume_id=resume.pk, skill_id=skill_id) for skill_id in ids.values()])
+    resume.skills_updated_at = timezone.now()
+    Resume.objects.filter(pk=resume.pk).update(skills_updated_at=resume.skills_updated_at)
+
+
+def index_job(job):
+    """Replace the stored skills of one job post with its current skills_required."""
+    JobPostSkill.objects.filter(job_id=job.pk).delete()
+    occurrences = Counter(normalize_keyword_list(job.skills_required or ""))
+    ids = skill_ids(occurrences)
+    JobPostSkill.objects.bulk_create([
+        JobPostSkill(job_id=job.pk, skill_id=ids[name], occurrences=count) for name, count in occurrences.items()
+    ])
+
+
+def rebuild_index(batch_size=1000):
+    """Re-derive every resume's and job's skills. Returns (resumes, jobs) indexed."""
+    ResumeSkill.objects.all().delete()
+    JobPostSkill.objects.all().delete()
+
+    resumes = 0
+    batch = []
+    for row in Resume.objects.filter(ANALYZED).order_by('id') \
+            .values_list('id', 'keywords').iterator(chunk_size=batch_size):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            resumes += _index_resume_batch(batch)
+            batch = []
+    resumes += _index_resume_batch(batch)
+
+    jobs = 0
+    for job in JobPost.objects.only('id', 'skills_required').iterator(chunk_size=batch_size):
+        index_job(job)
+        jobs += 1
+    versions.bump(versions.RESUMES, versions.JOBS)
+    return resumes, jobs
+
+
+def index_resumes(rows):
+    """Replace the stored skills of many resumes at once, from (resume id, keywords) pairs."""
+    resume_ids = [resume_id for resume_id, _ in rows]
+    for batch in chunks(resume_ids):
+        ResumeSkill.objects.filter(resume_id__in=batch).delete()
+    _index_resume_batch([(resume_id, keywords) for resume_id, keywords in rows if keywords])
+    for batch in chunks(resume_ids):
+        Resume.objects.filter(id__in=batch).update(skills_updated_at=timezone.now())
+    versions.bump(versions.RESUMES)
+    return len(rows)
+
+
+def _index_resume_batch(rows):
+    keyword_sets = [(resume_id, normalize_keywords(keywords)) for resume_id, keywords in rows]
+    ids = skill_ids(set().union(*(skills for _, skills in keyword_sets)))
+    ResumeSkill.objects.bulk_create([
+        ResumeSkill(resume_id=resume_id, skill_id=ids[name]) for resume_id, skills in keyword_sets for name in skills
+    ])
+    Resume.objects.filter(id__in=[resume_id for resume_id, _ in rows]).update(skills_updated_at=timezone.now())
+    return len(rows)
+
+
+def related_skill_ids(job_keywords):
+    """
+    Map each job keyword to the ids of the skills that equal, contain or are contained in it.
+
+    Exact matches are a subset of these, so a resume holding none of them,
+    for any job keyword, scores zero.
+    """
+    index = get_substring_index()
+    return {job_keyword: index.related(job_keyword) for job_keyword in job_keywords}
+
+
+def chunks(values, size=500):
+    """Split a list into slices small enough for an IN (...) clause on every backend."""
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
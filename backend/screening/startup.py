@@ -0,0 +1,63 @@
+#startup.py
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+
+# Heavy libraries that must only be imported when a resume is actually analyzed or parsed
+LAZY_MODULES = ('google.generativeai', 'google.ai', 'grpc', 'PyPDF2')
+
+# What a web worker imports before serving its first request
+STARTUP_STATEMENT = "import django; django.setup(); import resume_portal.urls"
+
+
+class ImportProfile:
+    """
+    Parsed `python -X importtime` output.
+
+    `imports` holds one (module, self µs, cumulative µs, depth) tuple per
+    module, depth 0 being imports made directly by the measured statement.
+    """
+
+    def __init__(self, imports):
+        self.imports = imports
+
+    @property
+    def total_ms(self):
+        return sum(self_us for _, self_us, _, _ in self.imports) / 1000
+
+    def loaded(self, module):
+        return any(name == module or name.startswith(module + '.') for name, _, _, _ in self.imports)
+
+    def eager_lazy_modules(self):
+        """The LAZY_MODULES that were imported anyway."""
+        return [module for module in LAZY_MODULES if self.loaded(module)]
+
+    def slowest(self, count=10):
+        """Top-level imports with the largest cumulative time, as (module, µs) pairs."""
+        top_level = [(name, cumulative) for name, _, cumulative, depth in self.imports if depth == 0]
+        return sorted(top_level, key=lambda item: item[1], reverse=True)[:count]
+
+
+def measure_imports(statement=STARTUP_STATEMENT):
+    """
+    Run `statement` in a fresh interpreter under `-X importtime`.
+
+    Returns:
+        ImportProfile: Every module the statement imported, with timings.
+    """
+    env = dict(os.environ)
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'resume_portal.settings')
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    imports = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        imports.append((name.strip(), int(self_us), int(cumulative), depth))
+    return ImportProfile(imports)
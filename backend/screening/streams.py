@@ -0,0 +1,102 @@
+#streams.py
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+
+from . import versions
+from .matching import find_candidates
+from .serializers import serialize_candidates
+
+
+def sse_event(event, data, event_id=None):
+    """One server-sent event, JSON encoded."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append("data: " + json.dumps(data, cls=DjangoJSONEncoder))
+    return "\n".join(lines) + "\n\n"
+
+
+class CandidateStream:
+    """
+    Server-sent events for one job's candidates.
+
+    Every event is a `snapshot` holding the job's current ranking, sent when
+    the connection opens and again whenever the matches version counter
+    moves, so candidates that dropped out of the ranking disappear as well.
+    Each event id is the version the snapshot was read at; the counter only
+    grows and is bumped in the same transaction as the match writes, so a
+    browser reconnecting with Last-Event-ID misses no change, whatever the
+    clocks of the servers say. The match table is only queried when the
+    version moved.
+
+    Args:
+        job (JobPost): The job whose candidates are streamed.
+        last_version (int, optional): Version of the snapshot the client already holds.
+        context (dict, optional): Serializer context, for absolute file URLs.
+        poll_interval (float): Seconds between checks for changes.
+        heartbeat (float): Seconds of silence before a keep-alive comment is sent.
+        max_seconds (float): How long to stream before closing; the browser reconnects.
+    """
+
+    def __init__(self, job, last_version=None, context=None, poll_interval=2, heartbeat=15, max_seconds=300):
+        self.job = job
+        self.last_version = last_version
+        self.context = context
+        self.poll_interval = poll_interval
+        self.heartbeat = heartbeat
+        self.max_seconds = max_seconds
+
+    @staticmethod
+    def _version():
+        (version,), _ = versions.current(versions.MATCHES)
+        return version
+
+    def _snapshot(self):
+        """The ranking if the version moved since the last snapshot, else None."""
+        # Read before the ranking: a change landing in between is sent again next time, never lost
+        version = self._version()
+        if version == self.last_version:
+            return None
+        self.last_version = version
+        return serialize_candidates(find_candidates(self.job), self.context)
+
+    def _retry(self):
+        return f"retry: {int(self.poll_interval * 1000)}\n\n"
+
+    def poll(self):
+        """
+        The events available right now, as one response body.
+
+        For servers that cannot hold a stream open (WSGI): the browser's
+        reconnects, every poll_interval, then do the polling.
+        """
+        body = self._retry()
+        candidates = self._snapshot()
+        if candidates is not None:
+            body += sse_event('snapshot', candidates, self.last_version)
+        return body
+
+    async def events(self):
+        loop = asyncio.get_running_loop()
+        started = last_sent = loop.time()
+        yield self._retry()
+
+        sent = None
+        while True:
+            candidates = await sync_to_async(self._snapshot)()
+            # Other jobs' matches move the version too; skip rankings the client already shows
+            if candidates is not None and candidates != sent:
+                sent = candidates
+                last_sent = loop.time()
+                yield sse_event('snapshot', candidates, self.last_version)
+
+            if loop.time() - started >= self.max_seconds:
+                return
+            if loop.time() - last_sent >= self.heartbeat:
+                last_sent = loop.time()
+                yield ": keep-alive\n\n"
+            await asyncio.sleep(self.poll_interval)
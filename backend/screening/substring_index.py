@@ -0,0 +1,116 @@
+#substring_index.py
+import threading
+from bisect import bisect_left
+
+from django.db.models import Count, Max, Q
+
+from . import versions
+from .models import Skill
+
+# Sorts after every character a skill name can contain
+_PREFIX_END = chr(0x10FFFF)
+
+# New skills are scanned linearly until there are this many, then the index is rebuilt
+MAX_PENDING_SKILLS = 2000
+
+_index = None
+_index_lock = threading.Lock()
+
+
+class SubstringIndex:
+    """
+    Answers "which vocabulary skills contain, or are contained in, this keyword?"
+
+    Every suffix of every skill name is kept in one sorted list, so the skills
+    containing a keyword are the contiguous run of suffixes starting with it,
+    found with two binary searches. Skills contained in a keyword are found by
+    looking each of the keyword's substrings up in a name -> id map.
+    """
+
+    def __init__(self, skills, last_id=0):
+        self.ids = {}
+        self.last_id = last_id
+        self.longest = 0
+        suffixes = []
+        for skill_id, name in skills:
+            self.ids[name] = skill_id
+            self.longest = max(self.longest, len(name))
+            suffixes.extend((name[start:], skill_id) for start in range(len(name)))
+        suffixes.sort()
+        self._suffixes = [suffix for suffix, _ in suffixes]
+        self._owners = [skill_id for _, skill_id in suffixes]
+        self.pending = []
+        self.version = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, skills):
+        """Add skills created after the index was built; they are scanned linearly until the next rebuild."""
+        for skill_id, name in skills:
+            self.ids[name] = skill_id
+            self.longest = max(self.longest, len(name))
+            self.pending.append((skill_id, name))
+
+    def containing(self, keyword):
+        """Ids of skills that contain `keyword` (every skill for the empty keyword)."""
+        start = bisect_left(self._suffixes, keyword)
+        end = bisect_left(self._suffixes, keyword + _PREFIX_END, start)
+        found = set(self._owners[start:end])
+        found.update(skill_id for skill_id, name in self.pending if keyword in name)
+        if keyword == "" and "" in self.ids:
+            found.add(self.ids[""])  # the empty name has no suffixes
+        return found
+
+    def contained_in(self, keyword):
+        """Ids of skills whose whole name occurs inside `keyword`."""
+        found = set()
+        if "" in self.ids:
+            found.add(self.ids[""])
+        for start in range(len(keyword)):
+            for end in range(start + 1, min(start + self.longest, len(keyword)) + 1):
+                skill_id = self.ids.get(keyword[start:end])
+                if skill_id is not None:
+                    found.add(skill_id)
+        return found
+
+    def related(self, keyword):
+        """Ids of skills where `keyword in name or name in keyword`."""
+        return self.containing(keyword) | self.contained_in(keyword)
+
+
+def get_substring_index():
+    """
+    The process-wide index, kept in step with the Skill table.
+
+    New skills bump the SKILLS data version and edits or deletions bump
+    SKILL_EDITS, so a call only reads those rows while nothing changed.
+    Skills are only ever added in normal operation, so after a SKILLS bump
+    the new rows are appended to the existing index. That is checked, not
+    assumed: the rows the index already holds must all still be there. Any
+    other change, or a long pending list, triggers a full rebuild.
+    """
+    global _index
+    # Read before the skills, so rows added meanwhile are picked up by the next call
+    version = versions.current(versions.SKILLS, versions.SKILL_EDITS)
+    with _index_lock:
+        index = _index
+        if index is not None and index.version == version:
+            return index
+
+        if index is not None and index.version[0][1] == version[0][1] and len(index.pending) < MAX_PENDING_SKILLS:
+            state = Skill.objects.aggregate(kept=Count('id', filter=Q(id__lte=index.last_id)), last_id=Max('id'))
+            if state['kept'] == len(index):
+                if (state['last_id'] or 0) > index.last_id:
+                    index.add(Skill.objects.filter(id__gt=index.last_id, id__lte=state['last_id'])
+                              .values_list('id', 'name'))
+                    index.last_id = state['last_id']
+                index.version = version
+                return index
+
+        last_id = Skill.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+        index = SubstringIndex(Skill.objects.filter(id__lte=last_id).values_list('id', 'name').iterator(chunk_size=5000),
+                               last_id)
+        index.version = version
+        _index = index
+        return index
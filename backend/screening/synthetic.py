@@ -0,0 +1,70 @@
+#synthetic.py
+BASE_SKILLS = [
+    "python", "java", "javascript", "typescript", "sql", "postgresql", "mysql", "django", "flask", "react",
+    "node.js", "aws", "azure", "docker", "kubernetes", "terraform", "git", "linux", "pandas", "numpy",
+    "machine learning", "deep learning", "excel", "tableau", "power bi", "marketing", "sales", "finance",
+    "c++", "c#", "go", "rust", "spring", "rest apis", "graphql", "redis", "kafka", "spark", "hadoop", "css",
+]
+QUALIFIERS = ["advanced", "cloud", "data", "web", "mobile", "distributed", "applied", "enterprise"]
+
+
+def skill_vocabulary(size, rng):
+    """`size` distinct lowercase skills: the common base skills first, then qualified variants."""
+    vocabulary = list(BASE_SKILLS[:size])
+    seen = set(vocabulary)
+    while len(vocabulary) < size:
+        skill = f"{rng.choice(QUALIFIERS)} {rng.choice(BASE_SKILLS)} {rng.randint(1, 999)}"
+        if skill not in seen:
+            seen.add(skill)
+            vocabulary.append(skill)
+    return vocabulary
+
+
+def skill_sets(count, vocabulary, rng, min_skills=3, max_skills=15):
+    """
+    `count` skill sets drawn with Zipf-like popularity, so a few skills are
+    very common and most are rare, as in real resumes.
+    """
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    sets = []
+    for _ in range(count):
+        size = rng.randint(min_skills, max_skills)
+        skills = set(rng.choices(vocabulary, weights=weights, k=size))
+        sets.append(skills)
+    return sets
+
+
+def _pdf_escape(line):
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path, pages):
+    """
+    Write a minimal text-only PDF, one page per list of lines, readable by PyPDF2.
+
+    Used to build benchmark inputs without a PDF library.
+    """
+    font_id = 3 + 2 * len(pages)
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [{}] /Count {} >>".format(" ".join(f"{3 + 2 * i} 0 R" for i in range(len(pages))), len(pages)),
+    ]
+    for i, lines in enumerate(pages):
+        text = " T* ".join(f"({_pdf_escape(line)}) Tj" for line in lines)
+        content = f"BT /F1 10 Tf 14 TL 50 750 Td {text} ET"
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {4 + 2 * i} 0 R "
+                       f"/Resources << /Font << /F1 {font_id} 0 R >> >> >>")
+        objects.append(f"<< /Length {len(content.encode('latin-1'))} >>\nstream\n{content}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = "%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out.encode('latin-1')))
+        out += f"{number} 0 obj\n{body}\nendobj\n"
+    xref = len(out.encode('latin-1'))
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    with open(path, 'wb') as f:
+        f.write(out.encode('latin-1'))
@@ -1,3 +1,1188 @@
-from django.test import TestCase
+import hashlib
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .ai_module import (analyze_text, keywords_prompt, relevance_prompt, review_prompt, run_prompts_concurrently,
+                        score_prompt)
+from .analysis_cache import AnalysisCache
+from .analysis_queue import AnalysisWorkerPool, claim_next_job, enqueue_analysis, requeue_stale_jobs, run_job
+from .benchmarks import CaseResult, regressions, run_suite, seed_dataset
+from .fake_llm import FakeAPIError, FakeResponse, StubModel, prompt_kind
+from .http_cache import get_response_cache
+from .ingest import ManifestRow, ResumeIngestor
+from .llm_backends import HeuristicBackend, RecordingBackend, ReplayBackend, ReplayMiss
+from .llm_client import CircuitBreaker, CircuitOpenError, LLMClient, LLMUnavailable, TokenBucket
+from .match_table import _score_resumes_for_job, rebuild_matches, refresh_resume_matches
+from .matching import find_candidates, find_matching_jobs
+from .models import (ANALYZED, AnalysisCacheEntry, AnalysisJob, CandidateMatch, ExtractedText, JobPost, Resume,
+                     ResumeSkill, Skill)
+from .pdf_extract import (FILE_TOO_LARGE, PAGE_LIMIT, TEXT_LIMIT, TIME_BUDGET, ExtractionPool,
+                          read_pdf)
+from .skill_index import normalize_keywords, rebuild_index, related_skill_ids
+from .startup import measure_imports
+from .substring_index import get_substring_index
+from .synthetic import write_pdf
+from .text_prep import PreparedText, normalize_lines
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class ScriptedModel:
+    """Raises or replies following a script, one entry per call."""
+
+    def __init__(self, *script):
+        self.script = list(script)
+        self.calls = 0
+
+    def generate_content(self, prompt, **kwargs):
+        self.calls += 1
+        outcome = self.script.pop(0) if self.script else "ok"
+        if isinstance(outcome, Exception):
+            raise outcome
+        return FakeResponse(outcome)
+
+
+def make_client(model, clock, max_retries=3, breaker=None, requests_per_minute=6000):
+    return LLMClient(model, requests_per_minute=requests_per_minute, tokens_per_minute=10 ** 9,
+                     max_retries=max_retries, backoff_base=1, backoff_max=8, max_wait=60,
+                     breaker=breaker or CircuitBreaker(10, 30, clock=clock), sleep=clock.sleep)
+
+
+class LLMClientTests(SimpleTestCase):
+    def test_retries_rate_limited_calls_with_backoff(self):
+        clock = FakeClock()
+        model = ScriptedModel(FakeAPIError(429), FakeAPIError(503), "fine")
+        client = make_client(model, clock)
+
+        self.assertEqual(client.generate_content("prompt").text, "fine")
+        self.assertEqual(model.calls, 3)
+        self.assertEqual(len(clock.sleeps), 2)
+        self.assertTrue(0 <= clock.sleeps[0] <= 1 and 0 <= clock.sleeps[1] <= 2)
+        metrics = client.metrics.snapshot()
+        self.assertEqual((metrics['successes'], metrics['retries'], metrics['rate_limited']), (1, 2, 1))
+
+    def test_gives_up_after_max_retries(self):
+        clock = FakeClock()
+        model = ScriptedModel(*[FakeAPIError(429)] * 5)
+        client = make_client(model, clock, max_retries=2)
+
+        with self.assertRaises(LLMUnavailable):
+            client.generate_content("prompt")
+        self.assertEqual(model.calls, 3)
+        self.assertEqual(client.metrics.snapshot()['failures'], 1)
+
+    def test_bad_requests_are_not_retried(self):
+        clock = FakeClock()
+        model = ScriptedModel(FakeAPIError(400))
+        client = make_client(model, clock)
+
+        with self.assertRaises(FakeAPIError):
+            client.generate_content("prompt")
+        self.assertEqual(model.calls, 1)
+        self.assertEqual(client.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_bad_requests_do_not_reset_the_failure_count(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock)
+        model = ScriptedModel(FakeAPIError(503), FakeAPIError(400), FakeAPIError(503), FakeAPIError(400))
+        client = make_client(model, clock, max_retries=0, breaker=breaker)
+
+        for error in (LLMUnavailable, FakeAPIError, LLMUnavailable):
+            with self.assertRaises(error):
+                client.generate_content("prompt")
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+        # A bad request as the half-open trial leaves the circuit half-open for the next call
+        clock.now += 30
+        with self.assertRaises(FakeAPIError):
+            client.generate_content("prompt")
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertEqual(client.generate_content("prompt").text, "ok")
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_circuit_breaker_fails_fast_then_recovers(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock)
+        model = ScriptedModel(FakeAPIError(503), FakeAPIError(503))
+        client = make_client(model, clock, max_retries=5, breaker=breaker)
+
+        with self.assertRaises(CircuitOpenError):
+            client.generate_content("prompt")
+        self.assertEqual(model.calls, 2)
+
+        with self.assertRaises(CircuitOpenError):
+            client.generate_content("prompt")
+        self.assertEqual(model.calls, 2)
+        self.assertEqual(client.metrics.snapshot()['circuit_rejections'], 2)
+
+        clock.now += 30
+        self.assertEqual(client.generate_content("prompt").text, "ok")
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_token_bucket_spaces_requests(self):
+        clock = FakeClock()
+        bucket = TokenBucket(per_minute=60, capacity=2, clock=clock, sleep=clock.sleep)
+
+        waits = [bucket.acquire() for _ in range(4)]
+        self.assertEqual(waits[:2], [0.0, 0.0])
+        self.assertAlmostEqual(waits[2], 1.0)
+        self.assertAlmostEqual(clock.now, 2.0)
+        self.assertIsNone(bucket.acquire(max_wait=0.5))
+
+
+class AnalysisFailureTests(TestCase):
+    def test_provider_outage_fails_the_job_instead_of_saving_empty_scores(self):
+        entry = ExtractedText(content_hash="0" * 64, stopped='complete')
+        entry.text = "Python developer"
+        entry.save()
+        resume = Resume.objects.create(candidate_name="A", email="a@example.com", extracted_text=entry)
+        job = AnalysisJob.objects.create(resume=resume)
+        model = StubModel(error_rate=1.0, error_code=503)
+        client = make_client(model, FakeClock(), max_retries=1)
+
+        with self.assertRaises(LLMUnavailable):
+            analyze_text("Python developer", analysis_type="full", model=client)
+
+        job.attempts = settings.ANALYSIS_MAX_ATTEMPTS
+        run_job(job, model=client)
+        job.refresh_from_db()
+        resume.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertIsNone(resume.score)
+
+
+class OutageForKind(StubModel):
+    """StubModel that raises LLMUnavailable for one prompt kind and records the kinds it was asked."""
+
+    def __init__(self, failing_kind, **kwargs):
+        super().__init__(**kwargs)
+        self.failing_kind = failing_kind
+        self.kinds = []
+
+    def generate_content(self, prompt, **kwargs):
+        self.kinds.append(prompt_kind(prompt))
+        if prompt_kind(prompt) == self.failing_kind:
+            raise LLMUnavailable("provider down")
+        return super().generate_content(prompt, **kwargs)
+
+
+class ConcurrentPromptTests(SimpleTestCase):
+    FIELDS = ['keywords', 'score', 'review', 'relevance']
+
+    def test_in_flight_prompts_are_capped(self):
+        model = StubModel(delay=0.05)
+        results = run_prompts_concurrently(model, self.FIELDS, "Python developer", "Developer", max_concurrency=2)
+        self.assertEqual(model.calls, 4)
+        self.assertEqual(model.max_in_flight, 2)
+        self.assertEqual(results['score'], 7)
+        self.assertEqual(results['relevance_score'], 8)
+
+    def test_slow_prompt_is_abandoned_at_the_timeout(self):
+        model = StubModel(delays={'review': 2.0})
+        started = time.monotonic()
+        results = run_prompts_concurrently(model, self.FIELDS, "Python developer", "Developer", max_concurrency=4,
+                                           timeout=0.2)
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertIsNone(results['review'])
+        self.assertEqual(results['score'], 7)
+
+    def test_outage_cancels_prompts_not_yet_started(self):
+        model = OutageForKind('keywords', delays={'score': 0.5, 'review': 0.5})
+        started = time.monotonic()
+        with self.assertRaises(LLMUnavailable):
+            run_prompts_concurrently(model, self.FIELDS, "Python developer", "Developer", max_concurrency=2,
+                                     timeout=5)
+        self.assertLess(time.monotonic() - started, 0.4)
+        time.sleep(0.6)
+        self.assertNotIn('relevance', model.kinds)
+
+
+def stored_resume(email, text="Python developer with Django experience"):
+    entry = ExtractedText(content_hash=hashlib.sha256(email.encode()).hexdigest(), stopped='complete')
+    entry.text = text
+    entry.save()
+    return Resume.objects.create(candidate_name=email.split('@')[0], email=email, extracted_text=entry)
+
+
+@override_settings(ANALYSIS_WORKERS=0)
+class AnalysisQueueTests(TestCase):
+    def test_jobs_are_claimed_oldest_first_and_once(self):
+        first = enqueue_analysis(stored_resume("a@example.com"))
+        second = enqueue_analysis(stored_resume("b@example.com"))
+
+        claimed = claim_next_job()
+        self.assertEqual((claimed.pk, claimed.status, claimed.attempts), (first.pk, 'running', 1))
+        self.assertEqual(claim_next_job().pk, second.pk)
+        self.assertIsNone(claim_next_job())
+
+    def test_stale_running_jobs_are_requeued_or_failed(self):
+        stale = enqueue_analysis(stored_resume("a@example.com"))
+        exhausted = enqueue_analysis(stored_resume("b@example.com"))
+        fresh = enqueue_analysis(stored_resume("c@example.com"))
+        long_ago = timezone.now() - timedelta(seconds=settings.ANALYSIS_STALE_AFTER + 1)
+        AnalysisJob.objects.filter(pk=stale.pk).update(status='running', started_at=long_ago, attempts=1)
+        AnalysisJob.objects.filter(pk=exhausted.pk).update(status='running', started_at=long_ago,
+                                                           attempts=settings.ANALYSIS_MAX_ATTEMPTS)
+        AnalysisJob.objects.filter(pk=fresh.pk).update(status='running', started_at=timezone.now(), attempts=1)
+
+        requeue_stale_jobs()
+        statuses = dict(AnalysisJob.objects.values_list('pk', 'status'))
+        self.assertEqual((statuses[stale.pk], statuses[exhausted.pk], statuses[fresh.pk]),
+                         ('queued', 'failed', 'running'))
+        self.assertEqual(claim_next_job().pk, stale.pk)
+
+    def test_provider_outages_are_retried_after_a_delay(self):
+        job = enqueue_analysis(stored_resume("a@example.com"))
+        outage = make_client(StubModel(error_rate=1.0, error_code=503), FakeClock(), max_retries=0)
+
+        run_job(claim_next_job(), model=outage)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'queued')
+        self.assertGreater(job.run_after, timezone.now())
+        self.assertIsNone(claim_next_job())
+
+        for attempt in range(2, settings.ANALYSIS_MAX_ATTEMPTS + 1):
+            AnalysisJob.objects.filter(pk=job.pk).update(run_after=timezone.now())
+            claimed = claim_next_job()
+            self.assertEqual(claimed.attempts, attempt)
+            run_job(claimed, model=outage)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertIn("503", job.error)
+
+
+class CountingBackend(HeuristicBackend):
+    """Sets `done` once it has answered `expected` prompts."""
+
+    def __init__(self, expected):
+        super().__init__()
+        self.expected = expected
+        self.calls = 0
+        self.done = threading.Event()
+
+    def generate_content(self, prompt, **kwargs):
+        response = super().generate_content(prompt, **kwargs)
+        self.calls += 1
+        if self.calls >= self.expected:
+            self.done.set()
+        return response
+
+
+class AnalysisWorkerPoolTests(TransactionTestCase):
+    def test_workers_drain_the_queue(self):
+        with override_settings(ANALYSIS_WORKERS=0):
+            jobs = [enqueue_analysis(stored_resume(f"{i}@example.com", f"Python developer, team {i}"))
+                    for i in range(3)]
+        # One combined prompt per job; a single worker, as the in-memory test
+        # database locks whole tables between connections
+        model = CountingBackend(expected=len(jobs))
+        pool = AnalysisWorkerPool(1, poll_interval=0.05, model=model)
+        pool.start()
+        try:
+            self.assertTrue(model.done.wait(10))
+        finally:
+            pool.stop(timeout=10)  # lets the last job finish saving
+        self.assertEqual(set(AnalysisJob.objects.values_list('status', flat=True)), {'done'})
+        self.assertEqual(Resume.objects.get(pk=jobs[0].resume_id).keywords, "python")
+
+
+RESUME_TEXT = ("Jane Doe\nExperience\nBuilt REST APIs in Python and Django on AWS.\n"
+               "Education\nBSc Computer Science\nSkills\nDocker, PostgreSQL")
+
+
+def page_lines(page):
+    return [f"Page {page} line {line}" for line in range(3)]
+
+
+class PDFExtractionTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.pdf = os.path.join(cls.directory.name, "resume.pdf")
+        write_pdf(cls.pdf, [page_lines(page) for page in range(1, 6)])
+        # A one second budget, so the kill path is exercised quickly
+        cls.pool = ExtractionPool(1, max_pages=3, max_chars=10000, max_file_bytes=50000, timeout=1, grace=0.5)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+        cls.directory.cleanup()
+        super().tearDownClass()
+
+    def test_stops_at_the_page_cap(self):
+        result = self.pool.extract(self.pdf)
+        self.assertEqual(result.stopped, PAGE_LIMIT)
+        self.assertEqual((result.page_count, len(result.page_timings)), (5, 3))
+        self.assertIn("Page 3 line 2", result.text)
+        self.assertNotIn("Page 4", result.text)
+
+    def test_stops_at_the_text_cap(self):
+        result = read_pdf(self.pdf, max_pages=10, max_chars=40, max_file_bytes=50000, timeout=10)
+        self.assertEqual(result.stopped, TEXT_LIMIT)
+        self.assertEqual(result.chars, 40)
+
+    def test_refuses_oversized_files_unread(self):
+        path = os.path.join(self.directory.name, "huge.pdf")
+        with open(path, 'wb') as f:
+            f.write(b"%PDF-1.4\n" + b"0" * 60000)
+        result = self.pool.extract(path)
+        self.assertEqual(result.stopped, FILE_TOO_LARGE)
+        self.assertEqual(result.page_timings, [])
+
+    def test_slow_pages_stop_at_the_time_budget_keeping_pages_read(self):
+        import PyPDF2
+
+        extract_text = PyPDF2.PageObject.extract_text
+
+        def slow_extract_text(page, *args, **kwargs):
+            time.sleep(0.2)
+            return extract_text(page, *args, **kwargs)
+
+        with mock.patch.object(PyPDF2.PageObject, 'extract_text', slow_extract_text):
+            result = read_pdf(self.pdf, max_pages=10, max_chars=10000, max_file_bytes=50000, timeout=0.3)
+        self.assertEqual(result.stopped, TIME_BUDGET)
+        self.assertEqual(len(result.page_timings), 2)
+        self.assertIn("Page 2 line 0", result.text)
+
+    @skipUnless(hasattr(os, 'mkfifo'), "needs a FIFO to stand in for a PDF that never finishes reading")
+    def test_hanging_extraction_is_killed_by_the_parent(self):
+        # Opening a FIFO nobody writes to blocks forever, inside the worker
+        hanging = os.path.join(self.directory.name, "hanging.pdf")
+        os.mkfifo(hanging)
+        started = time.monotonic()
+        result = self.pool.extract(hanging)
+        self.assertLess(time.monotonic() - started, 10)
+        self.assertEqual(result.stopped, TIME_BUDGET)
+        self.assertIn("killed", result.error)
+
+        # The killed worker was replaced
+        self.assertEqual(self.pool.extract(self.pdf).stopped, PAGE_LIMIT)
+
+    @skipUnless(hasattr(os, 'mkfifo'), "needs a FIFO to stand in for a PDF that never finishes reading")
+    def test_map_kills_only_the_worker_of_a_hanging_pdf(self):
+        hanging = os.path.join(self.directory.name, "hanging-in-batch.pdf")
+        os.mkfifo(hanging)
+        pool = ExtractionPool(2, max_pages=3, max_chars=10000, max_file_bytes=50000, timeout=1, grace=0.5)
+        try:
+            # Start both workers up front
+            started = [pool._acquire() for _ in range(2)]
+            for worker, generation in started:
+                pool._release(worker, generation, True)
+            workers = {worker.process.pid for worker in pool._idle}
+
+            results = list(pool.map([hanging, self.pdf]))
+
+            # The good PDF is not held up by the hanging one, which still gets a result
+            self.assertEqual([path for path, _ in results], [self.pdf, hanging])
+            self.assertEqual(results[0][1].stopped, PAGE_LIMIT)
+            self.assertEqual(results[1][1].stopped, TIME_BUDGET)
+            # Only the stuck worker was killed; the other one is still serving
+            [survivor] = pool._idle
+            self.assertIn(survivor.process.pid, workers)
+            self.assertTrue(survivor.process.is_alive())
+        finally:
+            pool.shutdown()
+
+
+class ResumeIngestorTests(TestCase):
+    @skipUnless(hasattr(os, 'mkfifo'), "needs a FIFO to stand in for a PDF that never finishes reading")
+    def test_a_hanging_pdf_does_not_stall_the_batch(self):
+        with tempfile.TemporaryDirectory() as directory:
+            good = os.path.join(directory, "good.pdf")
+            write_pdf(good, [["Jane Doe", "Skills", "Python, Django"]])
+            hanging = os.path.join(directory, "hanging.pdf")
+            os.mkfifo(hanging)
+            rows = [ManifestRow("Hung", "hung@example.com", hanging), ManifestRow("Jane", "jane@example.com", good)]
+            pool = ExtractionPool(1, max_pages=3, max_chars=10000, max_file_bytes=50000, timeout=1, grace=0.5)
+            # Hashing would block on the FIFO too; only the extraction should
+            hashes = {hanging: "hanging", good: "good"}
+            try:
+                with mock.patch('screening.ingest.hash_file', hashes.get):
+                    lines = []
+                    stats = ResumeIngestor(StubModel(), rate=100, pool=pool, report=lines.append).run(rows)
+            finally:
+                pool.shutdown()
+
+        self.assertEqual((stats['saved'], stats['unreadable']), (1, 1))
+        self.assertTrue(any(line.startswith(f"Error extracting text from {hanging}") for line in lines))
+        self.assertEqual(list(Resume.objects.values_list('email', flat=True)), ["jane@example.com"])
+
+
+# What the stub answers to each separate prompt
+STUB_ANALYSIS = {
+    'keywords': "Python, Django, SQL, REST APIs",
+    'score': 7,
+    'review': "Clear structure and relevant experience; quantify achievements more.",
+    'relevance_score': 8,
+    'relevance_tips': "Highlight backend projects that match the role.",
+}
+
+
+class CombinedPromptTests(SimpleTestCase):
+    """A bad combined reply costs one call plus a separate prompt per unusable field."""
+
+    def analyze(self, reply):
+        stub = StubModel(combined_reply=reply)
+        results = analyze_text(RESUME_TEXT, "full", "Python Developer", prompt_mode="combined", model=stub)
+        return results, stub.calls
+
+    def test_a_complete_reply_takes_one_call(self):
+        results, calls = self.analyze(json.dumps(dict(STUB_ANALYSIS, score=9, keywords=["Go", " ", "Rust"])))
+        self.assertEqual(calls, 1)
+        self.assertEqual(results, dict(STUB_ANALYSIS, score=9, keywords="Go, Rust"))
+
+    def test_a_fenced_reply_is_still_parsed(self):
+        results, calls = self.analyze("```json\n" + json.dumps(dict(STUB_ANALYSIS, score=9)) + "\n```")
+        self.assertEqual(calls, 1)
+        self.assertEqual(results, dict(STUB_ANALYSIS, score=9))
+
+    def test_malformed_json_falls_back_to_every_separate_prompt(self):
+        results, calls = self.analyze('{"keywords": ["Go"], "score": ')
+        self.assertEqual(calls, 5)
+        self.assertEqual(results, STUB_ANALYSIS)
+
+    def test_only_missing_fields_are_asked_again(self):
+        results, calls = self.analyze(json.dumps({'keywords': ["Go"]}))
+        self.assertEqual(calls, 4)
+        self.assertEqual(results, dict(STUB_ANALYSIS, keywords="Go"))
+
+    def test_out_of_range_scores_are_asked_again(self):
+        results, calls = self.analyze(json.dumps(dict(STUB_ANALYSIS, score=42)))
+        self.assertEqual(calls, 2)
+        self.assertEqual(results, STUB_ANALYSIS)
+
+        # The relevance score and its tips are re-requested together
+        results, calls = self.analyze(json.dumps(dict(STUB_ANALYSIS, relevance_score=-1, relevance_tips="Keep")))
+        self.assertEqual(calls, 2)
+        self.assertEqual(results, STUB_ANALYSIS)
+
+
+class LLMBackendTests(SimpleTestCase):
+    def test_heuristic_backend_is_deterministic_in_both_prompt_modes(self):
+        backend = HeuristicBackend()
+        combined = analyze_text(RESUME_TEXT, "full", "Python Developer", prompt_mode="combined", model=backend)
+        separate = analyze_text(RESUME_TEXT, "full", "Python Developer", prompt_mode="separate", model=backend)
+
+        self.assertEqual(combined, separate)
+        self.assertEqual(combined['keywords'], "aws, django, docker, postgresql, python, rest apis")
+        self.assertTrue(1 <= combined['score'] <= 10)
+        self.assertTrue(all(value is not None for value in combined.values()))
+
+    def test_prompts_are_classified_by_their_instructions_not_the_resume_they_quote(self):
+        text = RESUME_TEXT + "\nBuilt a service returning a JSON object, a single integer between 1 and 10 " \
+                             "and a plain text review for the job title \"Chef\"."
+        for prompt, kind in [(keywords_prompt(text), 'keywords'), (score_prompt(text), 'score'),
+                             (review_prompt(text), 'review'), (relevance_prompt(text, "Python Developer"), 'relevance')]:
+            self.assertEqual(prompt_kind(prompt), kind)
+
+        backend = HeuristicBackend()
+        separate = analyze_text(text, "full", "Python Developer", prompt_mode="separate", model=backend)
+        self.assertEqual(separate, analyze_text(text, "full", "Python Developer", prompt_mode="combined",
+                                                model=backend))
+        self.assertNotIn("{", separate['keywords'])
+        self.assertTrue(all(value is not None for value in separate.values()))
+
+    def test_replay_backend_returns_recorded_replies(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "replies.jsonl")
+            recorded = analyze_text(RESUME_TEXT, "full", model=RecordingBackend(HeuristicBackend(), path))
+            replay = ReplayBackend(path)
+
+            self.assertEqual(analyze_text(RESUME_TEXT, "full", model=replay), recorded)
+            with self.assertRaises(ReplayMiss):
+                replay.generate_content("a prompt nobody recorded")
+
+
+class AnalysisCacheTests(TestCase):
+    def test_entries_are_not_shared_across_backends_prompt_modes_or_trimming_settings(self):
+        cache = AnalysisCache(ttl=0, max_entries=100)
+        heuristic = CountingBackend(expected=0)
+        analyze_text(RESUME_TEXT, "score", model=heuristic, cache=cache)
+        analyze_text(RESUME_TEXT, "score", model=heuristic, cache=cache)
+        self.assertEqual(heuristic.calls, 1)
+
+        stub = StubModel()
+        analyze_text(RESUME_TEXT, "score", model=stub, cache=cache)
+        self.assertEqual(stub.calls, 1)
+
+        analyze_text(RESUME_TEXT, "score", prompt_mode="separate", model=heuristic, cache=cache)
+        self.assertEqual(heuristic.calls, 2)
+        with override_settings(PROMPT_TRIMMING=False):
+            analyze_text(RESUME_TEXT, "score", model=heuristic, cache=cache)
+        self.assertEqual(heuristic.calls, 3)
+        self.assertEqual((cache.hits, cache.misses), (1, 4))
+
+    def test_expired_entries_are_misses_and_are_removed(self):
+        cache = AnalysisCache(ttl=60, max_entries=100)
+        cache.set("fresh", {'score': 7}, "score")
+        cache.set("stale", {'score': 3}, "score")
+        AnalysisCacheEntry.objects.filter(key="stale").update(created_at=timezone.now() - timedelta(seconds=61))
+
+        self.assertIsNone(cache.get("stale"))
+        self.assertFalse(AnalysisCacheEntry.objects.filter(key="stale").exists())
+        self.assertEqual(cache.get("fresh"), {'score': 7})
+
+        AnalysisCacheEntry.objects.filter(key="fresh").update(created_at=timezone.now() - timedelta(seconds=61))
+        self.assertEqual(cache.evict(), 1)
+        self.assertEqual(AnalysisCacheEntry.objects.count(), 0)
+
+    def test_least_recently_used_entries_are_evicted_above_max_entries(self):
+        cache = AnalysisCache(ttl=0, max_entries=2)
+        started = timezone.now() - timedelta(minutes=10)
+        for minute, key in enumerate(["a", "b"]):
+            cache.set(key, {'score': minute}, "score")
+            AnalysisCacheEntry.objects.filter(key=key).update(last_used_at=started + timedelta(minutes=minute))
+        # Reading "a" makes "b" the least recently used
+        cache.get("a")
+        cache.set("c", {'score': 2}, "score")
+
+        self.assertEqual(set(AnalysisCacheEntry.objects.values_list('key', flat=True)), {"a", "c"})
+
+    def test_hits_and_misses_are_counted(self):
+        cache = AnalysisCache(ttl=0, max_entries=100)
+        self.assertIsNone(cache.get("key"))
+        cache.set("key", {'score': 7}, "score")
+        cache.get("key")
+        cache.get("key")
+
+        self.assertEqual(cache.stats(), {'hits': 2, 'misses': 1, 'hit_rate': 2 / 3, 'entries': 1})
+        self.assertEqual(AnalysisCacheEntry.objects.get(key="key").hits, 2)
+
+
+SKILL_FIXTURE = [
+    "Python, Django, JavaScript",
+    "java,  Spring , SQL",
+    "C++, Go, PostgreSQL",
+    "go, golang, django rest framework",
+    "React, TypeScript, , node.js",
+    "",
+]
+
+
+class SkillIndexTests(TestCase):
+    def setUp(self):
+        for i, keywords in enumerate(SKILL_FIXTURE):
+            Resume.objects.create(candidate_name=f"Candidate {i}", email=f"skills{i}@example.com", keywords=keywords)
+        rebuild_index()
+
+    def indexed_resumes(self, skill_ids):
+        return set(ResumeSkill.objects.filter(skill_id__in=skill_ids).values_list('resume_id', flat=True))
+
+    def test_skills_containing_a_keyword_find_the_same_resumes_as_a_keyword_scan(self):
+        index = get_substring_index()
+        for keyword in ["java", "go", "sql", "django", "c++", "script", "node.js", "rust"]:
+            scanned = set(Resume.objects.filter(ANALYZED, keywords__icontains=keyword).values_list('id', flat=True))
+            self.assertEqual(self.indexed_resumes(index.containing(keyword)), scanned, keyword)
+
+    def test_related_skills_match_the_partial_matching_rule(self):
+        keywords = ["java", "golang", "django rest framework api", "postgres", "c"]
+        related = related_skill_ids(keywords)
+        for keyword in keywords:
+            expected = {resume.pk for resume in Resume.objects.filter(ANALYZED)
+                        if any(keyword in skill or skill in keyword for skill in normalize_keywords(resume.keywords))}
+            self.assertEqual(self.indexed_resumes(related[keyword]), expected, keyword)
+
+    def test_index_follows_new_and_deleted_skills_without_recounting_them(self):
+        keywords = ["java", "go", "sql", "script", "kotlin", "ruby", "rails"]
+        index = get_substring_index()
+        # Nothing changed: only the SKILLS version is read
+        with self.assertNumQueries(1):
+            self.assertIs(get_substring_index(), index)
+
+        Resume.objects.create(candidate_name="New", email="new-skills@example.com", keywords="Kotlin, Ruby on Rails")
+        Skill.objects.filter(name="golang").delete()
+        for keyword in keywords:
+            scanned = set(Resume.objects.filter(ANALYZED, keywords__icontains=keyword).values_list('id', flat=True))
+            self.assertEqual(self.indexed_resumes(get_substring_index().containing(keyword)), scanned, keyword)
+
+    def test_index_rebuilds_after_renames_and_deletions_that_keep_the_row_count(self):
+        def assertMatchesTable(keywords):
+            index = get_substring_index()
+            for keyword in keywords:
+                expected = set(Skill.objects.filter(name__contains=keyword).values_list('id', flat=True))
+                self.assertEqual(index.containing(keyword), expected, keyword)
+
+        keywords = ["go", "lang", "kotlin", "script", "swift"]
+        assertMatchesTable(keywords)
+
+        golang = Skill.objects.get(name="golang")
+        golang.name = "kotlin"
+        golang.save()
+        assertMatchesTable(keywords)
+
+        # One skill deleted and one added between two calls
+        Skill.objects.filter(name="typescript").delete()
+        Resume.objects.create(candidate_name="New", email="swift@example.com", keywords="Swift")
+        assertMatchesTable(keywords)
+
+
+def baseline_candidates(job):
+    """find_candidates as the view computed it before the match table: every resume scored pair by pair."""
+    job_keywords = [k.lower().strip() for k in job.skills_required.split(',')]
+    matching_candidates = []
+    for resume in Resume.objects.all():
+        if not resume.keywords:
+            continue
+        resume_keywords = set([k.lower().strip() for k in resume.keywords.split(',')])
+        job_keywords_set = set(job_keywords)
+        intersection = len(resume_keywords.intersection(job_keywords_set))
+        union = len(resume_keywords.union(job_keywords_set))
+        exact_score = intersection / union if union > 0 else 0
+        partial_matches = 0
+        for job_keyword in job_keywords:
+            for resume_keyword in resume_keywords:
+                if job_keyword in resume_keyword or resume_keyword in job_keyword:
+                    partial_matches += 1
+                    break
+        partial_score = partial_matches / len(job_keywords) if job_keywords else 0
+        combined_score = (exact_score * 0.7) + (partial_score * 0.3)
+        if combined_score > 0.05:
+            matching_candidates.append({
+                'resume': resume,
+                'score': combined_score,
+                'exact_matches': list(resume_keywords.intersection(job_keywords_set)),
+                'partial_matches': partial_matches,
+                'last_updated': resume.upload_date
+            })
+    matching_candidates.sort(key=lambda x: (x['score'], x['last_updated']), reverse=True)
+    return matching_candidates
+
+
+def baseline_matching_jobs(resume):
+    """find_matching_jobs as it was before the match table."""
+    resume_keywords = set([k.lower().strip() for k in resume.keywords.split(',')])
+    matching_jobs = []
+    for job in JobPost.objects.all():
+        job_keywords = set([k.lower().strip() for k in job.skills_required.split(',')])
+        intersection = len(resume_keywords.intersection(job_keywords))
+        union = len(resume_keywords.union(job_keywords))
+        score = intersection / union if union > 0 else 0
+        if score > 0.3:
+            matching_jobs.append({'job': job, 'score': score,
+                                  'matching_keywords': list(resume_keywords.intersection(job_keywords))})
+    matching_jobs.sort(key=lambda x: x['score'], reverse=True)
+    return matching_jobs[:5]
+
+
+# Duplicates, case and spacing differences, identical sets (score ties) and
+# keyword strings holding only empty tokens
+MATCH_RESUMES = [
+    "Python, Django, SQL",
+    "python,django , sql",
+    "Java, Spring",
+    "Go, golang",
+    ", ,",
+    "",
+    "JavaScript, React, Node.js",
+    "python, python, Docker",
+    "C++, C",
+    "sql",
+    "Django",
+]
+MATCH_JOBS = ["python, django, sql", "python, python, django", "java, go", ",", "javascript, c", "rust", "Django"]
+
+
+class MatchEquivalenceTests(TestCase):
+    """The vectorized match table ranks exactly as the old per-pair loops did."""
+
+    @classmethod
+    def setUpTestData(cls):
+        employer = User.objects.create_user("employer", password="secret")
+        cls.jobs = [JobPost.objects.create(employer=employer, title=f"Job {i}", description="Test", location="Remote",
+                                           skills_required=skills)
+                    for i, skills in enumerate(MATCH_JOBS)]
+        started = timezone.now() - timedelta(days=1)
+        for i, keywords in enumerate(MATCH_RESUMES):
+            resume = Resume.objects.create(candidate_name=f"Candidate {i}", email=f"match{i}@example.com",
+                                           keywords=keywords)
+            # Distinct upload times, so the baseline's order on score ties is well defined
+            Resume.objects.filter(pk=resume.pk).update(upload_date=started + timedelta(minutes=i))
+        rebuild_index()
+        rebuild_matches()
+
+    def assertSameCandidates(self, found, expected):
+        self.assertEqual([match['resume'].pk for match in found], [match['resume'].pk for match in expected])
+        for got, want in zip(found, expected):
+            self.assertAlmostEqual(got['score'], want['score'])
+            self.assertEqual(sorted(got['exact_matches']), sorted(want['exact_matches']))
+            self.assertEqual(got['partial_matches'], want['partial_matches'])
+            self.assertEqual(got['last_updated'], want['last_updated'])
+
+    def test_find_candidates_ranks_like_the_per_pair_loop(self):
+        for job in self.jobs:
+            with self.subTest(skills_required=job.skills_required):
+                self.assertSameCandidates(find_candidates(job), baseline_candidates(job)[:30])
+
+    def test_scoring_a_job_against_every_resume_matches_the_per_pair_loop(self):
+        resume_ids = Resume.objects.filter(ANALYZED).values_list('id', flat=True)
+        for job in self.jobs:
+            with self.subTest(skills_required=job.skills_required):
+                rows = {row.resume_id: row for row in _score_resumes_for_job(job, resume_ids)}
+                expected = {match['resume'].pk: match for match in baseline_candidates(job)}
+                self.assertEqual(set(rows), set(expected))
+                for resume_id, match in expected.items():
+                    self.assertAlmostEqual(rows[resume_id].combined_score, match['score'])
+                    self.assertEqual(rows[resume_id].partial_matches, match['partial_matches'])
+                    self.assertEqual(sorted(rows[resume_id].matched_skills), sorted(match['exact_matches']))
+
+    def test_find_matching_jobs_ranks_like_the_per_pair_loop(self):
+        for resume in Resume.objects.filter(ANALYZED):
+            with self.subTest(keywords=resume.keywords):
+                found = find_matching_jobs(resume)
+                expected = baseline_matching_jobs(resume)
+                self.assertEqual([match['job'].pk for match in found], [match['job'].pk for match in expected])
+                for got, want in zip(found, expected):
+                    self.assertAlmostEqual(got['score'], want['score'])
+                    self.assertEqual(sorted(got['matching_keywords']), sorted(want['matching_keywords']))
+
+    def test_jobs_never_refreshed_are_scored_before_matching_jobs_are_read(self):
+        # As after upgrading: the table is empty and no job has been refreshed
+        CandidateMatch.objects.all().delete()
+        JobPost.objects.update(matches_refreshed_at=None)
+        for resume in Resume.objects.filter(ANALYZED):
+            with self.subTest(keywords=resume.keywords):
+                found = find_matching_jobs(resume)
+                self.assertEqual([match['job'].pk for match in found],
+                                 [match['job'].pk for match in baseline_matching_jobs(resume)])
+        self.assertFalse(JobPost.objects.filter(matches_refreshed_at__isnull=True).exists())
+
+    def test_refreshing_each_resume_rebuilds_the_same_table(self):
+        def table():
+            return {(match.job_id, match.resume_id): (match.exact_score, match.partial_matches, match.combined_score,
+                                                      sorted(match.matched_skills))
+                    for match in CandidateMatch.objects.all()}
+
+        rebuilt = table()
+        CandidateMatch.objects.all().delete()
+        for resume in Resume.objects.all():
+            refresh_resume_matches(resume)
+        refreshed = table()
+
+        self.assertEqual(set(refreshed), set(rebuilt))
+        for pair, (exact, partial, combined, skills) in rebuilt.items():
+            with self.subTest(pair=pair):
+                self.assertAlmostEqual(refreshed[pair][0], exact)
+                self.assertEqual(refreshed[pair][1], partial)
+                self.assertAlmostEqual(refreshed[pair][2], combined)
+                self.assertEqual(refreshed[pair][3], skills)
+
+
+class TextPrepTests(SimpleTestCase):
+    def test_cleans_text_and_keeps_only_the_sections_a_prompt_needs(self):
+        prepared = PreparedText("Jane  Doe\nACME Resume\n\n\n\nWork Experience:\nBuilt   things\fACME Resume\n"
+                                "Hobbies\nChess\nSkills\nPython, Go")
+
+        self.assertEqual([name for name, _ in prepared.sections], ['header', 'experience', 'interests', 'skills'])
+        self.assertEqual(prepared.text.count("ACME Resume"), 1)
+        self.assertEqual(prepared.for_prompt('keywords', 100), "Work Experience:\nBuilt things\n\nSkills\nPython, Go")
+        self.assertLessEqual(len(prepared.for_prompt('review', 5)), 20)
+
+
+    def test_drops_page_headers_and_footers_but_keeps_repeated_body_lines(self):
+        pages = [
+            "Jane Doe - Resume\nExperience\nBuilt APIs\nTech: Python, Django\nShipped features\nMentored\n"
+            "Wrote docs\nPage 1 of 3",
+            "Jane Doe - Resume\nAcme Corp\nBuilt APIs\nTech: Python, Django\nOn call\nReviews\nHiring\nPage 2 of 3",
+            "Jane Doe - Resume\nSkills\nPython\nDjango\nTech: Python, Django\nAWS\nDocker\nPage 3 of 3",
+        ]
+        lines = normalize_lines("\f".join(pages))
+
+        self.assertEqual(lines.count("Jane Doe - Resume"), 1)
+        self.assertEqual([line for line in lines if line.startswith("Page")], ["Page 1 of 3"])
+        self.assertEqual(lines.count("Built APIs"), 2)
+        self.assertEqual(lines.count("Tech: Python, Django"), 3)
+
+    def test_single_page_text_keeps_every_line(self):
+        self.assertEqual(normalize_lines("Python\nBuilt APIs\nPython\nBuilt APIs"),
+                         ["Python", "Built APIs", "Python", "Built APIs"])
+
+
+class StartupImportTests(SimpleTestCase):
+    def test_web_worker_startup_stays_lean(self):
+        profile = measure_imports()
+
+        self.assertEqual(profile.eager_lazy_modules(), [])
+        self.assertLess(profile.total_ms, settings.STARTUP_IMPORT_BUDGET_MS)
+
+
+class DatabaseSettingsTests(SimpleTestCase):
+    def conn_max_age(self, setup):
+        env = {name: value for name, value in os.environ.items()
+               if name not in ('CONN_MAX_AGE', 'DJANGO_SERVER_INTERFACE')}
+        env.update(ANALYSIS_WORKERS='0', DB_ENGINE='sqlite', DJANGO_SETTINGS_MODULE='resume_portal.settings')
+        with tempfile.TemporaryDirectory() as directory:
+            env['SQLITE_PATH'] = os.path.join(directory, "db.sqlite3")
+            completed = subprocess.run(
+                [sys.executable, '-c', f"{setup}; from django.conf import settings; "
+                                       "print(settings.DATABASES['default']['CONN_MAX_AGE'])"],
+                cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True,
+            )
+        return int(completed.stdout.strip().splitlines()[-1])
+
+    def test_persistent_connections_are_off_under_asgi(self):
+        self.assertEqual(self.conn_max_age("import resume_portal.asgi"), 0)
+
+    def test_persistent_connections_are_kept_otherwise(self):
+        self.assertEqual(self.conn_max_age("import django; django.setup()"), 60)
+
+
+class ResumeListTests(TestCase):
+    def setUp(self):
+        for number in range(5):
+            Resume.objects.create(candidate_name=f"C{number}", email=f"c{number}@example.com",
+                                  review="A long review " * 50, keywords="python")
+
+    def test_list_is_slim_and_cursor_paginated(self):
+        first = self.client.get('/api/resumes/?page_size=2').json()
+        self.assertEqual(len(first['results']), 2)
+        self.assertNotIn('review', first['results'][0])
+        self.assertEqual(first['results'][0]['candidate_name'], "C4")
+
+        second = self.client.get(first['next']).json()
+        self.assertEqual([row['candidate_name'] for row in second['results']], ["C2", "C1"])
+
+    def test_leaderboard_pages_by_score(self):
+        for number, score in enumerate([7, 9, 7, 3]):
+            Resume.objects.filter(email=f"c{number}@example.com").update(score=score)
+        expected = list(Resume.objects.filter(score__isnull=False).order_by('-score', '-id')
+                        .values_list('candidate_name', flat=True))
+
+        names = []
+        url = '/api/resumes/?ordering=-score&page_size=2&fields=id,candidate_name,score'
+        while url:
+            page = self.client.get(url).json()
+            names += [row['candidate_name'] for row in page['results']]
+            url = page['next']
+        self.assertEqual(names, expected)
+        self.assertEqual(names, ["C1", "C2", "C0", "C3"])
+
+    def test_pages_inside_a_run_of_equal_scores_seek_instead_of_offsetting(self):
+        for number in range(5, 15):
+            Resume.objects.create(candidate_name=f"C{number}", email=f"c{number}@example.com", keywords="python")
+        for number, score in enumerate([5, 5, 5, 9, 5, 5, 5, 5, 3, 5, 5, 5, 5, 3, None]):
+            Resume.objects.filter(email=f"c{number}@example.com").update(score=score)
+        expected = list(Resume.objects.filter(score__isnull=False).order_by('-score', '-id')
+                        .values_list('candidate_name', flat=True))
+
+        pages = []
+        url = '/api/resumes/?ordering=-score&page_size=3&fields=id,candidate_name'
+        while url:
+            # The rest of a run of equal scores, then the rows after it
+            with CaptureQueriesContext(connection) as queries:
+                page = self.client.get(url).json()
+            self.assertLessEqual(len(queries), 2)
+            self.assertFalse([query for query in queries if "OFFSET" in query['sql']])
+            pages.append([row['candidate_name'] for row in page['results']])
+            url = page['next']
+        self.assertEqual(sum(pages, []), expected)
+
+        # And back again through the previous links
+        url = page['previous']
+        for expected_page in reversed(pages[:-1]):
+            page = self.client.get(url).json()
+            self.assertEqual([row['candidate_name'] for row in page['results']], expected_page)
+            url = page['previous']
+        self.assertIsNone(url)
+
+    def test_fields_parameter_selects_fields(self):
+        with self.assertNumQueries(1):
+            rows = self.client.get('/api/resumes/?fields=id,keywords_list').json()['results']
+        self.assertEqual(set(rows[0]), {'id', 'keywords_list'})
+
+        resume = Resume.objects.get(email="c0@example.com")
+        detail = self.client.get(f'/api/resumes/{resume.pk}/').json()
+        self.assertIn('review', detail)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        employer = User.objects.create_user("employer", password="secret")
+        self.job = JobPost.objects.create(employer=employer, title="Backend", description="APIs", location="Remote",
+                                          skills_required="python, django")
+        self.resume = Resume.objects.create(candidate_name="A", email="a@example.com", keywords="python, django")
+        self.url = f'/api/resumes/find_candidates/?job_id={self.job.pk}'
+
+    def test_unchanged_candidates_get_304_until_a_resume_changes(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.json()[0]['email'], "a@example.com")
+        etag = first['ETag']
+
+        with self.assertNumQueries(2):  # the job and the data versions
+            unchanged = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(unchanged.status_code, 304)
+
+        self.resume.keywords = "python"
+        self.resume.save()
+        changed = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], etag)
+
+    def test_recommended_jobs_carry_an_etag(self):
+        url = f'/api/resumes/{self.resume.pk}/recommended_jobs/'
+        first = self.client.get(url)
+        self.assertEqual(first.json()[0]['title'], "Backend")
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+
+
+class CandidateStreamTests(TestCase):
+    def setUp(self):
+        employer = User.objects.create_user("employer", password="secret")
+        self.job = JobPost.objects.create(employer=employer, title="Backend", description="APIs", location="Remote",
+                                          skills_required="python, django")
+        Resume.objects.create(candidate_name="A", email="a@example.com", keywords="python, django")
+        self.url = f'/api/jobs/{self.job.pk}/candidates/stream/'
+
+    @staticmethod
+    def events(body):
+        return [block for block in body.split("\n\n") if block.startswith("id:")]
+
+    def test_snapshot_is_resent_only_when_the_matches_change(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        [snapshot] = self.events(response.content.decode())
+        self.assertIn("event: snapshot", snapshot)
+        self.assertIn("a@example.com", snapshot)
+        last_id = snapshot.split("\n")[0][len("id: "):]
+
+        self.assertEqual(self.events(self.client.get(self.url, HTTP_LAST_EVENT_ID=last_id).content.decode()), [])
+
+        Resume.objects.create(candidate_name="B", email="b@example.com", keywords="python")
+        [update] = self.events(self.client.get(self.url, HTTP_LAST_EVENT_ID=last_id).content.decode())
+        self.assertIn("event: snapshot", update)
+        self.assertIn("a@example.com", update)
+        self.assertIn("b@example.com", update)
+        self.assertGreater(int(update.split("\n")[0][len("id: "):]), int(last_id))
+
+    def test_removed_candidates_leave_the_next_snapshot(self):
+        [snapshot] = self.events(self.client.get(self.url).content.decode())
+        last_id = snapshot.split("\n")[0][len("id: "):]
+
+        Resume.objects.get(email="a@example.com").delete()
+        [update] = self.events(self.client.get(self.url, HTTP_LAST_EVENT_ID=last_id).content.decode())
+        self.assertNotIn("a@example.com", update)
+        self.assertIn("data: []", update)
+
+    def test_unknown_event_ids_get_a_snapshot(self):
+        body = self.client.get(self.url, HTTP_LAST_EVENT_ID="2026-01-01T00:00:00+00:00").content.decode()
+        [snapshot] = self.events(body)
+        self.assertIn("a@example.com", snapshot)
+
+    @override_settings(CANDIDATE_STREAM_MAX_SECONDS=0)
+    async def test_streams_under_asgi(self):
+        response = await self.async_client.get(self.url)
+        self.assertTrue(response.streaming)
+        body = "".join([chunk.decode() async for chunk in response.streaming_content])
+        self.assertIn("event: snapshot", body)
+
+
+class AsyncUploadTests(TestCase):
+    async def test_upload_then_long_poll_the_result(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "resume.pdf")
+            write_pdf(path, [["Jane Doe", "Skills", "Python, Django"]])
+            with override_settings(MEDIA_ROOT=directory), open(path, 'rb') as f:
+                response = await self.async_client.post('/api/resumes/upload/', {
+                    'candidate_name': "Jane", 'email': "jane@example.com", 'job_title': "Developer", 'resume_file': f,
+                })
+                self.assertEqual(response.status_code, 202)
+                accepted = response.json()
+
+                job = await sync_to_async(claim_next_job)()
+                await sync_to_async(run_job)(job, model=HeuristicBackend())
+
+        result = (await self.async_client.get(f"{accepted['result_url']}?wait=5")).json()
+        self.assertEqual(result['status'], 'done')
+        self.assertEqual(result['resume']['keywords_list'], ["django", "python"])
+
+    async def test_invalid_upload_is_rejected(self):
+        response = await self.async_client.post('/api/resumes/upload/', {'email': "not-an-email"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('email', response.json())
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        employer = User.objects.create_user("employer", password="secret")
+        self.job = JobPost.objects.create(employer=employer, title="Backend", description="APIs", location="Remote",
+                                          skills_required="python, django")
+        Resume.objects.create(candidate_name="A", email="a@example.com", keywords="python, django")
+
+    def test_api_responses_carry_server_timing(self):
+        response = self.client.get(f'/api/resumes/find_candidates/?job_id={self.job.pk}')
+        timing = response['Server-Timing']
+        self.assertTrue(timing.startswith("total;dur="))
+        self.assertRegex(timing, r'db;dur=[\d.]+;desc="[1-9]\d* queries"')
+        self.assertIn("find_candidates;dur=", timing)
+        self.assertIn("serialize;dur=", timing)
+
+    def test_metrics_endpoint_exposes_stages_and_requests(self):
+        self.client.get(f'/api/resumes/find_candidates/?job_id={self.job.pk}')
+        response = self.client.get('/metrics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Server-Timing', response)
+        body = response.content.decode()
+        self.assertIn('resume_portal_stage_seconds_count{stage="find_candidates"}', body)
+        self.assertIn('resume_portal_request_queries_bucket{view="resume-find-candidates",le="+Inf"}', body)
+        self.assertIn('# TYPE resume_portal_llm_requests_total counter', body)
+        self.assertIn('resume_portal_cache_hits_total{cache="response"}', body)
+
+
+class BenchmarkSuiteTests(TestCase):
+    def test_suite_runs_every_case_on_a_seeded_dataset(self):
+        options = {'cases': {'find_candidates', 'find_matching_jobs', 'recommended_jobs', 'pdf_extract',
+                             'analyze_resume'},
+                   'resumes': 40, 'jobs': 5, 'vocabulary': 30, 'queries': 3, 'pdfs': 2, 'delay': 0.0}
+        with tempfile.TemporaryDirectory() as workdir, override_settings(ANALYSIS_CACHE_ENABLED=False):
+            results = run_suite(options, random.Random(1), workdir, report=lambda line: None)
+        self.assertEqual(sorted(result.name for result in results), sorted(options['cases']))
+        self.assertEqual(Resume.objects.count(), 40)
+        self.assertTrue(CandidateMatch.objects.exists())
+        self.assertEqual(results[0].summary()['runs'], 3)
+
+    def test_regressions_compare_against_the_baseline(self):
+        baseline = {'results': {'find_candidates': {'runs': 4, 'ops_per_sec': 100.0, 'p50_ms': 10.0, 'p99_ms': 20.0}}}
+        steady = CaseResult('find_candidates', [0.0105] * 4, 0.04)
+        self.assertEqual(regressions([steady], baseline, 0.25), [])
+        slower = CaseResult('find_candidates', [0.01, 0.01, 0.01, 0.03], 0.06)
+        self.assertEqual([metric for _, metric, _, _ in regressions([slower], baseline, 0.25)],
+                         ['ops_per_sec', 'p99_ms'])
+
+
+class SerializerFieldTests(TestCase):
+    def test_internal_fields_are_not_exposed(self):
+        employer = User.objects.create_user("employer", password="secret")
+        job = JobPost.objects.create(employer=employer, title="Backend", description="APIs", location="Remote",
+                                     skills_required="python, django")
+        resume = stored_resume("a@example.com", "Python developer")
+        client = APIClient()
+        client.force_authenticate(employer)
+
+        resume_data = client.get(f'/api/resumes/{resume.pk}/').json()
+        job_data = client.get(f'/api/jobs/{job.pk}/').json()
+        for hidden in ('skills', 'skills_updated_at', 'extracted_text'):
+            self.assertNotIn(hidden, resume_data)
+        for hidden in ('skills', 'matches_refreshed_at'):
+            self.assertNotIn(hidden, job_data)
+        self.assertEqual(job_data['skills_list'], ["python", "django"])
+
+    def test_timestamps_are_read_only(self):
+        employer = User.objects.create_user("employer", password="secret")
+        job = JobPost.objects.create(employer=employer, title="Backend", description="APIs", location="Remote",
+                                     skills_required="python")
+        client = APIClient()
+        client.force_authenticate(employer)
+
+        response = client.patch(f'/api/jobs/{job.pk}/', {'created_at': "2000-01-01T00:00:00Z",
+                                                         'matches_refreshed_at': "2000-01-01T00:00:00Z"},
+                                format='json')
+        self.assertEqual(response.status_code, 200)
+        job.refresh_from_db()
+        self.assertNotEqual(job.created_at.year, 2000)
+        self.assertNotEqual(getattr(job.matches_refreshed_at, 'year', None), 2000)
+
+
+class QueryBudgetTests(TestCase):
+    """Every list and action endpoint runs a fixed number of queries, however many rows it returns."""
+
+    @classmethod
+    def setUpTestData(cls):
+        # A small vocabulary, so most resumes match several jobs
+        cls.resumes, cls.jobs = seed_dataset(60, 20, 8, random.Random(3))
+        for resume in cls.resumes[:30]:
+            AnalysisJob.objects.create(resume=resume)
+        cls.employer = cls.jobs[0].employer
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.employer)
+        get_response_cache().clear()
+
+    def assertQueryBudget(self, url, queries, min_rows):
+        with self.assertNumQueries(queries):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        rows = body['results'] if isinstance(body, dict) else body
+        self.assertGreaterEqual(len(rows), min_rows)
+
+    def test_resume_list(self):
+        self.assertQueryBudget('/api/resumes/', 1, 50)
+
+    def test_job_lists(self):
+        self.assertQueryBudget('/api/jobs/', 1, 20)
+        self.assertQueryBudget('/jobs/', 1, 20)
+
+    def test_analysis_job_list(self):
+        self.assertQueryBudget('/api/analysis-jobs/', 1, 30)
+
+    def test_find_candidates(self):
+        # The job, the data versions, and the matches with their resumes
+        self.assertQueryBudget(f'/api/resumes/find_candidates/?job_id={self.jobs[0].pk}', 3, 30)
+
+    def test_refresh_candidates(self):
+        self.assertQueryBudget(f'/api/resumes/refresh_candidates/?job_id={self.jobs[0].pk}', 8, 30)
+
+    def test_recommended_jobs(self):
+        # The resume, the data versions, the check for unrefreshed jobs, and the matches with their jobs
+        resume = max(self.resumes, key=lambda resume: resume.job_matches.filter(exact_score__gt=0.3).count())
+        self.assertQueryBudget(f'/api/resumes/{resume.pk}/recommended_jobs/', 4, 3)
+
+
+@skipUnless(connection.vendor == 'sqlite', "Plans are checked against SQLite's EXPLAIN QUERY PLAN")
+class QueryPlanTests(TestCase):
+    def assertUsesIndex(self, queryset, index):
+        plan = queryset.explain()
+        self.assertIn(f"USING INDEX {index}", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_resume_list_page(self):
+        self.assertUsesIndex(Resume.objects.order_by('-upload_date', '-id')[:50], 'resume_upload_order_idx')
+
+    def test_leaderboard_page(self):
+        leaderboard = Resume.objects.filter(score__isnull=False).order_by('-score', '-id')
+        self.assertUsesIndex(leaderboard[:50], 'resume_score_order_idx')
+        # The two seeks of a later page
+        self.assertIn("(score=? AND id<?)", leaderboard.filter(score=7, id__lt=100)[:51].explain())
+        self.assertUsesIndex(leaderboard.filter(score__lt=7)[:51], 'resume_score_order_idx')
+
+    def test_resume_by_email(self):
+        self.assertIn("(email=?)", Resume.objects.filter(email="a@example.com").explain())
+
+    def test_employer_job_posts(self):
+        self.assertUsesIndex(JobPost.objects.filter(employer_id=1).order_by('-created_at'),
+                             'jobpost_employer_recent_idx')
+
+    def test_analyzed_resumes(self):
+        self.assertUsesIndex(Resume.objects.filter(ANALYZED).order_by('id').values_list('id', 'keywords'),
+                             'resume_analyzed_idx')
@@ -0,0 +1,225 @@
+#text_prep.py
+import hashlib
+import json
+import re
+import threading
+from functools import lru_cache
+
+from django.conf import settings
+
+from .llm_client import estimate_tokens
+
+# Headings recognised as the start of a resume section, mapped to the section they open
+SECTION_HEADINGS = {
+    'summary': 'summary', 'profile': 'summary', 'objective': 'summary', 'about me': 'summary',
+    'professional summary': 'summary',
+    'experience': 'experience', 'work experience': 'experience', 'professional experience': 'experience',
+    'employment': 'experience', 'employment history': 'experience', 'work history': 'experience',
+    'education': 'education', 'academic background': 'education',
+    'skills': 'skills', 'technical skills': 'skills', 'core competencies': 'skills', 'technologies': 'skills',
+    'projects': 'projects', 'personal projects': 'projects',
+    'certifications': 'certifications', 'certificates': 'certifications', 'licenses': 'certifications',
+    'awards': 'awards', 'achievements': 'awards',
+    'languages': 'languages', 'interests': 'interests', 'hobbies': 'interests',
+    'publications': 'publications', 'references': 'references', 'volunteering': 'volunteering',
+}
+
+# Sections each prompt needs, most important first; None means the whole resume in document order
+PROMPT_SECTIONS = {
+    'keywords': ['skills', 'experience', 'projects', 'certifications'],
+    'score': None,
+    'review': None,
+    'relevance': ['summary', 'experience', 'skills', 'projects', 'education', 'header'],
+    'combined': None,
+}
+
+# Lines this close to the top or bottom of a page may be a running header or footer
+PAGE_EDGE_LINES = 2
+
+_HEADING_CLEANUP = re.compile(r'[\s:\-–—|•*#]+$|^[\s\-–—|•*#]+')
+_SPACES = re.compile(r'[ \t\v\u00a0]+')
+_DIGITS = re.compile(r'\d+')
+
+_savings = None
+_savings_lock = threading.Lock()
+
+
+class TokenSavings:
+    """Running totals of prompt-text tokens before and after trimming, per process."""
+
+    def __init__(self):
+        self.prompts = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+        self._lock = threading.Lock()
+
+    def record(self, before, after):
+        with self._lock:
+            self.prompts += 1
+            self.tokens_before += before
+            self.tokens_after += after
+
+    def snapshot(self):
+        with self._lock:
+            saved = self.tokens_before - self.tokens_after
+            return {
+                'prompts': self.prompts,
+                'tokens_before': self.tokens_before,
+                'tokens_after': self.tokens_after,
+                'tokens_saved': saved,
+                'saved_per_prompt': round(saved / self.prompts, 1) if self.prompts else 0.0,
+            }
+
+    def reset(self):
+        with self._lock:
+            self.prompts = self.tokens_before = self.tokens_after = 0
+
+
+def get_token_savings():
+    global _savings
+    with _savings_lock:
+        if _savings is None:
+            _savings = TokenSavings()
+        return _savings
+
+
+def _running_lines(pages):
+    """
+    Keys of the page headers and footers: lines near the top or bottom of
+    more than half the pages (and at least two). Digits are ignored, so
+    "Page 2 of 3" repeats "Page 1 of 3".
+    """
+    if len(pages) < 2:
+        return set()
+    counts = {}
+    for page in pages:
+        edges = page[:PAGE_EDGE_LINES] + page[-PAGE_EDGE_LINES:]
+        for key in {_DIGITS.sub('#', line.lower()) for line in edges}:
+            counts[key] = counts.get(key, 0) + 1
+    return {key for key, count in counts.items() if count >= 2 and count * 2 > len(pages)}
+
+
+def normalize_lines(text):
+    """
+    Lines of `text` with runs of spaces collapsed and ends stripped.
+
+    Pages are separated by form feeds (see pdf_extract.PAGE_BREAK). Running
+    page headers and footers are kept only the first time they appear;
+    other lines are kept even when repeated. Runs of blank lines are reduced
+    to one.
+    """
+    pages = [[_SPACES.sub(' ', line).strip() for line in page.splitlines()] for page in text.split("\f")]
+    running = _running_lines([[line for line in page if line] for page in pages])
+    lines = []
+    seen = set()
+    for page in pages:
+        for line in page:
+            if not line:
+                if lines and lines[-1]:
+                    lines.append('')
+                continue
+            key = _DIGITS.sub('#', line.lower())
+            if key in running:
+                if key in seen:
+                    continue
+                seen.add(key)
+            lines.append(line)
+    while lines and not lines[-1]:
+        lines.pop()
+    return lines
+
+
+def section_of(line):
+    """The section a line opens if it is a heading (e.g. "Work Experience:"), else None."""
+    if len(line) > 40:
+        return None
+    return SECTION_HEADINGS.get(_HEADING_CLEANUP.sub('', line).lower())
+
+
+def split_sections(lines):
+    """
+    Group lines into sections in document order.
+
+    Returns:
+        list: (section name, text) pairs; lines before the first heading form the 'header' section.
+    """
+    sections = [['header', []]]
+    for line in lines:
+        name = section_of(line)
+        if name:
+            sections.append([name, [line]])
+        else:
+            sections[-1][1].append(line)
+    return [(name, "\n".join(body).strip()) for name, body in sections if "\n".join(body).strip()]
+
+
+def truncate_to_tokens(text, budget):
+    """Cut `text` at a line (or failing that, word) boundary so it fits in `budget` estimated tokens."""
+    if estimate_tokens(text) <= budget:
+        return text
+    limit = budget * 4
+    cut = text[:limit]
+    boundary = max(cut.rfind("\n"), cut.rfind(" "))
+    return cut[:boundary] if boundary > limit // 2 else cut
+
+
+class PreparedText:
+    """Resume text cleaned once and cut to size per prompt type."""
+
+    def __init__(self, text):
+        self.raw_tokens = estimate_tokens(text)
+        self.sections = split_sections(normalize_lines(text))
+        self.text = "\n\n".join(body for _, body in self.sections)
+
+    def for_prompt(self, kind, budget):
+        """
+        The text to embed in a prompt of `kind` (see PROMPT_SECTIONS), at most `budget` estimated tokens.
+
+        Wanted sections are filled in priority order and then put back in
+        document order; a resume without recognised sections is cut from the top.
+        """
+        wanted = PROMPT_SECTIONS.get(kind)
+        detected = {name for name, _ in self.sections}
+        if wanted is None or not detected.intersection(wanted):
+            return truncate_to_tokens(self.text, budget)
+
+        chosen = {}
+        remaining = budget
+        for name in wanted:
+            for index, (section, body) in enumerate(self.sections):
+                if section != name or remaining <= 0:
+                    continue
+                body = truncate_to_tokens(body, remaining)
+                chosen[index] = body
+                remaining -= estimate_tokens(body)
+        return "\n\n".join(chosen[index] for index in sorted(chosen))
+
+
+@lru_cache(maxsize=64)
+def prepare(text):
+    """Clean a resume text once; every prompt built from the same text reuses the result."""
+    return PreparedText(text)
+
+
+def trimming_signature():
+    """Short fingerprint of the trimming settings, for cache keys of results built from trimmed prompts."""
+    settings_used = {
+        'trimming': getattr(settings, 'PROMPT_TRIMMING', True),
+        'budgets': getattr(settings, 'PROMPT_TOKEN_BUDGETS', {}),
+    }
+    return hashlib.sha256(json.dumps(settings_used, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def text_for_prompt(text, kind):
+    """
+    The trimmed resume text for one prompt, recording the tokens saved.
+
+    Returns `text` unchanged when settings.PROMPT_TRIMMING is off.
+    """
+    if not getattr(settings, 'PROMPT_TRIMMING', True):
+        return text
+    budgets = getattr(settings, 'PROMPT_TOKEN_BUDGETS', {})
+    prepared = prepare(text)
+    trimmed = prepared.for_prompt(kind, budgets.get(kind, budgets.get('default', 4000)))
+    get_token_savings().record(prepared.raw_tokens, estimate_tokens(trimmed))
+    return trimmed
@@ -0,0 +1,81 @@
+#text_store.py
+import hashlib
+import os
+
+from django.db import IntegrityError
+
+from . import versions
+from .models import ExtractedText, Resume
+from .pdf_extract import get_extraction_pool
+
+
+def hash_file(file_path, chunk_size=1 << 20):
+    """SHA-256 of a file's bytes, read in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def store_extraction(content_hash, result):
+    """Save an ExtractionResult under its file's hash, returning the stored row (an existing one wins)."""
+    entry = ExtractedText(
+        content_hash=content_hash,
+        page_count=result.page_count,
+        pages_read=len(result.page_timings),
+        stopped=result.stopped,
+        extraction_seconds=result.elapsed,
+    )
+    entry.text = result.text
+    try:
+        entry.save()
+    except IntegrityError:
+        # Another worker stored the same file first
+        entry = ExtractedText.objects.get(content_hash=content_hash)
+    return entry
+
+
+def extract_file(file_path, pool=None):
+    """
+    The stored text of a PDF, extracting it in the process pool only if this file was never seen before.
+
+    Returns:
+        ExtractedText: The stored text, or None if the file could not be read or held no text.
+    """
+    content_hash = hash_file(file_path)
+    entry = ExtractedText.objects.filter(content_hash=content_hash).first()
+    if entry is not None:
+        return entry
+
+    result = (pool or get_extraction_pool()).extract(file_path)
+    if result.error:
+        print(f"Error extracting text from PDF: {result.error}")
+    if not result.text:
+        return None
+    return store_extraction(content_hash, result)
+
+
+def resume_text(resume, pool=None):
+    """
+    The text to analyze for a resume.
+
+    A file still on disk is a new upload and is extracted (or found by hash)
+    and linked to the resume; otherwise the text stored from an earlier
+    upload is reused, so re-analysis never needs the PDF.
+
+    Returns:
+        str: The resume text, or None if there is none.
+    """
+    file_path = resume.resume_file.path if resume.resume_file else None
+    if file_path and os.path.exists(file_path):
+        entry = extract_file(file_path, pool=pool)
+        if entry is not None and entry.pk != resume.extracted_text_id:
+            resume.extracted_text = entry
+            Resume.objects.filter(pk=resume.pk).update(extracted_text=entry)
+            versions.bump(versions.RESUMES)
+        if entry is None:
+            return None
+    elif resume.extracted_text_id is None:
+        return None
+    return resume.extracted_text.text
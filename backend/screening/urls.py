@@ -1,15 +1,22 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ResumeViewSet, JobPostViewSet, RegisterView, LoginView
+from .views import (ResumeViewSet, JobPostViewSet, AnalysisJobViewSet, RegisterView, LoginView, candidate_stream,
+                    upload_resume, analysis_job_result, prometheus_metrics)
 
 router = DefaultRouter()
 router.register(r'resumes', ResumeViewSet)
 router.register(r'jobs', JobPostViewSet, basename='jobpost')  # Added basename
+router.register(r'analysis-jobs', AnalysisJobViewSet)
 
 urlpatterns = [
+    path('api/jobs/<int:job_id>/candidates/stream/', candidate_stream, name='candidate-stream'),
+    # Async views, for serving through resume_portal.asgi
+    path('api/resumes/upload/', upload_resume, name='resume-upload'),
+    path('api/analysis-jobs/<int:pk>/result/', analysis_job_result, name='analysisjob-result'),
     path('api/', include(router.urls)),
     path('auth/register/', RegisterView.as_view(), name='register'),
     path('auth/login/', LoginView.as_view(), name='login'),
+    path('metrics/', prometheus_metrics, name='metrics'),
     # Add direct job routes for frontend compatibility
     path('jobs/', JobPostViewSet.as_view({
         'get': 'list',
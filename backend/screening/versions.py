@@ -0,0 +1,34 @@
+#versions.py
+from django.db.models import F
+from django.utils import timezone
+
+from .models import DataVersion
+
+RESUMES = 'resumes'
+JOBS = 'jobs'
+MATCHES = 'matches'
+SKILLS = 'skills'
+SKILL_EDITS = 'skill_edits'
+
+
+def bump(*names):
+    """Record that the named data changed; every response validated against it becomes stale."""
+    now = timezone.now()
+    for name in names:
+        if not DataVersion.objects.filter(name=name).update(value=F('value') + 1, updated_at=now):
+            DataVersion.objects.get_or_create(name=name, defaults={'value': 1})
+
+
+def current(*names):
+    """
+    The versions of the named data.
+
+    Returns:
+        tuple: (values, last_modified), where values holds one counter per
+        name in order (0 for data never changed) and last_modified is the
+        latest change among them, or None.
+    """
+    rows = dict((row.name, row) for row in DataVersion.objects.filter(name__in=names))
+    values = tuple(rows[name].value if name in rows else 0 for name in names)
+    changed = [row.updated_at for row in rows.values()]
+    return values, max(changed) if changed else None
@@ -1,17 +1,36 @@
 # views.py
 
-import os
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse, HttpResponse
 from django.shortcuts import render
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
+from django.db import transaction
 from rest_framework import viewsets, status, generics, permissions
 from rest_framework.authtoken.models import Token
 from rest_framework.permissions import AllowAny
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.request import Request
 from rest_framework.response import Response
+from rest_framework.reverse import reverse
 from rest_framework.views import APIView
-from .models import Resume, JobPost
-from .serializers import ResumeSerializer, JobPostSerializer, RegisterSerializer, LoginSerializer
-from .ai_module import analyze_resume
+from .models import Resume, JobPost, AnalysisJob
+from .serializers import ResumeSerializer, ResumeListSerializer, JobPostSerializer, serialize_candidates, RegisterSerializer, LoginSerializer, AnalysisJobSerializer
+from .analysis_queue import enqueue_analysis, wait_for_job
+from .matching import find_matching_jobs, find_candidates
+from .match_table import refresh_changed_matches
+from .pagination import ResumeCursorPagination
+from .http_cache import conditional_response, get_response_cache
+from .metrics import render_prometheus, timed
+from .analysis_cache import get_analysis_cache
+from .llm_client import aggregate_metrics
+from .text_prep import get_token_savings
+from .streams import CandidateStream
 from rest_framework.decorators import action
 
 
@@ -44,110 +63,97 @@ class LoginView(APIView):
         return Response({'error': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
 
 
-class ResumeViewSet(viewsets.ModelViewSet):
-    queryset = Resume.objects.all().order_by('-upload_date')
-    serializer_class = ResumeSerializer
+def save_upload(data, context):
+    """
+    Create the resume for data['email'], or update the existing one, and queue its analysis.
 
-    def create(self, request, *args, **kwargs):
-        email = request.data.get('email')
-        job_title = request.data.get('job_title')
+    Raises:
+        ValidationError: The upload is invalid.
 
+    Returns:
+        tuple: (Resume, AnalysisJob)
+    """
+    email = data.get('email')
+    job_title = data.get('job_title')
+
+    with transaction.atomic():
         # Check if a resume with this email already exists
         try:
             existing_resume = Resume.objects.get(email=email)
             # Update the existing resume
-            serializer = self.get_serializer(existing_resume, data=request.data, partial=True)
+            serializer = ResumeSerializer(existing_resume, data=data, partial=True, context=context)
             serializer.is_valid(raise_exception=True)
             resume_instance = serializer.save(job_title=job_title)
-            status_code = status.HTTP_200_OK
         except Resume.DoesNotExist:
             # Create a new resume
-            serializer = self.get_serializer(data=request.data)
+            serializer = ResumeSerializer(data=data, context=context)
             serializer.is_valid(raise_exception=True)
             resume_instance = serializer.save(job_title=job_title)
-            status_code = status.HTTP_201_CREATED
 
-        # Store the file path for later deletion
-        resume_file_path = resume_instance.resume_file.path
+        # Analysis runs in the background; clients poll the job for the result
+        job = enqueue_analysis(resume_instance, job_title=job_title)
+    return resume_instance, job
 
-        try:
-            # Run full AI analysis
-            analysis_result = analyze_resume(resume_file_path, analysis_type="full", job_title=job_title)
-
-            if analysis_result:
-                resume_instance.score = analysis_result.get('score')
-                resume_instance.review = analysis_result.get('review')
-                resume_instance.relevance_score = analysis_result.get('relevance_score')
-                resume_instance.relevance_tips = analysis_result.get('relevance_tips')
-                resume_instance.keywords = analysis_result.get('keywords')
-                resume_instance.save()
-
-                # Find matching jobs if keywords are available
-                if analysis_result.get('keywords'):
-                    matching_jobs = self.find_matching_jobs(resume_instance)
-                    if matching_jobs:
-                        resume_instance.matching_score = matching_jobs[0]['score']
-                        resume_instance.save()
-
-            # Delete the resume file after successful processing
-            if os.path.exists(resume_file_path):
-                os.remove(resume_file_path)
-
-            headers = self.get_success_headers(serializer.data)
-            return Response(self.get_serializer(resume_instance).data, status=status_code, headers=headers)
-        except Exception as e:
-            # Delete the resume file in case of error
-            if os.path.exists(resume_file_path):
-                os.remove(resume_file_path)
-            if status_code == status.HTTP_201_CREATED:
-                resume_instance.delete()
-            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+def upload_accepted(request, resume, job):
+    """The body answering an upload whose analysis is still queued."""
+    return {
+        'job_id': job.pk,
+        'status': job.status,
+        'status_url': reverse('analysisjob-detail', args=[job.pk], request=request),
+        'result_url': reverse('analysisjob-result', args=[job.pk], request=request),
+        'resume': ResumeSerializer(resume, context={'request': request}).data,
+    }
+
+
+class ResumeViewSet(viewsets.ModelViewSet):
+    queryset = Resume.objects.all().order_by('-upload_date')
+    serializer_class = ResumeSerializer
+    pagination_class = ResumeCursorPagination
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return ResumeListSerializer
+        return ResumeSerializer
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            # Load only the columns the page will show
+            serializer = self.get_serializer()
+            columns = {field.name for field in Resume._meta.concrete_fields}
+            shown = [serializer.field_columns.get(name, name) for name in serializer.fields]
+            shown = [name for name in shown if name in columns]
+            # The cursor is read from the ordering columns of the last row
+            ordering = [name.lstrip('-') for name in self.paginator.get_ordering(self.request, queryset, self)]
+            queryset = queryset.only('id', *ordering, *shown)
+        return queryset
+
+    def create(self, request, *args, **kwargs):
+        resume_instance, job = save_upload(request.data, self.get_serializer_context())
+        data = upload_accepted(request, resume_instance, job)
+        return Response(data, status=status.HTTP_202_ACCEPTED, headers={'Location': data['status_url']})
 
     def find_matching_jobs(self, resume):
         """Find jobs that match the resume's keywords"""
-        from .models import JobPost
-        
-        if not resume.keywords:
-            return []
-
-        resume_keywords = set([k.lower().strip() for k in resume.keywords.split(',')])
-        matching_jobs = []
-
-        for job in JobPost.objects.all():
-            job_keywords = set([k.lower().strip() for k in job.skills_required.split(',')])
-            
-            # Calculate Jaccard similarity
-            intersection = len(resume_keywords.intersection(job_keywords))
-            union = len(resume_keywords.union(job_keywords))
-            score = intersection / union if union > 0 else 0
-            
-            if score > 0.3:  # Only include jobs with significant match
-                matching_jobs.append({
-                    'job': job,
-                    'score': score,
-                    'matching_keywords': list(resume_keywords.intersection(job_keywords))
-                })
-
-        # Sort by matching score
-        matching_jobs.sort(key=lambda x: x['score'], reverse=True)
-        return matching_jobs[:5]  # Return top 5 matches
+        return find_matching_jobs(resume)
 
     @action(detail=True, methods=['get'])
     def recommended_jobs(self, request, pk=None):
         """Get recommended jobs for a resume"""
         resume = self.get_object()
-        matching_jobs = self.find_matching_jobs(resume)
-        
-        # Serialize the matching jobs
-        from .serializers import JobPostSerializer
-        serialized_jobs = []
-        for match in matching_jobs:
-            job_data = JobPostSerializer(match['job']).data
-            job_data['matching_score'] = match['score']
-            job_data['matching_keywords'] = match['matching_keywords']
-            serialized_jobs.append(job_data)
-            
-        return Response(serialized_jobs)
+
+        def build():
+            # Serialize the matching jobs
+            matches = self.find_matching_jobs(resume)
+            with timed('serialize'):
+                serialized_jobs = JobPostSerializer([match['job'] for match in matches], many=True).data
+            for job_data, match in zip(serialized_jobs, matches):
+                job_data['matching_score'] = match['score']
+                job_data['matching_keywords'] = match['matching_keywords']
+            return serialized_jobs
+
+        return conditional_response(request, f"recommended-{resume.pk}", build)
 
     @action(detail=False, methods=['get'])
     def find_candidates(self, request):
@@ -158,59 +164,16 @@ class ResumeViewSet(viewsets.ModelViewSet):
 
         try:
             job = JobPost.objects.get(id=job_id)
-            job_keywords = [k.lower().strip() for k in job.skills_required.split(',')]
-            
-            matching_candidates = []
-            for resume in Resume.objects.all():
-                if not resume.keywords:
-                    continue
-                    
-                resume_keywords = set([k.lower().strip() for k in resume.keywords.split(',')])
-                job_keywords_set = set(job_keywords)
-                
-                # Calculate exact match score using Jaccard similarity
-                intersection = len(resume_keywords.intersection(job_keywords_set))
-                union = len(resume_keywords.union(job_keywords_set))
-                exact_score = intersection / union if union > 0 else 0
-                
-                # Calculate partial match score
-                partial_matches = 0
-                for job_keyword in job_keywords:
-                    for resume_keyword in resume_keywords:
-                        if job_keyword in resume_keyword or resume_keyword in job_keyword:
-                            partial_matches += 1
-                            break
-                
-                partial_score = partial_matches / len(job_keywords) if job_keywords else 0
-                
-                # Combine scores with more weight on exact matches
-                combined_score = (exact_score * 0.7) + (partial_score * 0.3)
-                
-                # Lower threshold to 0.05 (5%) to be even more lenient
-                if combined_score > 0.05:  # Only include candidates with some match
-                    matching_candidates.append({
-                        'resume': resume,
-                        'score': combined_score,
-                        'exact_matches': list(resume_keywords.intersection(job_keywords_set)),
-                        'partial_matches': partial_matches,
-                        'last_updated': resume.upload_date
-                    })
-
-            # Sort by combined score and then by upload date (newest first)
-            matching_candidates.sort(key=lambda x: (x['score'], x['last_updated']), reverse=True)
-            
-            # Serialize the results
-            serialized_candidates = []
-            for match in matching_candidates[:30]:  # Return top 30 matches
-                candidate_data = self.get_serializer(match['resume']).data
-                candidate_data['matching_score'] = match['score']
-                candidate_data['exact_matches'] = match['exact_matches']
-                candidate_data['partial_matches'] = match['partial_matches']
-                candidate_data['last_updated'] = match['last_updated']
-                serialized_candidates.append(candidate_data)
-                
-            return Response(serialized_candidates)
-            
+
+            def build():
+                # Serialize the results (top 30 matches)
+                context = self.get_serializer_context()
+                matches = find_candidates(job)
+                with timed('serialize'):
+                    return serialize_candidates(matches, context)
+
+            return conditional_response(request, f"candidates-{job.pk}", build)
+
         except JobPost.DoesNotExist:
             return Response({'error': 'Job not found'}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
@@ -219,16 +182,27 @@ class ResumeViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def refresh_candidates(self, request):
         """Refresh the list of matching candidates for a job"""
+        job_id = request.query_params.get('job_id')
+        job = JobPost.objects.filter(id=job_id).first() if job_id else None
+        if job is not None:
+            # Pick up resumes whose skills changed without going through a save
+            refresh_changed_matches(job)
         return self.find_candidates(request)
 
 
+class AnalysisJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """Status of background resume analyses, polled by clients after an upload"""
+    queryset = AnalysisJob.objects.select_related('resume')
+    serializer_class = AnalysisJobSerializer
+
+
 class JobPostViewSet(viewsets.ModelViewSet):
     serializer_class = JobPostSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
         # Only return job posts created by the current user
-        return JobPost.objects.filter(employer=self.request.user).order_by('-created_at')
+        return JobPost.objects.filter(employer=self.request.user).select_related('employer').order_by('-created_at')
 
     def perform_create(self, serializer):
         # Automatically set the employer to the current user
@@ -246,3 +220,121 @@ class JobPostViewSet(viewsets.ModelViewSet):
             raise permissions.PermissionDenied("You can only delete your own job posts.")
         instance.delete()
 
+
+async def candidate_stream(request, job_id):
+    """
+    Server-sent events with a job's current candidates, re-sent as they change (see CandidateStream).
+
+    Served as a long-lived stream under ASGI; under WSGI each request returns
+    what is available and the browser's EventSource reconnects to poll.
+    """
+    job = await JobPost.objects.filter(pk=job_id).afirst()
+    if job is None:
+        return JsonResponse({'error': 'Job not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    last_version = request.headers.get('Last-Event-ID') or request.GET.get('version') or ''
+    stream = CandidateStream(
+        job,
+        last_version=int(last_version) if last_version.isdigit() else None,
+        context={'request': Request(request)},
+        poll_interval=settings.CANDIDATE_STREAM_POLL_INTERVAL,
+        heartbeat=settings.CANDIDATE_STREAM_HEARTBEAT,
+        max_seconds=settings.CANDIDATE_STREAM_MAX_SECONDS,
+    )
+    if isinstance(request, ASGIRequest):
+        response = StreamingHttpResponse(stream.events(), content_type='text/event-stream')
+    else:
+        response = HttpResponse(await sync_to_async(stream.poll)(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # keep proxies from buffering the stream
+    return response
+
+
+def wait_seconds(request):
+    """The ?wait= of a request, capped at settings.ANALYSIS_WAIT_MAX."""
+    try:
+        return max(0.0, min(float(request.GET.get('wait', 0)), settings.ANALYSIS_WAIT_MAX))
+    except ValueError:
+        return 0.0
+
+
+def finished_job_data(request, job):
+    return AnalysisJobSerializer(job, context={'request': Request(request)}).data
+
+
+@csrf_exempt
+@require_POST
+async def upload_resume(request):
+    """
+    Async counterpart of POST /api/resumes/.
+
+    The upload is saved on Django's sync thread and its analysis queued as
+    usual. With ?wait=N the response waits up to N seconds for the analysis
+    and returns the finished job (200); otherwise, or if it is still running,
+    the queued job is returned (202) as by the DRF view. Waiting holds no
+    thread under ASGI, so many uploads can wait on the LLM at once.
+    """
+    drf_request = Request(request, parsers=[MultiPartParser(), FormParser(), JSONParser()])
+
+    def save():
+        resume, job = save_upload(drf_request.data, {'request': drf_request})
+        return upload_accepted(drf_request, resume, job)
+
+    try:
+        accepted = await sync_to_async(save)()
+    except ValidationError as e:
+        return JsonResponse(e.detail, status=status.HTTP_400_BAD_REQUEST, safe=False)
+
+    timeout = wait_seconds(request)
+    if timeout:
+        job = await wait_for_job(accepted['job_id'], timeout)
+        if job is not None and job.is_finished:
+            return JsonResponse(await sync_to_async(finished_job_data)(request, job))
+    return JsonResponse(accepted, status=status.HTTP_202_ACCEPTED, headers={'Location': accepted['status_url']})
+
+
+@require_GET
+async def analysis_job_result(request, pk):
+    """An analysis job, after waiting up to ?wait= seconds for it to finish (long polling)."""
+    job = await wait_for_job(pk, wait_seconds(request))
+    if job is None:
+        return JsonResponse({'error': 'Analysis job not found'}, status=status.HTTP_404_NOT_FOUND)
+    return JsonResponse(await sync_to_async(finished_job_data)(request, job))
+
+
+def runtime_counters():
+    """Process-wide counters for the metrics endpoint, as render_prometheus expects them."""
+    llm = aggregate_metrics()
+    savings = get_token_savings().snapshot()
+    hits, misses = {}, {}
+    responses = get_response_cache().stats()
+    hits['cache="response"'], misses['cache="response"'] = responses['hits'], responses['misses']
+    analysis_cache = get_analysis_cache()
+    if analysis_cache is not None:
+        analyses = analysis_cache.stats()
+        hits['cache="analysis"'], misses['cache="analysis"'] = analyses['hits'], analyses['misses']
+    return [
+        ('llm_requests_total', 'counter', "LLM calls made through the client.", {None: llm.get('requests', 0)}),
+        ('llm_attempts_total', 'counter', "LLM call attempts by outcome.", {
+            'outcome="success"': llm.get('successes', 0),
+            'outcome="failure"': llm.get('failures', 0),
+            'outcome="retry"': llm.get('retries', 0),
+            'outcome="rate_limited"': llm.get('rate_limited', 0),
+            'outcome="circuit_open"': llm.get('circuit_rejections', 0),
+        }),
+        ('llm_tokens_total', 'counter', "Estimated prompt tokens sent to the LLM.", {None: llm.get('tokens', 0)}),
+        ('llm_throttled_seconds_total', 'counter', "Seconds spent waiting on the client-side rate limit.",
+         {None: llm.get('throttled_seconds', 0.0)}),
+        ('prompt_text_tokens_total', 'counter', "Estimated resume-text tokens before and after trimming.", {
+            'text="raw"': savings['tokens_before'],
+            'text="trimmed"': savings['tokens_after'],
+        }),
+        ('cache_hits_total', 'counter', "Cache lookups answered from the cache.", hits),
+        ('cache_misses_total', 'counter', "Cache lookups that had to compute the result.", misses),
+    ]
+
+
+@require_GET
+def prometheus_metrics(request):
+    """Stage and request histograms plus runtime counters, in the Prometheus text format."""
+    return HttpResponse(render_prometheus(runtime_counters()), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -27,10 +27,27 @@ const CandidateMatches = ({ jobId }) => {
     }
   };
 
+  // The current ranking is pushed over server-sent events, again each time
+  // it changes
   useEffect(() => {
-    if (jobId) {
+    if (!jobId) {
+      return;
+    }
+    if (typeof EventSource === "undefined") {
       fetchCandidates();
+      return;
     }
+
+    const source = new EventSource(
+      `${import.meta.env.VITE_API_URL}/api/jobs/${jobId}/candidates/stream/`
+    );
+    source.addEventListener("snapshot", (event) => {
+      setCandidates(JSON.parse(event.data));
+      setError("");
+      setLoading(false);
+    });
+
+    return () => source.close();
   }, [jobId]);
 
   const handleRefresh = () => {
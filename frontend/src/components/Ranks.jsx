@@ -6,23 +6,28 @@ import axios from "axios";
 const Header = lazy(() => import("./Header"));
 
 const backendUrl = import.meta.env.VITE_API_URL;
+const RANK_FIELDS = "id,candidate_name,email,score,upload_date";
 
 const Ranks = () => {
   const [resumes, setResumes] = useState([]);
   const [error, setError] = useState("");
   const [loading, setLoading] = useState(true);
+  const [nextUrl, setNextUrl] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  // The server ranks by score (best first) and cursor paginates, so pages are appended as they come
+  const fetchPage = async (url, cancelToken) => {
+    const response = await axios.get(url, { cancelToken });
+    setResumes((current) => [...current, ...response.data.results]);
+    setNextUrl(response.data.next);
+  };
 
   useEffect(() => {
     const source = axios.CancelToken.source();
 
     const fetchResumes = async () => {
       try {
-        const response = await axios.get(`${backendUrl}/api/resumes/`, {
-          cancelToken: source.token,
-        });
-        // Sort data in descending order by score
-        const sortedResumes = [...response.data].sort((a, b) => b.score - a.score);
-        setResumes(sortedResumes);
+        await fetchPage(`${backendUrl}/api/resumes/?ordering=-score&fields=${RANK_FIELDS}`, source.token);
       } catch (err) {
         if (!axios.isCancel(err)) {
           setError("Error fetching resumes.");
@@ -40,6 +45,18 @@ const Ranks = () => {
     };
   }, []);
 
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      await fetchPage(nextUrl);
+    } catch (err) {
+      setError("Error fetching resumes.");
+      console.error(err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   return (
     <div className="bg-white min-h-screen">
       <Suspense fallback={<div className="p-4 text-center">Loading header...</div>}>
@@ -106,6 +123,19 @@ const Ranks = () => {
                 </li>
               ))}
             </ul>
+
+            {nextUrl && (
+              <div className="py-6 text-center">
+                <button
+                  type="button"
+                  onClick={loadMore}
+                  disabled={loadingMore}
+                  className="rounded-md bg-gray-100 px-4 py-2 text-sm font-semibold text-gray-700 hover:bg-gray-200 disabled:opacity-50"
+                >
+                  {loadingMore ? "Loading..." : "Load more"}
+                </button>
+              </div>
+            )}
           </div>
         )}
       </div>
@@ -10,6 +10,8 @@ const Header = lazy(() => import("./Header"));
 const Modal = lazy(() => import("./Modal"));
 
 const backendUrl = import.meta.env.VITE_API_URL;
+const POLL_INTERVAL_MS = 2000;
+const WAIT_SECONDS = 25;
 
 const ResumeUpload = () => {
   const [file, setFile] = useState(null);
@@ -46,19 +48,36 @@ const ResumeUpload = () => {
 
     setIsUploading(true);
     try {
+      // The server holds the request open until the analysis is done or
+      // WAIT_SECONDS pass; after that the job is long-polled until it finishes
+      setUploadStatus("Uploading and analyzing your resume...");
       const response = await axios.post(
-        `${backendUrl}/api/resumes/`,
+        `${backendUrl}/api/resumes/upload/?wait=${WAIT_SECONDS}`,
         formData,
         {
           headers: { "Content-Type": "multipart/form-data" },
         }
       );
 
-      setUploadStatus("Upload successful!");
-      setResumeScore(response.data.score);
-      setResumeReview(response.data.review);
-      setRelevanceScore(response.data.relevance_score);
-      setRelevanceTips(response.data.relevance_tips);
+      const resultUrl = response.data.result_url;
+      let job = response.data;
+      while (job.status === "queued" || job.status === "running") {
+        // The minimum interval keeps servers that cannot hold requests open from being hammered
+        const [next] = await Promise.all([
+          axios.get(`${resultUrl}?wait=${WAIT_SECONDS}`),
+          new Promise((resolve) => setTimeout(resolve, POLL_INTERVAL_MS)),
+        ]);
+        job = next.data;
+      }
+      if (job.status === "failed") {
+        throw new Error(job.error || "Analysis failed");
+      }
+
+      setUploadStatus("Analysis complete!");
+      setResumeScore(job.resume.score);
+      setResumeReview(job.resume.review);
+      setRelevanceScore(job.resume.relevance_score);
+      setRelevanceTips(job.resume.relevance_tips);
 
       setTimeout(() => setUploadStatus(""), 3000);
       setIsModalOpen(true);